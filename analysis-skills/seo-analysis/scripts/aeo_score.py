@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""Score pages with the AEO model in references/aeo-scoring.md.
+
+Usage:
+    python3 extract_page_signals.py ./pages/ --output signals.ndjson
+    python3 aeo_score.py signals.ndjson
+    python3 aeo_score.py signals.ndjson --pages-output scores.ndjson --as-of 2026-01-31
+    python3 extract_page_signals.py page.html | python3 aeo_score.py -
+
+Input is extract_page_signals.py output: NDJSON from batch mode or
+crawl_site.py, or a single page's JSON. Signals missing from a record
+(e.g. a --fields subset) count as absent.
+
+Each record is reduced to a row of numeric features as it is read, and
+every criterion of every page is then scored at once with NumPy array
+operations: scoring and ranking 100k pages takes about 0.2 seconds, far
+less than reading their JSON.
+
+Criteria are scored from the extracted signals:
+    BLUF presence        H2 sections whose first content starts with an answer
+    Question headings    H2/H3 headings phrased as questions
+    Lists and tables     0 / 3 (1-2 lists or tables) / 5 (3+)
+    Article length       word-count bands (4 points for 1,500-2,500 words)
+    Schema criteria      JSON-LD types, FAQPage Q&A, Article author and dates,
+                         additional types, stacking depth (distinct types,
+                         excluding components such as Question or ListItem)
+    Author information   JSON-LD author (4), with an author URL (6)
+    Organization schema  Organization with name, url and logo (5), partial (3)
+    Citations            external links: 0 / 3 (1-2) / 5 (3+)
+    Date freshness       newest JSON-LD dateModified/datePublished vs --as-of
+    Direct answers       H2 sections with a recognized BLUF pattern
+    FAQ/Q&A patterns     question headings answered directly: 0 / 3 / 5 (3+)
+    Summary/TL;DR        a heading such as "TL;DR" or "Key takeaways"
+    Technical            meta description (present, 120-160 chars), canonical,
+                         og:title + og:description
+
+Paragraph optimization, section self-containment and mobile usability
+(13 points) need human or rendering review and are not scored. "points"
+is out of the 87 scorable points; "score" scales it to 0-100 and sets the
+grade.
+
+Output: JSON report to stdout (summary with grade counts and weakest
+criteria, lowest and highest scoring pages); --pages-output writes every
+page's score with per-dimension and per-criterion points as NDJSON.
+Dependencies: numpy (pip install numpy).
+"""
+
+import argparse
+import datetime
+import json
+import os
+import re
+import sys
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from extract_page_signals import QUESTION_HEADING_RE  # noqa: E402
+
+# (dimension, criterion, max points) for every scored criterion, in column order
+CRITERIA = (
+    ("content_structure", "bluf_presence", 7),
+    ("content_structure", "question_headings", 5),
+    ("content_structure", "lists_and_tables", 5),
+    ("content_structure", "article_length", 4),
+    ("structured_data", "json_ld_presence", 6),
+    ("structured_data", "faq_schema", 5),
+    ("structured_data", "article_author_schema", 5),
+    ("structured_data", "additional_schemas", 5),
+    ("structured_data", "schema_stacking", 5),
+    ("eeat", "author_information", 6),
+    ("eeat", "organization_schema", 5),
+    ("eeat", "citations", 5),
+    ("eeat", "date_freshness", 5),
+    ("ai_readability", "direct_answers", 6),
+    ("ai_readability", "faq_patterns", 5),
+    ("ai_readability", "summary", 4),
+    ("technical", "meta_description", 2),
+    ("technical", "canonical", 1),
+    ("technical", "open_graph", 1),
+)
+# Criteria of the model that cannot be scored from extracted signals
+MANUAL_CRITERIA = (
+    ("content_structure", "paragraph_optimization", 5),
+    ("ai_readability", "section_self_containment", 6),
+    ("technical", "mobile_usability", 2),
+)
+DIMENSIONS = tuple(dict.fromkeys(dimension for dimension, _, _ in CRITERIA))
+MAX_POINTS = sum(points for _, _, points in CRITERIA)
+
+# Feature columns built from each record by page_features()
+FEATURES = (
+    "h2_sections", "bluf_sections", "answer_sections", "qa_sections",
+    "headings", "question_headings", "summary_heading", "lists", "tables",
+    "word_count", "json_ld", "faq", "faq_questions", "article", "author",
+    "author_url", "article_dates", "additional_schemas", "schema_types",
+    "organization", "external_links", "content_age_days", "meta_description_length",
+    "canonical", "open_graph",
+)
+_COLUMN = {name: i for i, name in enumerate(FEATURES)}
+
+# Article length: points for word counts in [edge[i-1], edge[i])
+WORD_COUNT_EDGES = (500, 1000, 1500, 2501, 3001, 4001)
+WORD_COUNT_POINTS = (0, 2, 3, 4, 3, 2, 0)
+# Date freshness: content age in days below each edge
+FRESHNESS_EDGES = (183, 365)
+FRESHNESS_POINTS = (5, 3, 1)
+# Points by count, capped at the last entry
+STACKING_POINTS = (0, 1, 3, 5)
+COUNT_POINTS = (0, 3, 3, 5)
+ORGANIZATION_POINTS = (0, 3, 5)
+
+GRADE_EDGES = (40, 60, 70, 80, 90)
+GRADES = ("F", "D", "C", "B", "A", "A+")
+
+ADDITIONAL_SCHEMA_TYPES = frozenset((
+    "howto", "product", "review", "breadcrumblist", "videoobject", "localbusiness",
+))
+# Types that are parts of another schema, not schemas stacked on the page
+COMPONENT_SCHEMA_TYPES = frozenset((
+    "question", "answer", "listitem", "howtostep", "howtosection", "howtodirection",
+    "howtotip", "howtosupply", "howtotool", "offer", "aggregateoffer", "rating",
+    "aggregaterating", "imageobject", "entrypoint", "searchaction", "readaction",
+    "webpageelement", "speakablespecification",
+))
+ORGANIZATION_TYPES = frozenset((
+    "organization", "corporation", "localbusiness", "newsmediaorganization",
+    "educationalorganization", "ngo", "onlinebusiness", "onlinestore",
+))
+SUMMARY_HEADING_RE = re.compile(
+    r"\b(tl;?dr|summary|key takeaways?|takeaways|at a glance|in short|bottom line)\b",
+    re.IGNORECASE,
+)
+DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def iter_records(paths):
+    """Yield signal records from NDJSON or single-page JSON files ('-' for stdin)."""
+    for path in paths:
+        f = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+        try:
+            first = f.readline()
+            if first.strip() == "{":
+                # Indented single-page output
+                yield json.loads(first + f.read())
+                continue
+            if first.strip():
+                yield json.loads(first)
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+
+def _walk_schema(obj, facts):
+    """Collect organization completeness and content dates from raw JSON-LD."""
+    if isinstance(obj, list):
+        for item in obj:
+            _walk_schema(item, facts)
+        return
+    if not isinstance(obj, dict):
+        return
+    types = obj.get("@type")
+    types = types if isinstance(types, list) else [types]
+    if any(isinstance(t, str) and t.lower() in ORGANIZATION_TYPES for t in types):
+        complete = all(obj.get(key) for key in ("name", "url", "logo"))
+        facts["organization"] = max(facts["organization"], 2 if complete else 1)
+    for key in ("dateModified", "datePublished"):
+        value = obj.get(key)
+        if isinstance(value, str):
+            match = DATE_RE.match(value.strip())
+            if match:
+                facts["dates"].append(match.group())
+                if key == "datePublished":
+                    facts["published"] = True
+    for value in obj.values():
+        if isinstance(value, (dict, list)):
+            _walk_schema(value, facts)
+
+
+def page_features(record, as_of):
+    """Return the FEATURES values of one extracted signal record (as floats)."""
+    sections = record.get("bluf_analysis") or []
+    bluf = answers = qa = 0
+    for section in sections:
+        starts = bool(section.get("starts_with_answer"))
+        bluf += starts
+        answers += section.get("bluf_pattern_type", "none") not in ("none", None)
+        if starts and QUESTION_HEADING_RE.search(section.get("heading", "").strip()):
+            qa += 1
+
+    headings = questions = summary = 0
+    for heading in record.get("headings") or []:
+        if SUMMARY_HEADING_RE.search(heading.get("text", "")):
+            summary = 1
+        if heading.get("tag") in ("H2", "H3"):
+            headings += 1
+            questions += bool(heading.get("is_question"))
+
+    types = {t.lower() for t in record.get("schema_types") or [] if isinstance(t, str)}
+    stacked = len(types - COMPONENT_SCHEMA_TYPES)
+    additional = len(types & ADDITIONAL_SCHEMA_TYPES) + bool(record.get("has_speakable_schema"))
+
+    facts = {"organization": 0, "dates": [], "published": False}
+    json_ld = record.get("json_ld") or []
+    for item in json_ld:
+        _walk_schema(item.get("raw") if isinstance(item, dict) else None, facts)
+    age = float("nan")
+    if facts["dates"]:
+        try:
+            newest = datetime.date.fromisoformat(max(facts["dates"]))
+            age = max((as_of - newest).days, 0)
+        except ValueError:
+            pass
+
+    author = (record.get("entity_properties") or {}).get("author_details") or {}
+    return (
+        len(sections), bluf, answers, qa,
+        headings, questions, summary,
+        record.get("lists_count") or 0, record.get("tables_count") or 0,
+        record.get("word_count") or 0, len(json_ld),
+        bool(record.get("has_faq_schema")), "question" in types,
+        bool(record.get("has_article_schema")), bool(author.get("name")),
+        bool(author.get("url")), facts["published"],
+        additional, stacked, facts["organization"],
+        record.get("external_links") or 0, age,
+        len(record.get("meta_description") or ""),
+        bool(record.get("canonical")),
+        bool(record.get("og_title") and record.get("og_description")),
+    )
+
+
+def feature_matrix(records, as_of):
+    """Return (urls, float64 matrix with one FEATURES row per record)."""
+    urls = []
+    values = array("d")
+    for record in records:
+        urls.append(record.get("url") or record.get("file") or "")
+        values.extend(page_features(record, as_of))
+    matrix = np.frombuffer(values, dtype=np.float64) if values else np.zeros(0)
+    return urls, matrix.reshape(len(urls), len(FEATURES))
+
+
+def _ratio(numerator, denominator):
+    return np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator > 0)
+
+
+def _capped(values, points):
+    """Look up points by count, counts above the table using its last entry."""
+    table = np.asarray(points, dtype=np.float64)
+    return table[np.minimum(values, len(points) - 1).astype(np.intp)]
+
+
+def score_features(matrix):
+    """Return the (pages, CRITERIA) matrix of points for a feature matrix."""
+    f = {name: matrix[:, i] for name, i in _COLUMN.items()}
+    sections = f["h2_sections"]
+    age = f["content_age_days"]
+    freshness = np.asarray(FRESHNESS_POINTS, dtype=np.float64)[
+        np.searchsorted(FRESHNESS_EDGES, np.nan_to_num(age), side="right")
+    ]
+    meta_length = f["meta_description_length"]
+    columns = (
+        _ratio(f["bluf_sections"], sections) * 7,
+        _ratio(f["question_headings"], f["headings"]) * 5,
+        _capped(f["lists"] + f["tables"], COUNT_POINTS),
+        np.asarray(WORD_COUNT_POINTS, dtype=np.float64)[
+            np.searchsorted(WORD_COUNT_EDGES, f["word_count"], side="right")
+        ],
+        (f["json_ld"] > 0) * 6.0,
+        f["faq"] * (3 + 2 * f["faq_questions"]),
+        f["article"] * (2 + 2 * f["author"] + f["article_dates"]),
+        np.minimum(f["additional_schemas"], 5),
+        _capped(f["schema_types"], STACKING_POINTS),
+        f["author"] * (4 + 2 * f["author_url"]),
+        _capped(f["organization"], ORGANIZATION_POINTS),
+        _capped(f["external_links"], COUNT_POINTS),
+        np.where(np.isnan(age), 0.0, freshness),
+        _ratio(f["answer_sections"], sections) * 6,
+        _capped(f["qa_sections"], COUNT_POINTS),
+        f["summary_heading"] * 4,
+        (meta_length > 0) + ((meta_length >= 120) & (meta_length <= 160)) * 1.0,
+        f["canonical"],
+        f["open_graph"],
+    )
+    return np.column_stack(columns) if len(matrix) else np.zeros((0, len(CRITERIA)))
+
+
+def grades(scores):
+    """Return the letter grade of each 0-100 score."""
+    return np.asarray(GRADES)[np.searchsorted(GRADE_EDGES, scores, side="right")]
+
+
+def analyze(urls, points, top=20):
+    """Total the criterion points; return (report dict, per-page record iterator)."""
+    totals = points.sum(axis=1)
+    scores = np.round(totals / MAX_POINTS * 100, 1)
+    letters = grades(scores)
+    dimension_index = np.asarray([DIMENSIONS.index(d) for d, _, _ in CRITERIA])
+    dimensions = np.zeros((len(urls), len(DIMENSIONS)))
+    np.add.at(dimensions.T, dimension_index, points.T)
+
+    maxima = np.asarray([p for _, _, p in CRITERIA], dtype=np.float64)
+    share = points.mean(axis=0) / maxima if len(urls) else np.zeros(len(CRITERIA))
+    order = np.lexsort((np.asarray(urls, dtype=object).astype(str), scores)) if len(urls) else []
+
+    def page(i):
+        return {"url": urls[i], "score": float(scores[i]), "grade": str(letters[i])}
+
+    report = {
+        "summary": {
+            "pages": len(urls),
+            "mean_score": round(float(scores.mean()), 1) if len(urls) else None,
+            "median_score": round(float(np.median(scores)), 1) if len(urls) else None,
+            "grades": {g: int((letters == g).sum()) for g in GRADES},
+            "scored_points": MAX_POINTS,
+            "manual_criteria": [name for _, name, _ in MANUAL_CRITERIA],
+        },
+        "weakest_criteria": [
+            {"criterion": CRITERIA[i][1], "dimension": CRITERIA[i][0],
+             "mean_points": round(float(share[i] * maxima[i]), 2), "max_points": CRITERIA[i][2]}
+            for i in (np.argsort(share, kind="stable")[:5] if len(urls) else ())
+        ],
+        "lowest_scores": [page(i) for i in order[:top]],
+        "highest_scores": [page(i) for i in order[::-1][:top]],
+    }
+
+    def pages():
+        names = [name for _, name, _ in CRITERIA]
+        rows = zip(np.round(totals, 2).tolist(), np.round(dimensions, 2).tolist(),
+                   np.round(points, 2).tolist())
+        for i, (total, dimension_row, criteria_row) in enumerate(rows):
+            record = page(i)
+            record["points"] = total
+            record["dimensions"] = dict(zip(DIMENSIONS, dimension_row))
+            record["criteria"] = dict(zip(names, criteria_row))
+            yield record
+
+    return report, pages()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score extracted page signals with the AEO model")
+    parser.add_argument("inputs", nargs="+", help="Signal files: NDJSON or single-page JSON ('-' for stdin)")
+    parser.add_argument("--as-of", default=None,
+                        help="Date content freshness is measured from (YYYY-MM-DD, default: today)")
+    parser.add_argument("--top", type=int, default=20,
+                        help="Pages listed per report section (default: %(default)s)")
+    parser.add_argument("--pages-output", default=None,
+                        help="Write every page's score breakdown to this NDJSON file")
+    parser.add_argument("--compact", action="store_true", help="Output minified JSON")
+    args = parser.parse_args()
+
+    if np is None:
+        print(json.dumps({"error": "aeo_score.py needs numpy (pip install numpy)"}), file=sys.stderr)
+        sys.exit(1)
+    try:
+        as_of = datetime.date.fromisoformat(args.as_of) if args.as_of else datetime.date.today()
+    except ValueError:
+        print(json.dumps({"error": f"Invalid --as-of date: {args.as_of}"}), file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        urls, matrix = feature_matrix(iter_records(args.inputs), as_of)
+    except FileNotFoundError as e:
+        print(json.dumps({"error": f"File not found: {e.filename}"}), file=sys.stderr)
+        sys.exit(1)
+    except json.JSONDecodeError as e:
+        print(json.dumps({"error": f"Invalid JSON input: {e}"}), file=sys.stderr)
+        sys.exit(1)
+
+    report, pages = analyze(urls, score_features(matrix), top=args.top)
+    if args.pages_output:
+        with open(args.pages_output, "w", encoding="utf-8") as f:
+            for record in pages:
+                f.write(json.dumps(record, ensure_ascii=False))
+                f.write("\n")
+
+    print(json.dumps(report, indent=None if args.compact else 2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
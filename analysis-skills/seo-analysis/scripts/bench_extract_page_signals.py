@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""Benchmark and regression suite for extract_page_signals.py.
+
+Usage:
+    python3 bench_extract_page_signals.py                         # all synthetic cases
+    python3 bench_extract_page_signals.py --quick --output bench.json
+    python3 bench_extract_page_signals.py --cases blog_small,jsonld_huge --repeat 5
+    python3 bench_extract_page_signals.py --pages ./seo/pages/      # saved pages as an extra case
+    python3 bench_extract_page_signals.py --check-golden            # prove output is unchanged
+    python3 bench_extract_page_signals.py --check-golden --parser lxml   # one backend only
+    git show HEAD~1:analysis-skills/seo-analysis/scripts/extract_page_signals.py > /tmp/old.py
+    python3 bench_extract_page_signals.py --baseline /tmp/old.py
+
+Pages come from synthetic_pages.py (deterministic) and are generated in
+memory before timing. For each case the report gives pages/sec, MB/sec, the
+time split between parsing (feed) and get_results, and the peak RSS of a
+separate process that extracts the case. Results are written as sorted,
+indented JSON so two runs can be diffed.
+
+--check-golden compares a SHA-256 of every synthetic page's output (parsed
+whole and in small streamed chunks) against benchmark_golden.json and exits
+1 on any difference; --update-golden rewrites that file after an
+intentional output change (bump EXTRACTOR_VERSION in extract_page_signals.py
+too). The file holds digests for each parser backend, so a change to either
+backend's output is caught, and every installed backend is checked unless
+--parser names one. The report also lists the pages whose signals differ
+between backends (the markup_quirks, browser_serialized and malformed cases
+cover markup where they can); a change to that list means a backend started
+or stopped agreeing with html.parser.
+
+--parser selects the backend that is timed (default: stdlib; --baseline
+copies always use stdlib).
+
+Dependencies: Python 3 stdlib only (no pip install required).
+              Optional: lxml, to time and check the lxml backend.
+"""
+
+import argparse
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPT_DIR)
+
+import extract_page_signals  # noqa: E402
+import synthetic_pages  # noqa: E402
+
+GOLDEN_FILE = os.path.join(SCRIPT_DIR, "benchmark_golden.json")
+QUICK_DIVISOR = 10
+# Small chunks so --check-golden exercises chunk boundaries in feed_stream
+STREAM_CHECK_CHUNK = 4093
+
+
+def load_extractor(path):
+    """Import an extract_page_signals.py copy from a file path."""
+    spec = importlib.util.spec_from_file_location("baseline_extract_page_signals", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def case_pages(case, quick=False):
+    """Return [(name, html, url)] for a synthetic case."""
+    count = synthetic_pages.CASES[case][1]
+    if quick:
+        count = max(1, count // QUICK_DIVISOR)
+    return [(name, html, synthetic_pages.page_url(name))
+            for name, html in synthetic_pages.iter_case_pages(case, count)]
+
+
+def file_pages(paths):
+    """Return [(name, html, url)] for saved HTML files, directories, globs or archives."""
+    pages = []
+    for source, url in extract_page_signals.iter_batch_inputs(paths, None):
+        if isinstance(source, extract_page_signals.BrokenArchive):
+            print(json.dumps({"error": source.error}), file=sys.stderr)
+            continue
+        if isinstance(source, extract_page_signals.ArchivePage):
+            html = source.read().decode(source.encoding, errors="replace")
+            pages.append((f"{source.archive}#{source.record}", html, url))
+            continue
+        with open(source, "r", encoding="utf-8", errors="replace") as f:
+            pages.append((source, f.read(), url))
+    return pages
+
+
+def output_digest(results):
+    return hashlib.sha256(json.dumps(results, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def run_once(module, pages, backend="stdlib"):
+    """Extract all pages once; return (feed seconds, get_results seconds)."""
+    feed_s = results_s = 0.0
+    clock = time.perf_counter
+    for _, html, url in pages:
+        t0 = clock()
+        extractor = module.SEOSignalExtractor()
+        if backend == "stdlib":
+            extractor.feed(html)
+        else:
+            module.feed_html(extractor, html, backend)
+        t1 = clock()
+        extractor.get_results(url=url)
+        t2 = clock()
+        feed_s += t1 - t0
+        results_s += t2 - t1
+    return feed_s, results_s
+
+
+def time_case(module, pages, repeat, backend="stdlib"):
+    """Time `repeat` passes and report the fastest one."""
+    total_bytes = sum(len(html.encode("utf-8")) for _, html, _ in pages)
+    best = None
+    for _ in range(repeat):
+        feed_s, results_s = run_once(module, pages, backend)
+        if best is None or feed_s + results_s < sum(best):
+            best = (feed_s, results_s)
+    feed_s, results_s = best
+    total_s = feed_s + results_s
+    return {
+        "pages": len(pages),
+        "mb": round(total_bytes / 1e6, 3),
+        "feed_s": round(feed_s, 4),
+        "get_results_s": round(results_s, 4),
+        "pages_per_sec": round(len(pages) / total_s, 1) if total_s else None,
+        "mb_per_sec": round(total_bytes / 1e6 / total_s, 2) if total_s else None,
+    }
+
+
+def _max_rss_mb():
+    import resource
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def _proc_status_mb(field):
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak_rss():
+    """Reset the kernel's peak RSS mark (Linux); return False if unsupported."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def rss_probe(case, quick, baseline, backend="stdlib"):
+    """Child process entry: extract one case and print RSS before/after as JSON.
+
+    Page generation has its own memory peak, so on Linux the peak mark is
+    reset after generating and the extraction peak is read from VmHWM.
+    Elsewhere the process-lifetime maximum is reported.
+    """
+    import gc
+
+    module = load_extractor(baseline) if baseline else extract_page_signals
+    pages = case_pages(case, quick)
+    gc.collect()
+    if _reset_peak_rss():
+        before = _proc_status_mb("VmRSS")
+        run_once(module, pages, backend)
+        peak = _proc_status_mb("VmHWM")
+    else:
+        before = _max_rss_mb()
+        run_once(module, pages, backend)
+        peak = _max_rss_mb()
+    print(json.dumps({"rss_before_mb": round(before, 1), "peak_rss_mb": round(peak, 1)}))
+
+
+def measure_rss(case, quick, baseline=None, backend="stdlib"):
+    """Peak RSS of a fresh process extracting a case (None if unavailable)."""
+    if sys.platform == "win32":
+        return None
+    cmd = [sys.executable, os.path.abspath(__file__), "--rss-probe", case, "--parser", backend]
+    if quick:
+        cmd.append("--quick")
+    if baseline:
+        cmd += ["--baseline", baseline]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return None
+    probe = json.loads(proc.stdout)
+    return {
+        "peak_rss_mb": probe["peak_rss_mb"],
+        # Growth over the RSS with the generated pages already in memory
+        "extract_rss_growth_mb": round(probe["peak_rss_mb"] - probe["rss_before_mb"], 1),
+    }
+
+
+def installed_backends():
+    """Parser backends that can run here."""
+    backends = []
+    for backend in extract_page_signals.PARSER_BACKENDS:
+        try:
+            backends.append(extract_page_signals.resolve_backend(backend))
+        except ValueError:
+            continue
+    return backends
+
+
+def golden_digests(cases, backend="stdlib"):
+    """Output digest per synthetic page (full case sizes) for one backend."""
+    digests = {}
+    for case in cases:
+        for name, html, url in case_pages(case):
+            digests[name] = output_digest(
+                extract_page_signals.extract_signals(html, url=url, backend=backend)
+            )
+    return digests
+
+
+def load_golden():
+    with open(GOLDEN_FILE, "r", encoding="utf-8") as f:
+        golden = json.load(f)
+    if golden.get("generator_version") != synthetic_pages.GENERATOR_VERSION:
+        raise SystemExit(json.dumps({"error": "benchmark_golden.json was built with another "
+                                              "synthetic_pages.py version; run --update-golden"}))
+    return golden
+
+
+def backend_differences(golden):
+    """Page names whose golden digests differ between the stdlib and other backends."""
+    parsers = golden["parsers"]
+    reference = parsers.get("stdlib", {})
+    return {
+        backend: sorted(name for name, digest in digests.items() if reference.get(name) != digest)
+        for backend, digests in parsers.items() if backend != "stdlib"
+    }
+
+
+def check_golden(cases, backend="stdlib", golden=None):
+    """Compare one backend's outputs with benchmark_golden.json; return mismatching page names."""
+    golden = golden or load_golden()
+    expected_digests = golden["parsers"].get(backend)
+    if expected_digests is None:
+        raise SystemExit(json.dumps({"error": f"benchmark_golden.json has no {backend} digests; "
+                                              f"run --update-golden with {backend} installed"}))
+    mismatches = set()
+    for name, html, url in (page for case in cases for page in case_pages(case)):
+        expected = expected_digests.get(name)
+        if output_digest(extract_page_signals.extract_signals(html, url=url, backend=backend)) != expected:
+            mismatches.add(name)
+        # The chunked streaming path must produce the same output
+        stream = io.StringIO(html)
+        streamed = extract_page_signals.extract_signals_from_stream(
+            stream, url=url, chunk_size=STREAM_CHECK_CHUNK, backend=backend
+        )
+        if output_digest(streamed) != expected:
+            mismatches.add(name + " (streamed)")
+    return sorted(mismatches)
+
+
+def update_golden(backends):
+    """Rewrite the digests of the given backends; return the number written."""
+    parsers = {}
+    if os.path.exists(GOLDEN_FILE):
+        with open(GOLDEN_FILE, "r", encoding="utf-8") as f:
+            golden = json.load(f)
+        if golden.get("generator_version") == synthetic_pages.GENERATOR_VERSION:
+            # Keep the digests of backends not installed here
+            parsers = golden.get("parsers", {})
+    for backend in backends:
+        parsers[backend] = golden_digests(list(synthetic_pages.CASES), backend)
+    with open(GOLDEN_FILE, "w", encoding="utf-8") as f:
+        json.dump({
+            "generator_version": synthetic_pages.GENERATOR_VERSION,
+            "extractor_version": extract_page_signals.EXTRACTOR_VERSION,
+            "parsers": parsers,
+        }, f, indent=2, sort_keys=True)
+        f.write("\n")
+    return sum(len(parsers[backend]) for backend in backends)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the SEO signal extractor and check it against golden outputs",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--cases", default=None,
+                        help=f"Comma-separated synthetic cases (default: {','.join(synthetic_pages.CASES)})")
+    parser.add_argument("--pages", nargs="+", default=None,
+                        help="Saved HTML files, directories, globs or WARC/tar archives to add as the 'pages' case")
+    parser.add_argument("--quick", action="store_true",
+                        help=f"Use 1/{QUICK_DIVISOR} of each case's pages")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed passes per case (best is reported)")
+    parser.add_argument("--no-rss", action="store_true", help="Skip the per-case peak RSS subprocess")
+    parser.add_argument("--baseline", help="Another extract_page_signals.py to compare against")
+    parser.add_argument("--parser", choices=extract_page_signals.PARSER_CHOICES, default=None,
+                        help="Parser backend to benchmark (default: stdlib), or the only one "
+                             "to check and update (default: every installed backend)")
+    parser.add_argument("--output", help="Write the JSON report to this file as well as stdout")
+    parser.add_argument("--check-golden", action="store_true",
+                        help="Verify outputs against benchmark_golden.json instead of benchmarking")
+    parser.add_argument("--update-golden", action="store_true",
+                        help="Rewrite benchmark_golden.json digests from the current extractor")
+    parser.add_argument("--rss-probe", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    try:
+        backend = extract_page_signals.resolve_backend(args.parser or "stdlib")
+    except ValueError as e:
+        print(json.dumps({"error": str(e)}), file=sys.stderr)
+        sys.exit(1)
+
+    if args.rss_probe:
+        rss_probe(args.rss_probe, args.quick, args.baseline, "stdlib" if args.baseline else backend)
+        return
+
+    cases = args.cases.split(",") if args.cases else list(synthetic_pages.CASES)
+    unknown = [c for c in cases if c not in synthetic_pages.CASES]
+    if unknown:
+        print(json.dumps({"error": f"Unknown cases: {', '.join(unknown)}"}), file=sys.stderr)
+        sys.exit(1)
+
+    backends = [backend] if args.parser else installed_backends()
+    if args.update_golden:
+        count = update_golden(backends)
+        print(f"Wrote {count} {'/'.join(backends)} digests to {GOLDEN_FILE}", file=sys.stderr)
+        return
+    if args.check_golden:
+        golden = load_golden()
+        mismatches = {b: check_golden(cases, b, golden) for b in backends}
+        print(json.dumps({
+            "checked_cases": cases,
+            "parsers": backends,
+            "mismatches": mismatches,
+            "backend_differences": backend_differences(golden),
+        }, indent=2))
+        sys.exit(1 if any(mismatches.values()) else 0)
+
+    baseline = load_extractor(args.baseline) if args.baseline else None
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "extractor_version": extract_page_signals.EXTRACTOR_VERSION,
+        "generator_version": synthetic_pages.GENERATOR_VERSION,
+        "parser": backend,
+        "quick": args.quick,
+        "repeat": args.repeat,
+        "cases": {},
+    }
+
+    case_inputs = [(case, lambda case=case: case_pages(case, args.quick)) for case in cases]
+    if args.pages:
+        case_inputs.append(("pages", lambda: file_pages(args.pages)))
+
+    for case, load in case_inputs:
+        pages = load()
+        if not pages:
+            continue
+        result = time_case(extract_page_signals, pages, args.repeat, backend)
+        if not args.no_rss and case != "pages":
+            result.update(measure_rss(case, args.quick, backend=backend) or {})
+        if baseline is not None:
+            base = time_case(baseline, pages, args.repeat)
+            result["baseline"] = base
+            result["speedup"] = round(
+                (base["feed_s"] + base["get_results_s"]) / (result["feed_s"] + result["get_results_s"]), 2
+            )
+            result["identical_output"] = all(
+                output_digest(extract_page_signals.extract_signals(html, url=url, backend=backend))
+                == output_digest(_baseline_results(baseline, html, url))
+                for _, html, url in pages
+            )
+        report["cases"][case] = result
+        print(f"{case}: {result['pages_per_sec']} pages/sec, {result['mb_per_sec']} MB/sec",
+              file=sys.stderr)
+
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+def _baseline_results(module, html, url):
+    extractor = module.SEOSignalExtractor()
+    extractor.feed(html)
+    return extractor.get_results(url=url)
+
+
+if __name__ == "__main__":
+    main()
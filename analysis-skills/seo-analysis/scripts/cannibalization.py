@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""Detect keyword cannibalization in GSC (query, page) rows.
+
+Usage:
+    python3 cannibalization.py gsc_query_page_*.json
+    python3 cannibalization.py gsc.json --signals signals.ndjson --min-impressions 100 --top 50
+    python3 cannibalization.py gsc.json --queries-output cannibalized.ndjson
+
+Implements the Cannibalization Detection Algorithm in
+references/gsc-query-patterns.md. Input is Search Console query_analytics
+output for ["query", "page"], as read by ctr_opportunities.py (JSON
+responses with "rows", or NDJSON rows); rows with extra dimensions are
+summed per (query, page), position weighted by impressions.
+
+The (query, page) pairs are sorted once by query, clicks and impressions,
+and every per-query figure is a segmented reduction over that order, so
+there is no Python loop per query. For each query with 2+ pages:
+    primary page        most clicks (then impressions)
+    severity            reference levels from the top 2 pages:
+                        high    impressions within 30% of each other
+                        medium  secondary page > 50 impressions
+                        low     otherwise
+    impression_entropy  entropy of the pages' impression shares,
+                        normalized to 0-1 (1 = evenly split)
+    position_spread     best to worst page position
+    split_score         impression_entropy / (1 + position_spread / 10):
+                        an even split between pages ranking close together
+                        scores near 1
+    contested_impressions  impressions not going to the primary page
+Queries are ranked by severity, then contested impressions.
+
+--signals joins titles and H1s from extract_page_signals.py or
+crawl_site.py NDJSON (fields url,title,headings) onto the competing pages,
+matching URLs without fragment or trailing slash.
+
+Output: JSON report to stdout (summary, top cannibalized queries, pages
+competing for the most queries); --queries-output writes every
+cannibalized query, ranked, as NDJSON.
+Dependencies: numpy (pip install numpy).
+"""
+
+import argparse
+import json
+import os
+import sys
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ctr_opportunities import (  # noqa: E402
+    DEFAULT_DIMENSIONS, GscRows, iter_gsc_rows, iter_json_records,
+)
+
+SEVERITIES = ("high", "medium", "low")
+# Top 2 pages within this impression ratio are a high-severity split
+SIMILAR_IMPRESSIONS_RATIO = 0.7
+# Secondary page impressions above this are medium severity
+MEDIUM_IMPRESSIONS = 50
+# Position spread that halves the split score (one SERP page)
+POSITION_SPREAD_SCALE = 10.0
+
+
+def page_key(url):
+    """Return the URL used to match GSC pages to extracted signals."""
+    url = url.split("#", 1)[0]
+    if url.endswith("/") and url.count("/") > 3:
+        url = url.rstrip("/")
+    return url
+
+
+def load_signals(paths):
+    """Return {page key: (title, h1)} from extract_page_signals/crawl_site records."""
+    signals = {}
+    for record in iter_json_records(paths):
+        url = record.get("url")
+        if not url or record.get("error"):
+            continue
+        h1 = next((h.get("text", "") for h in record.get("headings") or ()
+                   if h.get("tag") == "H1"), None)
+        signals[page_key(url)] = (record.get("title"), h1)
+    return signals
+
+
+def find_cannibalization(table, min_impressions=0):
+    """Group (query, page) pairs by query; return a dict of arrays.
+
+    Pair arrays are sorted by query, most clicks first. Per-query arrays
+    ("starts"/"counts" into the pair arrays, severity, ...) cover queries
+    with 2+ pages and at least min_impressions, in ranked order.
+    """
+    n_pages = max(len(table.pages), 1)
+    keys = (np.frombuffer(table.query_ids, dtype=np.int64) * n_pages
+            + np.frombuffer(table.page_ids, dtype=np.int64))
+    impressions = np.frombuffer(table.impressions, dtype=np.float64)
+    positions = np.frombuffer(table.positions, dtype=np.float64)
+    keys, slots = np.unique(keys, return_inverse=True)
+    n = len(keys)
+    pair_clicks = np.bincount(slots, weights=np.frombuffer(table.clicks, dtype=np.float64),
+                              minlength=n)
+    pair_impressions = np.bincount(slots, weights=impressions, minlength=n)
+    weighted = np.bincount(slots, weights=positions * impressions, minlength=n)
+    pair_positions = np.divide(weighted, pair_impressions, out=np.zeros(n),
+                               where=pair_impressions > 0)
+
+    # Pages without impressions do not split anything
+    shown = np.flatnonzero(pair_impressions > 0)
+    query_ids, page_ids = keys[shown] // n_pages, keys[shown] % n_pages
+    order = np.lexsort((-pair_impressions[shown], -pair_clicks[shown], query_ids))
+    query_ids, page_ids = query_ids[order], page_ids[order]
+    clicks = pair_clicks[shown][order]
+    impressions = pair_impressions[shown][order]
+    positions = pair_positions[shown][order]
+
+    if len(query_ids):
+        starts = np.flatnonzero(np.r_[True, query_ids[1:] != query_ids[:-1]])
+        counts = np.diff(np.r_[starts, len(query_ids)])
+        totals = np.add.reduceat(impressions, starts)
+        share = impressions / np.repeat(totals, counts)
+        # Every page has impressions, so every share is > 0
+        entropy = np.add.reduceat(-share * np.log(share), starts)
+        spread = np.maximum.reduceat(positions, starts) - np.minimum.reduceat(positions, starts)
+    else:
+        starts = counts = np.zeros(0, dtype=np.int64)
+        totals = share = entropy = spread = np.zeros(0)
+    queries = len(starts)
+
+    groups = np.flatnonzero((counts >= 2) & (totals >= min_impressions))
+    starts, counts, totals = starts[groups], counts[groups], totals[groups]
+    entropy = entropy[groups] / np.log(np.maximum(counts, 2))
+    spread = spread[groups]
+    primary, secondary = impressions[starts], impressions[starts + 1]
+    similar = (np.minimum(primary, secondary)
+               >= SIMILAR_IMPRESSIONS_RATIO * np.maximum(primary, secondary))
+    severity = np.where(similar, 0, np.where(secondary > MEDIUM_IMPRESSIONS, 1, 2))
+    contested = totals - primary
+    ranked = np.lexsort((-contested, severity))
+    return {
+        "queries": queries,
+        "query_ids": query_ids,
+        "page_ids": page_ids,
+        "clicks": clicks,
+        "impressions": impressions,
+        "share": share,
+        "positions": positions,
+        "starts": starts[ranked],
+        "counts": counts[ranked],
+        "totals": totals[ranked],
+        "severity": severity[ranked],
+        "entropy": entropy[ranked],
+        "spread": spread[ranked],
+        "split_score": entropy[ranked] / (1 + spread[ranked] / POSITION_SPREAD_SCALE),
+        "contested": contested[ranked],
+    }
+
+
+def analyze(table, signals=None, min_impressions=0, top=20):
+    """Find cannibalized queries; return (report dict, iterator of ranked query records)."""
+    found = find_cannibalization(table, min_impressions)
+    signals = signals or {}
+    queries = list(table.queries)
+    pages = list(table.pages)
+    query_ids, page_ids = found["query_ids"], found["page_ids"]
+    starts, counts = found["starts"], found["counts"]
+
+    def page_record(j, primary):
+        url = pages[page_ids[j]]
+        record = {
+            "page": url,
+            "primary": primary,
+            "clicks": int(found["clicks"][j]),
+            "impressions": int(found["impressions"][j]),
+            "impression_share": round(float(found["share"][j]), 4),
+            "position": round(float(found["positions"][j]), 1),
+        }
+        if signals:
+            title, h1 = signals.get(page_key(url), (None, None))
+            record["title"] = title
+            record["h1"] = h1
+        return record
+
+    def record(g):
+        start, count = int(starts[g]), int(counts[g])
+        return {
+            "query": queries[query_ids[start]],
+            "severity": SEVERITIES[found["severity"][g]],
+            "pages": count,
+            "impressions": int(found["totals"][g]),
+            "contested_impressions": int(found["contested"][g]),
+            "impression_entropy": round(float(found["entropy"][g]), 4),
+            "position_spread": round(float(found["spread"][g]), 1),
+            "split_score": round(float(found["split_score"][g]), 4),
+            "competing_pages": [page_record(j, j == start) for j in range(start, start + count)],
+        }
+
+    # Pages by number of cannibalized queries they compete in
+    members = np.repeat(starts, counts) + (np.arange(counts.sum())
+                                           - np.repeat(np.cumsum(counts) - counts, counts))
+    page_counts = np.bincount(page_ids[members], minlength=len(pages))
+    page_primary = np.bincount(page_ids[starts], minlength=len(pages))
+    competing = np.flatnonzero(page_counts)
+    competing = competing[np.lexsort((competing, -page_counts[competing]))][:top]
+
+    report = {
+        "summary": {
+            "rows": len(table),
+            "queries": found["queries"],
+            "cannibalized_queries": len(starts),
+            "by_severity": {s: int((found["severity"] == i).sum())
+                            for i, s in enumerate(SEVERITIES)},
+            "pages_involved": int(np.count_nonzero(page_counts)),
+            "contested_impressions": int(found["contested"].sum()),
+        },
+        "top_queries": [record(g) for g in range(min(top, len(starts)))],
+        "competing_pages": [
+            {"page": pages[p], "queries": int(page_counts[p]), "primary_for": int(page_primary[p])}
+            for p in competing
+        ],
+    }
+
+    def ranked():
+        for g in range(len(starts)):
+            yield record(g)
+
+    return report, ranked()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Detect keyword cannibalization in GSC rows")
+    parser.add_argument("inputs", nargs="+", help="GSC JSON responses or NDJSON rows ('-' for stdin)")
+    parser.add_argument("--signals", nargs="*", default=[],
+                        help="extract_page_signals.py/crawl_site.py NDJSON for titles and H1s")
+    parser.add_argument("--dimensions", default=",".join(DEFAULT_DIMENSIONS),
+                        help="Names of the row 'keys', in request order (default: %(default)s)")
+    parser.add_argument("--min-impressions", type=float, default=0,
+                        help="Ignore queries with fewer impressions (default: %(default)s)")
+    parser.add_argument("--top", type=int, default=20,
+                        help="Queries and pages listed in the report (default: %(default)s)")
+    parser.add_argument("--queries-output", default=None,
+                        help="Write every cannibalized query, ranked, to this NDJSON file")
+    parser.add_argument("--compact", action="store_true", help="Output minified JSON")
+    args = parser.parse_args()
+
+    if np is None:
+        print(json.dumps({"error": "cannibalization.py needs numpy (pip install numpy)"}),
+              file=sys.stderr)
+        sys.exit(1)
+
+    dimensions = tuple(d.strip() for d in args.dimensions.split(",") if d.strip())
+    if "query" not in dimensions or "page" not in dimensions:
+        print(json.dumps({"error": "--dimensions must include query and page"}), file=sys.stderr)
+        sys.exit(1)
+    try:
+        signals = load_signals(args.signals)
+        table = GscRows.from_rows(iter_gsc_rows(args.inputs), dimensions)
+    except FileNotFoundError as e:
+        print(json.dumps({"error": f"File not found: {e.filename}"}), file=sys.stderr)
+        sys.exit(1)
+    except json.JSONDecodeError as e:
+        print(json.dumps({"error": f"Invalid JSON input: {e}"}), file=sys.stderr)
+        sys.exit(1)
+    except (ValueError, AttributeError, TypeError, IndexError) as e:
+        print(json.dumps({"error": f"Invalid GSC row or signal record: {e}"}), file=sys.stderr)
+        sys.exit(1)
+
+    report, queries = analyze(table, signals, min_impressions=args.min_impressions, top=args.top)
+    if args.queries_output:
+        with open(args.queries_output, "w", encoding="utf-8") as f:
+            for record in queries:
+                f.write(json.dumps(record, ensure_ascii=False))
+                f.write("\n")
+
+    print(json.dumps(report, indent=None if args.compact else 2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,729 @@
+#!/usr/bin/env python3
+"""Crawl a site and extract SEO/AEO signals from every page.
+
+Usage:
+    python3 crawl_site.py --sitemap https://example.com/sitemap.xml --output signals.ndjson
+    python3 crawl_site.py --seeds urls.txt --fields title,word_count,schema_types
+    python3 crawl_site.py https://example.com/ https://example.com/about --per-host 2 --delay 0.5
+    python3 crawl_site.py --sitemap https://example.com/sitemap.xml --state crawl_state.json
+
+URLs are streamed from sitemaps (parsed incrementally, following sitemap
+indexes and .gz sitemaps), a seed file (one URL per line, '-' for stdin) or
+the command line. Pages are fetched concurrently over pooled keep-alive
+connections, with per-host connection and delay limits, and bodies are fed
+to the extractor in memory. With --state, ETag/Last-Modified validators are
+remembered and the next crawl sends conditional GETs; a 304 reuses the
+cached result from extract_page_signals.py's result cache.
+
+To try it locally, serve a directory of saved pages:
+    python3 -m http.server 8000 -d ./seo/site &
+    python3 crawl_site.py http://127.0.0.1:8000/index.html http://127.0.0.1:8000/about.html
+
+Output: one NDJSON record per page (url, status, not_modified, then the
+signals from extract_page_signals.py, or an error). A summary goes to stderr.
+Dependencies: Python 3 stdlib only (no pip install required).
+              Optional: lxml for the faster parser backend (--parser).
+"""
+
+import argparse
+import asyncio
+import codecs
+import json
+import os
+import ssl
+import sys
+import time
+import zlib
+from urllib.parse import urljoin, urlsplit
+from xml.etree.ElementTree import XMLPullParser
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from extract_page_signals import (  # noqa: E402
+    DEFAULT_CACHE_DIR,
+    DEFAULT_CACHE_MAX_MB,
+    DEFAULT_PARSER,
+    PARSER_CHOICES,
+    SignalCache,
+    cache_key_fields,
+    extract_bytes_signals,
+    resolve_backend,
+)
+
+USER_AGENT = "td-skills-seo-crawler/1.0"
+MAX_REDIRECTS = 5
+MAX_PAGE_BYTES = 20 * 1024 * 1024
+READ_SIZE = 64 * 1024
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+
+
+class FetchError(Exception):
+    """A request failed (network error, bad response or size limit)."""
+
+
+class _StaleConnection(Exception):
+    """A pooled keep-alive connection was closed by the server."""
+
+
+class HostPool:
+    """Idle keep-alive connections and politeness limits for one host."""
+
+    def __init__(self, per_host, delay):
+        self.idle = []
+        self.slots = asyncio.Semaphore(per_host)
+        self.delay = delay
+        self._next_start = 0.0
+        self._turn = asyncio.Lock()
+
+    async def wait_turn(self):
+        """Space request starts on this host at least `delay` seconds apart."""
+        if self.delay <= 0:
+            return
+        async with self._turn:
+            loop = asyncio.get_running_loop()
+            wait = self._next_start - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._next_start = loop.time() + self.delay
+
+
+class Response:
+    """Status and headers of a response whose body is read on demand."""
+
+    def __init__(self, url, status, headers, body):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self._body = body
+
+    async def iter_body(self):
+        """Yield decoded (de-gzipped) body chunks."""
+        async for chunk in self._body:
+            yield chunk
+
+    async def read(self, limit=MAX_PAGE_BYTES):
+        parts = []
+        size = 0
+        async for chunk in self._body:
+            size += len(chunk)
+            if size > limit:
+                raise FetchError(f"Body larger than {limit} bytes")
+            parts.append(chunk)
+        return b"".join(parts)
+
+
+class Fetcher:
+    """Minimal asyncio HTTP/1.1 client with per-host keep-alive pools."""
+
+    def __init__(self, per_host=8, delay=0.0, timeout=20.0, user_agent=USER_AGENT):
+        self.per_host = per_host
+        self.delay = delay
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self._pools = {}
+        self._ssl = ssl.create_default_context()
+
+    def _pool(self, origin):
+        pool = self._pools.get(origin)
+        if pool is None:
+            pool = self._pools[origin] = HostPool(self.per_host, self.delay)
+        return pool
+
+    def open(self, url, headers=None):
+        """Return an async context manager yielding the Response for url.
+
+        Redirects are followed; the connection goes back to its pool once the
+        body has been read, or is closed if the block exits early.
+        """
+        return _Exchange(self, url, headers or {})
+
+    async def close(self):
+        for pool in self._pools.values():
+            for _, writer in pool.idle:
+                writer.close()
+            pool.idle.clear()
+
+    async def _connect(self, origin):
+        scheme, host, port = origin
+        try:
+            return await asyncio.wait_for(
+                asyncio.open_connection(
+                    host, port, ssl=self._ssl if scheme == "https" else None,
+                    server_hostname=host if scheme == "https" else None,
+                ),
+                self.timeout,
+            )
+        except (OSError, asyncio.TimeoutError, ssl.SSLError) as e:
+            raise FetchError(f"Connect to {host}:{port} failed: {e or type(e).__name__}")
+
+    async def _send(self, url, headers):
+        """Send one request and read the response head.
+
+        Returns (pool, reader, writer, status, headers, keep_alive). The
+        host slot acquired here is released by _Exchange._release().
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise FetchError(f"Unsupported URL: {url}")
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        origin = (parts.scheme, parts.hostname, port)
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        host_header = parts.netloc.rpartition("@")[2]
+
+        lines = [
+            f"GET {target} HTTP/1.1",
+            f"Host: {host_header}",
+            f"User-Agent: {self.user_agent}",
+            "Accept: text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+            "Accept-Encoding: gzip, deflate",
+            "Connection: keep-alive",
+        ]
+        lines.extend(f"{k}: {v}" for k, v in headers.items())
+        request = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+        pool = self._pool(origin)
+        await pool.slots.acquire()
+        try:
+            await pool.wait_turn()
+            # A reused connection may have been closed by the server; retry once on a new one
+            while True:
+                reused = bool(pool.idle)
+                reader, writer = pool.idle.pop() if reused else await self._connect(origin)
+                try:
+                    writer.write(request)
+                    await writer.drain()
+                    status, resp_headers, keep_alive = await asyncio.wait_for(
+                        self._read_head(reader), self.timeout
+                    )
+                    return pool, reader, writer, status, resp_headers, keep_alive
+                except (_StaleConnection, ConnectionError) as e:
+                    writer.close()
+                    if not reused:
+                        raise FetchError(f"Connection closed by {origin[1]}: {e}")
+                except (OSError, asyncio.TimeoutError, ValueError) as e:
+                    writer.close()
+                    raise FetchError(f"Request to {url} failed: {e or type(e).__name__}")
+        except BaseException:
+            pool.slots.release()
+            raise
+
+    @staticmethod
+    async def _read_head(reader):
+        status_line = await reader.readline()
+        if not status_line:
+            raise _StaleConnection("no status line")
+        version, _, rest = status_line.decode("latin-1").strip().partition(" ")
+        status = int(rest.split(" ", 1)[0])
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        connection = headers.get("connection", "").lower()
+        if version == "HTTP/1.0":
+            keep_alive = "keep-alive" in connection
+        else:
+            keep_alive = "close" not in connection
+        return status, headers, keep_alive
+
+    async def _body(self, reader, status, headers):
+        """Yield raw body chunks; returns normally only if the body ended cleanly."""
+        if status in (204, 304) or 100 <= status < 200:
+            return
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            while True:
+                size_line = await asyncio.wait_for(reader.readline(), self.timeout)
+                if not size_line:
+                    raise FetchError("Connection closed inside chunked body")
+                size = int(size_line.split(b";", 1)[0].strip() or b"0", 16)
+                if size == 0:
+                    while (await asyncio.wait_for(reader.readline(), self.timeout)) not in (b"\r\n", b"\n", b""):
+                        pass
+                    return
+                data = await asyncio.wait_for(reader.readexactly(size), self.timeout)
+                await asyncio.wait_for(reader.readexactly(2), self.timeout)
+                yield data
+        elif "content-length" in headers:
+            remaining = int(headers["content-length"])
+            while remaining > 0:
+                data = await asyncio.wait_for(reader.read(min(remaining, READ_SIZE)), self.timeout)
+                if not data:
+                    raise FetchError("Connection closed before end of body")
+                remaining -= len(data)
+                yield data
+        else:
+            # Body runs until the server closes the connection
+            while True:
+                data = await asyncio.wait_for(reader.read(READ_SIZE), self.timeout)
+                if not data:
+                    return
+                yield data
+
+
+class _Exchange:
+    """Async context manager behind Fetcher.open()."""
+
+    def __init__(self, fetcher, url, headers):
+        self.fetcher = fetcher
+        self.url = url
+        self.headers = headers
+        self._conn = None
+        self._done = False
+
+    async def __aenter__(self):
+        url = self.url
+        try:
+            for _ in range(MAX_REDIRECTS + 1):
+                pool, reader, writer, status, headers, keep_alive = await self.fetcher._send(url, self.headers)
+                no_body = status in (204, 304) or 100 <= status < 200
+                # Only a delimited body leaves the connection reusable
+                reusable = keep_alive and (
+                    no_body
+                    or "content-length" in headers
+                    or "chunked" in headers.get("transfer-encoding", "").lower()
+                )
+                self._conn = (pool, reader, writer, reusable)
+                self._done = no_body
+                location = headers.get("location")
+                if status in REDIRECT_STATUSES and location:
+                    async for _ in self._raw_body(status, headers):
+                        pass
+                    self._release()
+                    url = urljoin(url, location)
+                    continue
+                return Response(url, status, headers, self._decoded_body(status, headers))
+        except BaseException:
+            self._release()
+            raise
+        raise FetchError(f"Too many redirects from {self.url}")
+
+    async def __aexit__(self, *exc):
+        self._release()
+
+    async def _raw_body(self, status, headers):
+        reader = self._conn[1]
+        async for chunk in self.fetcher._body(reader, status, headers):
+            yield chunk
+        self._done = True
+
+    async def _decoded_body(self, status, headers):
+        encoding = headers.get("content-encoding", "").lower()
+        decoder = None
+        if encoding in ("gzip", "x-gzip"):
+            decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif encoding == "deflate":
+            decoder = zlib.decompressobj()
+        try:
+            async for chunk in self._raw_body(status, headers):
+                yield decoder.decompress(chunk) if decoder else chunk
+            if decoder:
+                tail = decoder.flush()
+                if tail:
+                    yield tail
+        except zlib.error as e:
+            raise FetchError(f"Bad {encoding} body: {e}")
+
+    def _release(self):
+        """Return the connection to its pool if the body was fully read, else close it."""
+        if self._conn is None:
+            return
+        pool, reader, writer, reusable = self._conn
+        self._conn = None
+        if reusable and self._done and not writer.is_closing():
+            pool.idle.append((reader, writer))
+        else:
+            writer.close()
+        self._done = False
+        pool.slots.release()
+
+
+async def iter_sitemap_urls(fetcher, sitemap_urls):
+    """Yield page URLs from sitemaps, following sitemap indexes depth-first.
+
+    Each sitemap is parsed with XMLPullParser as its body streams in, so
+    large sitemaps are never held in memory. Gzipped sitemaps are detected
+    by their magic bytes.
+    """
+    pending = list(reversed(sitemap_urls))
+    seen = set()
+    while pending:
+        sitemap_url = pending.pop()
+        if sitemap_url in seen:
+            continue
+        seen.add(sitemap_url)
+        parser = XMLPullParser(events=("end",))
+        children = []
+        try:
+            async with fetcher.open(sitemap_url) as response:
+                if response.status != 200:
+                    print(f"Sitemap {sitemap_url}: HTTP {response.status}", file=sys.stderr)
+                    continue
+                gunzip = None
+                first = True
+                async for chunk in response.iter_body():
+                    if first:
+                        first = False
+                        if chunk[:2] == b"\x1f\x8b":
+                            gunzip = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                    parser.feed(gunzip.decompress(chunk) if gunzip else chunk)
+                    for url, is_sitemap in _sitemap_events(parser):
+                        if is_sitemap:
+                            children.append(url)
+                        else:
+                            yield url
+            parser.close()
+            for url, is_sitemap in _sitemap_events(parser):
+                if is_sitemap:
+                    children.append(url)
+                else:
+                    yield url
+        except (FetchError, zlib.error) as e:
+            print(f"Sitemap {sitemap_url}: {e}", file=sys.stderr)
+        except Exception as e:
+            # Malformed XML: keep the URLs already yielded
+            print(f"Sitemap {sitemap_url}: {type(e).__name__}: {e}", file=sys.stderr)
+        pending.extend(reversed(children))
+
+
+def _sitemap_events(parser):
+    """Yield (loc, is_sitemap) for completed <url>/<sitemap> entries."""
+    for _, elem in parser.read_events():
+        tag = elem.tag.rpartition("}")[2]
+        if tag in ("url", "sitemap"):
+            for child in elem:
+                if child.tag.rpartition("}")[2] == "loc" and child.text and child.text.strip():
+                    yield child.text.strip(), tag == "sitemap"
+                    break
+            elem.clear()
+
+
+async def iter_seed_urls(path):
+    """Yield URLs from a file (or stdin for '-'), one per line; '#' starts a comment."""
+    f = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+    try:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield line
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def load_state(path):
+    """Load conditional-GET validators ({url: {etag, last_modified, key[, fields]}})."""
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(path, state):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def _charset(content_type):
+    for param in content_type.split(";")[1:]:
+        name, _, value = param.partition("=")
+        if name.strip().lower() == "charset":
+            charset = value.strip().strip('"\'')
+            try:
+                codecs.lookup(charset)
+                return charset
+            except LookupError:
+                break
+    return "utf-8"
+
+
+def _parse_page(data, url, fields, encoding, backend):
+    """Process-pool entry point: extract signals from an HTML body."""
+    return extract_bytes_signals(data, url=url, fields=fields, encoding=encoding,
+                                 backend=backend)[0]
+
+
+class Crawler:
+    """Fetch URLs concurrently and extract signals from each HTML page."""
+
+    def __init__(self, fetcher, fields=None, cache=None, state=None, executor=None,
+                 backend=DEFAULT_PARSER):
+        """
+        Args:
+            fetcher: Fetcher used for all requests
+            fields: Optional set of signal fields to keep
+            cache: Optional SignalCache (needed for conditional GET reuse)
+            state: Dict of validators from load_state, updated in place
+            executor: Optional process pool for parsing
+            backend: Parser backend; a cache's own backend takes precedence
+        """
+        self.fetcher = fetcher
+        self.fields = fields
+        # Cache entries hold the requested fields and are keyed by them
+        self._key_fields = cache_key_fields(fields)
+        self.cache = cache
+        self.state = state if state is not None else {}
+        self.executor = executor
+        self.backend = cache.backend if cache is not None else resolve_backend(backend)
+        self.pages = 0
+        self.errors = 0
+        self.not_modified = 0
+        # Set when the reader of out goes away (e.g. piped into head)
+        self.output_closed = False
+
+    async def crawl_page(self, url):
+        """Fetch and extract one page; return its output record."""
+        record = {"url": url}
+        try:
+            record.update(await self._crawl_page(url))
+        except (FetchError, asyncio.TimeoutError) as e:
+            record["error"] = str(e) or type(e).__name__
+        except Exception as e:
+            record["error"] = f"{type(e).__name__}: {e}"
+        self.pages += 1
+        if "error" in record:
+            self.errors += 1
+        return record
+
+    async def _crawl_page(self, url, conditional=True):
+        validators = self.state.get(url) if self.cache is not None and conditional else None
+        if validators and validators.get("fields", []) != list(self._key_fields):
+            # The cached result holds other fields
+            validators = None
+        headers = {}
+        if validators:
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+
+        async with self.fetcher.open(url, headers) as response:
+            if response.status == 304 and validators:
+                results = self.cache.get(validators["key"])
+                if results is not None:
+                    self.not_modified += 1
+                    return self._record(url, response, results, not_modified=True)
+                # Validators without a cached result: fetch unconditionally once
+                # the connection (and its host slot) is released
+                body = None
+            else:
+                content_type = response.headers.get("content-type", "")
+                if response.status != 200:
+                    return {"status": response.status, "error": f"HTTP {response.status}"}
+                if content_type and "html" not in content_type.lower():
+                    return {"status": response.status, "error": f"Not HTML ({content_type})"}
+                body = await response.read()
+        if body is None:
+            return await self._crawl_page(url, conditional=False)
+
+        final_url = response.url
+        encoding = _charset(content_type)
+        key = self.cache.key_for_bytes(body, final_url, self._key_fields) if self.cache is not None else None
+        results = self.cache.get(key) if key else None
+        if results is None:
+            if self.executor is not None:
+                loop = asyncio.get_running_loop()
+                results = await loop.run_in_executor(
+                    self.executor, _parse_page, body, final_url, self.fields, encoding, self.backend
+                )
+            else:
+                results = _parse_page(body, final_url, self.fields, encoding, self.backend)
+            if key:
+                self.cache.put(key, results)
+        if key:
+            etag = response.headers.get("etag")
+            last_modified = response.headers.get("last-modified")
+            if etag or last_modified:
+                self.state[url] = {"etag": etag, "last_modified": last_modified, "key": key}
+                if self._key_fields:
+                    self.state[url]["fields"] = list(self._key_fields)
+        return self._record(url, response, results, not_modified=False)
+
+    def _record(self, url, response, results, not_modified):
+        record = {"status": response.status, "not_modified": not_modified}
+        if response.url != url:
+            record["final_url"] = response.url
+        for k, v in results.items():
+            if k != "url" and (not self.fields or k in self.fields):
+                record[k] = v
+        return record
+
+    async def run(self, urls, out, concurrency=32, max_pages=None):
+        """Crawl URLs from an async iterator with `concurrency` workers, writing NDJSON to out."""
+        queue = asyncio.Queue(maxsize=concurrency * 4)
+
+        async def produce():
+            seen = set()
+            try:
+                async for url in urls:
+                    if self.output_closed:
+                        break
+                    if max_pages is not None and len(seen) >= max_pages:
+                        break
+                    url = url.split("#", 1)[0]
+                    if url not in seen:
+                        seen.add(url)
+                        await queue.put(url)
+            finally:
+                for _ in range(concurrency):
+                    await queue.put(None)
+
+        async def work():
+            while True:
+                url = await queue.get()
+                if url is None:
+                    return
+                if self.output_closed:
+                    continue
+                record = await self.crawl_page(url)
+                try:
+                    out.write(json.dumps(record, ensure_ascii=False))
+                    out.write("\n")
+                except BrokenPipeError:
+                    # Nobody reads the output any more: drain the queue and stop
+                    self.output_closed = True
+
+        await asyncio.gather(produce(), *(work() for _ in range(concurrency)))
+
+
+async def _iter_list(items):
+    for item in items:
+        yield item
+
+
+async def _chain(*sources):
+    for source in sources:
+        async for item in source:
+            yield item
+
+
+async def crawl(args, out, fields, cache):
+    fetcher = Fetcher(per_host=args.per_host, delay=args.delay, timeout=args.timeout,
+                      user_agent=args.user_agent)
+    sources = []
+    if args.sitemap:
+        sources.append(iter_sitemap_urls(fetcher, args.sitemap))
+    if args.seeds:
+        sources.append(iter_seed_urls(args.seeds))
+    if args.urls:
+        sources.append(_iter_list(args.urls))
+
+    state = load_state(args.state) if cache is not None else {}
+    executor = None
+    if args.jobs and args.jobs > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        executor = ProcessPoolExecutor(max_workers=args.jobs)
+
+    crawler = Crawler(fetcher, fields=fields, cache=cache, state=state, executor=executor,
+                      backend=args.parser)
+    try:
+        await crawler.run(_chain(*sources), out, concurrency=args.concurrency,
+                          max_pages=args.max_pages)
+    finally:
+        await fetcher.close()
+        if executor is not None:
+            executor.shutdown()
+        # Keep the validators of pages crawled so far even if the crawl failed
+        if args.state and cache is not None:
+            save_state(args.state, state)
+    return crawler
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Crawl pages and extract SEO/AEO signals. Outputs NDJSON to stdout.",
+        epilog=(
+            "Examples:\n"
+            "  %(prog)s --sitemap https://example.com/sitemap.xml --output signals.ndjson\n"
+            "  %(prog)s --seeds urls.txt --per-host 2 --delay 0.5\n"
+            "  %(prog)s https://example.com/ --fields title,word_count\n"
+        ),
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("urls", nargs="*", help="Page URLs to crawl.")
+    parser.add_argument("--sitemap", action="append", default=[],
+                        help="Sitemap or sitemap index URL (repeatable).")
+    parser.add_argument("--seeds", default=None,
+                        help="File with one URL per line ('-' for stdin).")
+    parser.add_argument("--max-pages", type=int, default=None,
+                        help="Stop after this many distinct URLs.")
+    parser.add_argument("--fields", default=None,
+                        help="Comma-separated signal fields to include.")
+    parser.add_argument("--output", default=None,
+                        help="Write NDJSON to this file instead of stdout.")
+    fetching = parser.add_argument_group("fetching")
+    fetching.add_argument("--concurrency", type=int, default=32,
+                          help="Pages fetched at once across all hosts (default: %(default)s).")
+    fetching.add_argument("--per-host", type=int, default=8,
+                          help="Concurrent connections per host (default: %(default)s).")
+    fetching.add_argument("--delay", type=float, default=0.0,
+                          help="Minimum seconds between request starts per host (default: %(default)s).")
+    fetching.add_argument("--timeout", type=float, default=20.0,
+                          help="Connect/read timeout in seconds (default: %(default)s).")
+    fetching.add_argument("--user-agent", default=USER_AGENT, help="User-Agent header.")
+    fetching.add_argument("--jobs", type=int, default=1,
+                          help="Parse pages in this many worker processes (default: in the event loop).")
+    fetching.add_argument("--parser", choices=PARSER_CHOICES, default=DEFAULT_PARSER,
+                          help="HTML parser backend (default: %(default)s; lxml is faster but can "
+                               "differ on malformed markup).")
+    caching = parser.add_argument_group("result cache")
+    caching.add_argument("--state", default=None,
+                         help="JSON file of ETag/Last-Modified validators for conditional GETs.")
+    caching.add_argument("--no-cache", action="store_true",
+                         help="Always parse; disables conditional GET reuse.")
+    caching.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                         help="Result cache directory (default: %(default)s).")
+    caching.add_argument("--cache-max-mb", type=float, default=DEFAULT_CACHE_MAX_MB,
+                         help="Result cache size limit (default: %(default)s).")
+    args = parser.parse_args()
+
+    if not (args.urls or args.sitemap or args.seeds):
+        print(json.dumps({"error": "Give URLs, --sitemap or --seeds"}), file=sys.stderr)
+        sys.exit(1)
+
+    fields = {f.strip() for f in args.fields.split(",")} if args.fields else None
+    try:
+        resolve_backend(args.parser)
+    except ValueError as e:
+        print(json.dumps({"error": str(e)}), file=sys.stderr)
+        sys.exit(1)
+    cache = None
+    if not args.no_cache:
+        cache = SignalCache(args.cache_dir, int(args.cache_max_mb * 1024 * 1024),
+                            backend=args.parser)
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    started = time.perf_counter()
+    try:
+        crawler = asyncio.run(crawl(args, out, fields, cache))
+        if not crawler.output_closed:
+            try:
+                out.flush()
+            except BrokenPipeError:
+                crawler.output_closed = True
+        if crawler.output_closed and out is sys.stdout:
+            # Point stdout at devnull so the flush at exit does not raise again
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - started
+
+    summary = (f"Crawled {crawler.pages} pages ({crawler.errors} errors, "
+               f"{crawler.not_modified} not modified) in {elapsed:.1f}s "
+               f"({crawler.pages / elapsed if elapsed else 0:.0f} pages/sec)")
+    if cache is not None:
+        cache.prune()
+        summary += f"; cache: {cache.hits} hits, {cache.misses} misses"
+    print(summary, file=sys.stderr)
+    sys.exit(1 if crawler.pages and crawler.errors == crawler.pages else 0)
+
+
+if __name__ == "__main__":
+    main()
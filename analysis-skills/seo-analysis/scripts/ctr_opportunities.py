@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""Rank CTR opportunities in GSC data with the model in references/ctr-scoring.md.
+
+Usage:
+    python3 ctr_opportunities.py gsc_page1.json gsc_page2.json --features serp_features.ndjson
+    python3 ctr_opportunities.py gsc_rows.ndjson --min-impressions 500 --top 50
+    python3 ctr_opportunities.py gsc.json --dimensions query,page,country --rows-output ranked.ndjson
+
+Input is Search Console query_analytics output: a JSON response with
+"rows" (each with "keys", clicks, impressions, ctr, position), several
+such responses from paginated pulls, or NDJSON with one row per line.
+"keys" are named by --dimensions (default: query,page); rows may also
+carry flat "query"/"page" fields.
+
+SERP features come from --features, NDJSON or JSON lines of
+{"query": ..., "features": ["AB", "PAA"]} (codes or SerpAPI field names
+such as answer_box or people_also_ask), or from a row's own
+"serp_features" list. Codes: AB answer box, AI AI Overview, KG knowledge
+graph, LP local pack, PAA People Also Ask, TS top stories, SH shopping.
+
+For every row:
+    baseline_ctr   position CTR, interpolated between the positions in the
+                   table; beyond position 10 it falls off as 1/position
+    adjusted_ctr   baseline_ctr x (1 - penalty), penalty = sum of the
+                   query's feature penalties, clamped to 1.0 (an answer
+                   box and an AI Overview count once)
+    ctr_gap        adjusted_ctr - actual CTR (clicks / impressions)
+    lost_clicks    max(ctr_gap, 0) x impressions
+    diagnosis      content_problem when actual CTR < 0.7 x adjusted_ctr,
+                   else serp_absorption
+
+Rows are held as NumPy arrays (queries and pages interned to integer ids,
+feature flags as a per-query bitmask), so multi-million-row exports are
+scored in a few array operations; reading the JSON dominates run time.
+
+Output: JSON report to stdout (summary, top rows by lost clicks);
+--rows-output writes every scored row, ranked, as NDJSON.
+Dependencies: numpy (pip install numpy).
+"""
+
+import argparse
+import json
+import sys
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Baseline CTR at positions 1-10
+BASELINE_POSITIONS = (1, 2, 3, 4, 5, 6, 7, 8, 9, 10)
+BASELINE_CTR = (0.28, 0.15, 0.11, 0.08, 0.07, 0.05, 0.04, 0.035, 0.03, 0.025)
+
+# SERP feature codes in bitmask order, with their CTR penalties
+FEATURE_CODES = ("AB", "AI", "KG", "LP", "PAA", "TS", "SH")
+FEATURE_PENALTIES = {"AB": 0.60, "AI": 0.60, "KG": 0.30, "LP": 0.20, "PAA": 0.15,
+                     "TS": 0.10, "SH": 0.25}
+# Answer box and AI Overview are one penalty line in the model
+SHARED_PENALTIES = (("AB", "AI"),)
+FEATURE_ALIASES = {
+    "answer_box": "AB", "ai_overview": "AI", "knowledge_graph": "KG",
+    "local_results": "LP", "local_pack": "LP", "people_also_ask": "PAA",
+    "related_questions": "PAA", "top_stories": "TS", "news_results": "TS",
+    "shopping_results": "SH", "inline_shopping": "SH",
+}
+FEATURE_BITS = {code: 1 << i for i, code in enumerate(FEATURE_CODES)}
+
+CONTENT_PROBLEM_RATIO = 0.7
+# Fields that make a bare JSON object a GSC row
+GSC_ROW_FIELDS = ("keys", "query", "page")
+DEFAULT_DIMENSIONS = ("query", "page")
+
+
+def feature_mask(features):
+    """Return the bitmask of a list of feature codes or SerpAPI field names.
+
+    Raises ValueError for an unknown feature.
+    """
+    mask = 0
+    for feature in features or ():
+        code = FEATURE_ALIASES.get(feature.lower(), feature.upper())
+        if code not in FEATURE_BITS:
+            raise ValueError(f"Unknown SERP feature: {feature}")
+        mask |= FEATURE_BITS[code]
+    return mask
+
+
+def feature_codes(mask):
+    """Return the feature codes set in a bitmask."""
+    return [code for code in FEATURE_CODES if mask & FEATURE_BITS[code]]
+
+
+def penalty_table():
+    """Return the clamped penalty for every feature bitmask, indexed by mask."""
+    penalties = np.zeros(1 << len(FEATURE_CODES))
+    for mask in range(len(penalties)):
+        codes = set(feature_codes(mask))
+        for shared in SHARED_PENALTIES:
+            if len(codes & set(shared)) > 1:
+                codes -= set(shared[1:])
+        penalties[mask] = min(sum(FEATURE_PENALTIES[c] for c in codes), 1.0)
+    return penalties
+
+
+def baseline_ctr(positions):
+    """Return the baseline CTR of (fractional) average positions."""
+    positions = np.maximum(positions, BASELINE_POSITIONS[0])
+    last = BASELINE_POSITIONS[-1]
+    inside = np.interp(positions, BASELINE_POSITIONS, BASELINE_CTR)
+    return np.where(positions > last, BASELINE_CTR[-1] * last / positions, inside)
+
+
+def iter_json_records(paths):
+    """Yield JSON values from JSON or NDJSON files ('-' for stdin)."""
+    for path in paths:
+        f = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+        try:
+            first = f.readline()
+            while first and not first.strip():
+                first = f.readline()
+            if first:
+                try:
+                    value = json.loads(first)
+                except json.JSONDecodeError:
+                    # Not one value per line: an indented JSON document
+                    yield json.loads(first + f.read())
+                    continue
+                yield value
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+
+def iter_gsc_rows(paths):
+    """Yield GSC rows from API responses ({"rows": [...]}), row arrays or NDJSON rows.
+
+    A response without "rows" (a paginated pull past the last page, or a
+    range with no data) has no rows; other objects without "keys" or flat
+    query/page fields are not rows either.
+    """
+    for value in iter_json_records(paths):
+        if isinstance(value, dict) and "rows" in value:
+            yield from value["rows"] or ()
+        elif isinstance(value, list):
+            yield from value
+        elif not isinstance(value, dict) or any(field in value for field in GSC_ROW_FIELDS):
+            yield value
+
+
+def load_features(paths):
+    """Return {query: feature bitmask} from feature flag files."""
+    masks = {}
+    for record in iter_json_records(paths):
+        for item in record if isinstance(record, list) else (record,):
+            query = item.get("query")
+            if query is not None:
+                masks[query] = masks.get(query, 0) | feature_mask(item.get("features"))
+    return masks
+
+
+class GscRows:
+    """GSC rows as columns: interned query/page ids and float metrics."""
+
+    def __init__(self):
+        self.queries = {}
+        self.pages = {}
+        self.query_ids = array("q")
+        self.page_ids = array("q")
+        self.clicks = array("d")
+        self.impressions = array("d")
+        self.positions = array("d")
+        self.row_features = {}
+
+    @classmethod
+    def from_rows(cls, rows, dimensions=DEFAULT_DIMENSIONS):
+        table = cls()
+        table.extend(rows, dimensions)
+        return table
+
+    def extend(self, rows, dimensions=DEFAULT_DIMENSIONS):
+        """Append GSC rows (with "keys" named by dimensions, or flat query/page fields)."""
+        query_key = dimensions.index("query") if "query" in dimensions else None
+        page_key = dimensions.index("page") if "page" in dimensions else None
+        queries, pages = self.queries, self.pages
+        add_query, add_page = self.query_ids.append, self.page_ids.append
+        add_clicks, add_impressions = self.clicks.append, self.impressions.append
+        add_position = self.positions.append
+        for row in rows:
+            keys = row.get("keys")
+            if keys:
+                query = keys[query_key] if query_key is not None else ""
+                page = keys[page_key] if page_key is not None else ""
+            else:
+                query = row.get("query", "")
+                page = row.get("page", "")
+            query_id = queries.get(query)
+            if query_id is None:
+                query_id = queries[query] = len(queries)
+            page_id = pages.get(page)
+            if page_id is None:
+                page_id = pages[page] = len(pages)
+            add_query(query_id)
+            add_page(page_id)
+            add_clicks(row.get("clicks") or 0)
+            add_impressions(row.get("impressions") or 0)
+            add_position(row.get("position") or 0)
+            if row.get("serp_features"):
+                mask = feature_mask(row["serp_features"])
+                self.row_features[query_id] = self.row_features.get(query_id, 0) | mask
+
+    def __len__(self):
+        return len(self.query_ids)
+
+    def query_masks(self, features):
+        """Return a uint8 bitmask per query id from {query: mask} plus row flags."""
+        masks = np.zeros(len(self.queries), dtype=np.uint8)
+        for query, mask in features.items():
+            query_id = self.queries.get(query)
+            if query_id is not None:
+                masks[query_id] |= mask
+        for query_id, mask in self.row_features.items():
+            masks[query_id] |= mask
+        return masks
+
+
+def score_rows(table, features):
+    """Return a dict of per-row arrays: the model's CTRs, gap, lost clicks and diagnosis."""
+    clicks = np.frombuffer(table.clicks, dtype=np.float64)
+    impressions = np.frombuffer(table.impressions, dtype=np.float64)
+    positions = np.frombuffer(table.positions, dtype=np.float64)
+    query_masks = table.query_masks(features)
+    masks = query_masks[np.frombuffer(table.query_ids, dtype=np.int64)]
+
+    baseline = baseline_ctr(positions)
+    adjusted = baseline * (1 - penalty_table()[masks])
+    actual = np.divide(clicks, impressions, out=np.zeros_like(clicks), where=impressions > 0)
+    gap = adjusted - actual
+    return {
+        "query_masks": query_masks,
+        "masks": masks,
+        "baseline_ctr": baseline,
+        "adjusted_ctr": adjusted,
+        "actual_ctr": actual,
+        "ctr_gap": gap,
+        "lost_clicks": np.maximum(gap, 0) * impressions,
+        "content_problem": actual < adjusted * CONTENT_PROBLEM_RATIO,
+    }
+
+
+def rank(scores, impressions, min_impressions=0, top=None):
+    """Return row indexes with impressions >= min_impressions, by lost clicks descending.
+
+    With top, only the top rows are fully sorted.
+    """
+    candidates = np.flatnonzero(impressions >= min_impressions)
+    lost = scores["lost_clicks"][candidates]
+    if top is not None and top < len(candidates):
+        keep = np.argpartition(-lost, top)[:top]
+        candidates, lost = candidates[keep], lost[keep]
+    # Ties keep input order
+    return candidates[np.argsort(-lost, kind="stable")]
+
+
+def analyze(table, features, min_impressions=0, top=20):
+    """Score rows; return (report dict, iterator of ranked row records)."""
+    scores = score_rows(table, features)
+    impressions = np.frombuffer(table.impressions, dtype=np.float64)
+    queries = list(table.queries)
+    pages = list(table.pages)
+    query_ids = np.frombuffer(table.query_ids, dtype=np.int64)
+    page_ids = np.frombuffer(table.page_ids, dtype=np.int64)
+    positions = np.frombuffer(table.positions, dtype=np.float64)
+    clicks = np.frombuffer(table.clicks, dtype=np.float64)
+
+    def record(i):
+        return {
+            "query": queries[query_ids[i]],
+            "page": pages[page_ids[i]],
+            "position": round(float(positions[i]), 2),
+            "impressions": int(impressions[i]),
+            "clicks": int(clicks[i]),
+            "serp_features": feature_codes(int(scores["masks"][i])),
+            "baseline_ctr": round(float(scores["baseline_ctr"][i]), 4),
+            "adjusted_ctr": round(float(scores["adjusted_ctr"][i]), 4),
+            "actual_ctr": round(float(scores["actual_ctr"][i]), 4),
+            "ctr_gap": round(float(scores["ctr_gap"][i]), 4),
+            "lost_clicks": round(float(scores["lost_clicks"][i]), 1),
+            "diagnosis": "content_problem" if scores["content_problem"][i] else "serp_absorption",
+        }
+
+    selected = impressions >= min_impressions
+    content = scores["content_problem"] & selected
+    report = {
+        "summary": {
+            "rows": len(table),
+            "rows_scored": int(selected.sum()),
+            "queries": len(queries),
+            "queries_with_serp_features": int((scores["query_masks"] > 0).sum()),
+            "content_problem_rows": int(content.sum()),
+            "serp_absorption_rows": int((selected & ~scores["content_problem"]).sum()),
+            "lost_clicks": round(float(scores["lost_clicks"][selected].sum()), 1),
+            "content_problem_lost_clicks": round(float(scores["lost_clicks"][content].sum()), 1),
+        },
+        "top_opportunities": [record(i) for i in rank(scores, impressions, min_impressions, top)],
+    }
+
+    def ranked():
+        for i in rank(scores, impressions, min_impressions):
+            yield record(i)
+
+    return report, ranked()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank CTR opportunities in GSC query/page rows")
+    parser.add_argument("inputs", nargs="+", help="GSC JSON responses or NDJSON rows ('-' for stdin)")
+    parser.add_argument("--features", nargs="*", default=[],
+                        help="NDJSON/JSON files of {query, features} SERP feature flags")
+    parser.add_argument("--dimensions", default=",".join(DEFAULT_DIMENSIONS),
+                        help="Names of the row 'keys', in request order (default: %(default)s)")
+    parser.add_argument("--min-impressions", type=float, default=0,
+                        help="Ignore rows with fewer impressions (default: %(default)s)")
+    parser.add_argument("--top", type=int, default=20,
+                        help="Opportunities listed in the report (default: %(default)s)")
+    parser.add_argument("--rows-output", default=None,
+                        help="Write every scored row, ranked by lost clicks, to this NDJSON file")
+    parser.add_argument("--compact", action="store_true", help="Output minified JSON")
+    args = parser.parse_args()
+
+    if np is None:
+        print(json.dumps({"error": "ctr_opportunities.py needs numpy (pip install numpy)"}),
+              file=sys.stderr)
+        sys.exit(1)
+
+    dimensions = tuple(d.strip() for d in args.dimensions.split(",") if d.strip())
+    try:
+        features = load_features(args.features)
+        table = GscRows.from_rows(iter_gsc_rows(args.inputs), dimensions)
+    except FileNotFoundError as e:
+        print(json.dumps({"error": f"File not found: {e.filename}"}), file=sys.stderr)
+        sys.exit(1)
+    except json.JSONDecodeError as e:
+        print(json.dumps({"error": f"Invalid JSON input: {e}"}), file=sys.stderr)
+        sys.exit(1)
+    except (ValueError, AttributeError, TypeError, IndexError) as e:
+        print(json.dumps({"error": f"Invalid GSC row or feature record: {e}"}), file=sys.stderr)
+        sys.exit(1)
+
+    report, rows = analyze(table, features, min_impressions=args.min_impressions, top=args.top)
+    if args.rows_output:
+        with open(args.rows_output, "w", encoding="utf-8") as f:
+            for record in rows:
+                f.write(json.dumps(record, ensure_ascii=False))
+                f.write("\n")
+
+    print(json.dumps(report, indent=None if args.compact else 2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -7,9 +7,34 @@ Usage:
     cat page.html | python3 extract_page_signals.py --url https://example.com/page
     python3 extract_page_signals.py page.html --compact           # minified JSON
     python3 extract_page_signals.py page.html --fields title,word_count,schema_types
-
-Output: JSON to stdout with SEO/AEO signals.
+    python3 extract_page_signals.py ./pages/ --fields url,title,simhash,minhash   # duplicate fingerprints
+
+Batch mode (one NDJSON record per page, parsed in a process pool):
+    python3 extract_page_signals.py ./pages/ --output signals.ndjson
+    python3 extract_page_signals.py './pages/**/*.html' --ordered
+    python3 extract_page_signals.py --manifest pages.tsv --jobs 8   # path<TAB>url lines
+    python3 extract_page_signals.py crawl.warc.gz site.tar.gz       # pages inside archives
+
+Worker mode (one JSON request per stdin line, one JSON response per stdout line):
+    python3 extract_page_signals.py --serve
+    {"path": "page.html", "url": "https://example.com/page", "fields": "title", "id": 1}
+
+Results are cached by content hash and --fields set in
+~/.cache/seo-analysis/page-signals (--cache-dir, --cache-max-mb); --no-cache
+always parses. The cache is pruned after batch runs and at most hourly by
+single-page runs.
+
+Parser backend (--parser): "stdlib" (html.parser, the default) or "lxml"
+(libxml2, faster). lxml repairs markup the way browsers do, so its signals
+can differ from html.parser's on unclosed <p>, blocks nested in <p>,
+fragments without <body> and XHTML-style <br/>. Its output is not identical
+to the default: 91 of the 414 benchmark golden pages (all malformed or
+quirky markup) produce different signals. Use it only where those
+differences are acceptable.
+
+Output: JSON to stdout with SEO/AEO signals (NDJSON in batch mode).
 Dependencies: Python 3 stdlib only (no pip install required).
+              Optional: lxml (pip install lxml) for the faster parser backend.
 
 Output fields:
     url, title, meta_description, og_title, og_description, og_image,
@@ -19,28 +44,270 @@ Output fields:
     entity_properties, bluf_analysis (with bluf_pattern_type), lists_count,
     tables_count, images_count, total_images, images_with_alt, images_missing_alt,
     alt_texts, internal_links, external_links, internal_link_anchors
+
+Opt-in fields (only produced when named in --fields):
+    simhash (64-bit hex), minhash (64-value signature) - fingerprints of the
+    body text's 5-word shingles, for near_duplicates.py
 """
 
 import argparse
+import bisect
+import glob
+import hashlib
+import io
 import json
+import os
 import re
 import sys
+import tempfile
+import time
+from array import array
 from html.parser import HTMLParser
 from urllib.parse import urlparse
 
+from page_archives import ArchiveError, ArchivePage, is_archive, iter_archive_pages
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:
+    lxml_etree = None
+
+HTML_EXTENSIONS = (".html", ".htm", ".xhtml")
+
+# Part of the result cache key; bump whenever extracted output changes
+EXTRACTOR_VERSION = "1"
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "seo-analysis", "page-signals",
+)
+DEFAULT_CACHE_MAX_MB = 256
+
+# --serve prunes the result cache every this many requests
+SERVE_PRUNE_INTERVAL = 1000
+# Single-page runs prune the result cache at most this often (seconds)
+PRUNE_MIN_INTERVAL = 3600
+# Cached stdin input is spooled to a temporary file beyond this many bytes
+STDIN_SPOOL_BYTES = 8 * 1024 * 1024
+
+# Input is parsed in chunks of this many characters
+READ_CHUNK_SIZE = 64 * 1024
+
+PARSER_BACKENDS = ("stdlib", "lxml")
+PARSER_CHOICES = PARSER_BACKENDS
+DEFAULT_PARSER = "stdlib"
+
+# Heading/BLUF/anchor text is only needed up to 250 chars (plus the last
+# fragment for question detection), so longer runs are not kept in memory
+TEXT_PREFIX_LIMIT = 1024
+
+# Tag sets used by the parser callbacks (tag names arrive lowercased)
+HEADING_TAGS = frozenset(("h1", "h2", "h3", "h4", "h5", "h6"))
+BLUF_BLOCK_TAGS = frozenset(("p", "ul", "ol", "table", "div"))
+BLUF_TEXT_TAGS = frozenset(
+    ("p", "ul", "ol", "table", "div", "li", "td", "th", "span", "a", "strong", "em", "b", "i")
+)
+LIST_TAGS = frozenset(("ul", "ol"))
+# Elements without an end tag: html.parser never reports one for <br>, so
+# the lxml backend drops the end events libxml2 generates for them
+VOID_TAGS = frozenset((
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+    "param", "source", "track", "wbr",
+))
+
+# Default output fields, in output order
+OUTPUT_FIELDS = (
+    "url", "title", "meta_description", "og_title", "og_description", "og_image",
+    "twitter_card", "canonical", "word_count", "headings", "json_ld", "schema_types",
+    "has_faq_schema", "has_howto_schema", "has_article_schema", "has_breadcrumb_schema",
+    "has_video_object_schema", "has_local_business_schema", "has_speakable_schema",
+    "entity_properties", "bluf_analysis", "lists_count", "tables_count", "images_count",
+    "total_images", "images_with_alt", "images_missing_alt", "alt_texts", "internal_links",
+    "external_links", "internal_link_anchors",
+)
+# Fields that are only computed when requested by name
+FINGERPRINT_FIELDS = frozenset(("simhash", "minhash"))
+
+# Body text fingerprints: word shingle size and MinHash signature length
+SHINGLE_WORDS = 5
+MINHASH_BINS = 64
+MINHASH_BIN_BITS = 6  # log2(MINHASH_BINS)
+
+# Output fields grouped by the collector that produces them
+SCHEMA_FIELDS = frozenset((
+    "json_ld", "schema_types", "has_faq_schema", "has_howto_schema",
+    "has_article_schema", "has_breadcrumb_schema", "has_video_object_schema",
+    "has_local_business_schema", "has_speakable_schema", "entity_properties",
+))
+IMAGE_FIELDS = frozenset(
+    ("images_count", "total_images", "images_with_alt", "images_missing_alt", "alt_texts")
+)
+LINK_COUNT_FIELDS = frozenset(("internal_links", "external_links"))
+# Title, heading and BLUF text share one buffer, so they are collected together
+TEXT_FIELDS = frozenset(("title", "headings", "bluf_analysis"))
+
+QUESTION_HEADING_RE = re.compile(
+    r"\?$|^(what|how|why|when|where|who|which|can|do|does|is|are|should)\b", re.IGNORECASE
+)
+STARTS_WITH_ANSWER_RE = re.compile(
+    r"^[A-Z].*\b(is|are|means|refers|provides|includes|offers|was|were|has|have|can|will|should|does|do)\b",
+    re.IGNORECASE,
+)
+BLUF_YESNO_RE = re.compile(r"^(yes|no)\b")
+BLUF_NUMBER_RE = re.compile(r"^[\$€£¥]?\d|^\d")
+BLUF_STEP_RE = re.compile(
+    r"^(step\s+\d|first,?\s|to\s+\w+,?\s|set\s+up|install|create|open|go\s+to|navigate|click|run|start)"
+)
+BLUF_VERDICT_RE = re.compile(r"^.{0,60}\b(better|best|worse|winner|recommend|choose|prefer|excels|superior)\b")
+BLUF_DEFINITION_RE = re.compile(r"^.{0,80}\b(is\s+(a|an|the)\b|refers?\s+to|means|defined\s+as)")
+WORD_TOKEN_RE = re.compile(r"\w+")
+
+# Plain "http(s)://host[:port]" URLs whose hostname can be read without
+# urlparse; anything else (userinfo, IPv6, whitespace, non-ASCII) falls back
+SIMPLE_HTTP_HOST_RE = re.compile(r"https?://([A-Za-z0-9._-]*)(?::[0-9]*)?(?:[/?#]|\Z)")
+
+
+def url_hostname(url):
+    """Return urlparse(url).hostname, skipping urlparse for simple http(s) URLs.
+
+    Raises ValueError like urlparse for malformed URLs.
+    """
+    match = SIMPLE_HTTP_HOST_RE.match(url)
+    if match is not None:
+        return match.group(1).lower() or None
+    return urlparse(url).hostname
+
+
+# _BIT_TABLES[bit] maps a byte to 1 if that bit is set, else 0
+_BIT_TABLES = [bytes((value >> bit) & 1 for value in range(256)) for bit in range(8)]
+_MASK64 = (1 << 64) - 1
+
+
+def shingle_hashes(tokens):
+    """Return an array("Q") of stable 64-bit hashes of every SHINGLE_WORDS-token shingle.
+
+    Fewer tokens than one shingle hash as a single shingle (none if empty).
+    Hashes are blake2b, so they do not depend on the process or platform.
+    """
+    if len(tokens) < SHINGLE_WORDS:
+        shingles = [" ".join(tokens)] if tokens else []
+    else:
+        shingles = map(" ".join, zip(*(tokens[i:] for i in range(SHINGLE_WORDS))))
+    blake2b = hashlib.blake2b
+    from_bytes = int.from_bytes
+    return array("Q", [from_bytes(blake2b(s.encode("utf-8"), digest_size=8).digest(), "little")
+                       for s in shingles])
+
+
+def simhash64(hashes):
+    """Return the 64-bit SimHash of an array("Q") of shingle hashes (None if empty).
+
+    Bit i is set when more than half of the hashes have bit i set. Bits are
+    counted per byte column with bytes.translate/count, so the work per
+    hash runs in C.
+    """
+    if not hashes:
+        return None
+    if sys.byteorder == "big":
+        hashes = array("Q", hashes)
+        hashes.byteswap()
+    raw = hashes.tobytes()
+    value = 0
+    for byte_index in range(8):
+        column = raw[byte_index::8]
+        for bit in range(8):
+            if column.translate(_BIT_TABLES[bit]).count(1) * 2 > len(hashes):
+                value |= 1 << (byte_index * 8 + bit)
+    return value
+
+
+def minhash_signature(hashes):
+    """Return a MINHASH_BINS-value one-permutation MinHash of shingle hashes (None if empty).
+
+    The hash space is split into bins by the top bits and each bin keeps its
+    smallest hash; an empty bin takes the value of the next non-empty bin,
+    offset by the distance (rotation densification). Two signatures agree in
+    about the Jaccard similarity of the shingle sets' share of bins. Values
+    are folded to 32 bits.
+    """
+    if not hashes:
+        return None
+    ordered = sorted(set(hashes))
+    shift = 64 - MINHASH_BIN_BITS
+    low_mask = (1 << shift) - 1
+    mins = [None] * MINHASH_BINS
+    for b in range(MINHASH_BINS):
+        i = bisect.bisect_left(ordered, b << shift)
+        if i < len(ordered) and ordered[i] >> shift == b:
+            mins[b] = ordered[i] & low_mask
+    signature = []
+    for b in range(MINHASH_BINS):
+        distance = 0
+        while mins[(b + distance) % MINHASH_BINS] is None:
+            distance += 1
+        value = mins[(b + distance) % MINHASH_BINS] + (distance << shift)
+        signature.append(((value * 0x9E3779B97F4A7C15) & _MASK64) >> 32)
+    return signature
+
 
 class SEOSignalExtractor(HTMLParser):
-    """Parse HTML and extract SEO/AEO signals."""
+    """Parse HTML and extract SEO/AEO signals.
+
+    With ``fields``, only the collectors those fields need run while
+    parsing, and get_results returns just those fields. The fingerprint
+    fields (FINGERPRINT_FIELDS) are computed only when named in ``fields``.
+    An instance can be reused for another document after configure() and
+    reset().
+    """
+
+    __slots__ = (
+        "_tag_stack", "_current_text", "_current_text_len", "_current_text_tail",
+        "_in_body", "_in_script", "_in_style", "_script_type", "_script_parts",
+        "title", "meta_description", "og_title", "og_description", "og_image",
+        "twitter_card", "canonical", "headings", "json_ld_raw", "word_count",
+        "lists_count", "tables_count", "images_count", "images_with_alt",
+        "images_missing_alt", "alt_texts", "link_hosts", "internal_link_anchors",
+        "h2_sections", "_current_heading", "_after_heading_content",
+        "_after_heading_len", "_collecting_after_heading", "_after_heading_tags_seen",
+        "_in_anchor", "_anchor_href", "_anchor_text_parts", "_anchor_text_len",
+        "_body_tokens",
+        "_fields", "_want_text", "_want_headings", "_want_bluf", "_want_json_ld",
+        "_want_link_counts", "_want_anchors", "_want_images", "_want_words",
+        "_want_fingerprint",
+    )
 
-    def __init__(self):
+    def __init__(self, fields=None):
+        self.configure(fields)
+        # HTMLParser.__init__ calls reset(), which initializes the state below
         super().__init__()
+
+    def configure(self, fields=None):
+        """Set the requested output fields (None: all) for the next document."""
+        self._fields = frozenset(fields) if fields else None
+        self._want_text = self._wants(TEXT_FIELDS)
+        self._want_headings = self._wants(("headings",))
+        self._want_bluf = self._wants(("bluf_analysis",))
+        self._want_json_ld = self._wants(SCHEMA_FIELDS)
+        self._want_link_counts = self._wants(LINK_COUNT_FIELDS)
+        self._want_anchors = self._wants(("internal_link_anchors",))
+        self._want_images = self._wants(IMAGE_FIELDS)
+        self._want_words = self._wants(("word_count",))
+        self._want_fingerprint = self._fields is not None and not self._fields.isdisjoint(
+            FINGERPRINT_FIELDS
+        )
+
+    def reset(self):
+        """Clear parser and signal state so the instance can parse a new document."""
+        super().reset()
         self._tag_stack = []
         self._current_text = []
+        self._current_text_len = 0
+        self._current_text_tail = None
         self._in_body = False
         self._in_script = False
         self._in_style = False
         self._script_type = ""
-        self._script_content = ""
+        self._script_parts = []
 
         # Collected signals
         self.title = ""
@@ -52,20 +319,22 @@ class SEOSignalExtractor(HTMLParser):
         self.canonical = ""
         self.headings = []
         self.json_ld_raw = []
-        self.body_text_parts = []
+        self.word_count = 0
         self.lists_count = 0
         self.tables_count = 0
         self.images_count = 0
         self.images_with_alt = 0
         self.images_missing_alt = 0
         self.alt_texts = []
-        self.links = []
+        # Absolute link count per hostname (None: unparseable)
+        self.link_hosts = {}
         self.internal_link_anchors = []
         self.h2_sections = []
 
         # State for BLUF analysis
         self._current_heading = None
         self._after_heading_content = []
+        self._after_heading_len = 0
         self._collecting_after_heading = False
         self._after_heading_tags_seen = 0
 
@@ -73,24 +342,108 @@ class SEOSignalExtractor(HTMLParser):
         self._in_anchor = False
         self._anchor_href = ""
         self._anchor_text_parts = []
+        self._anchor_text_len = 0
+
+        # Body text word tokens, shingled for the fingerprint fields
+        self._body_tokens = []
+
+    def _wants(self, names):
+        return self._fields is None or not self._fields.isdisjoint(names)
+
+    def _append_text(self, text, keep_all=False):
+        """Collect title/heading/BLUF text.
+
+        Title text (keep_all) is kept whole; other text keeps a
+        TEXT_PREFIX_LIMIT prefix plus the most recent fragment (for trailing
+        "?" detection).
+        """
+        if keep_all or self._current_text_len < TEXT_PREFIX_LIMIT:
+            self._current_text.append(text)
+            self._current_text_len += len(text) + 1
+        else:
+            self._current_text_tail = text
+
+    def _take_text(self):
+        """Return collected text joined with spaces and reset the buffer."""
+        parts = self._current_text
+        if self._current_text_tail is not None:
+            parts.append(self._current_text_tail)
+        text = " ".join(parts)
+        self._reset_text()
+        return text
+
+    def _reset_text(self):
+        self._current_text = []
+        self._current_text_len = 0
+        self._current_text_tail = None
+
+    # Callbacks are ordered by tag frequency and only the tags that read
+    # attributes build an attribute dict.
 
     def handle_starttag(self, tag, attrs):
-        tag = tag.lower()
-        attrs_dict = dict(attrs)
         self._tag_stack.append(tag)
 
-        if tag == "body":
-            self._in_body = True
+        if tag in BLUF_BLOCK_TAGS:
+            # Content elements after heading (for BLUF analysis)
+            if self._collecting_after_heading:
+                self._after_heading_tags_seen += 1
+                if self._after_heading_tags_seen <= 1:
+                    self._reset_text()
+            # Count structural elements
+            if self._in_body:
+                if tag in LIST_TAGS:
+                    self.lists_count += 1
+                elif tag == "table":
+                    self.tables_count += 1
+
+        elif tag == "a":
+            if self._in_body and (self._want_link_counts or self._want_anchors):
+                href = dict(attrs).get("href", "")
+                if self._want_link_counts and href and href.startswith("http"):
+                    try:
+                        host = url_hostname(href) or ""
+                    except ValueError:
+                        host = None
+                    self.link_hosts[host] = self.link_hosts.get(host, 0) + 1
+                # Track anchor text for internal links
+                if self._want_anchors:
+                    self._in_anchor = True
+                    self._anchor_href = href
+                    self._anchor_text_parts = []
+                    self._anchor_text_len = 0
+
+        elif tag in HEADING_TAGS:
+            if not self._want_text:
+                return
+            self._reset_text()
+            # Finalize any pending BLUF section
+            if self._collecting_after_heading and self._current_heading:
+                self._finalize_bluf_section()
+            if tag == "h2":
+                self._current_heading = {"tag": "H2"}
+                self._after_heading_content = []
+                self._after_heading_len = 0
+                self._collecting_after_heading = False
+                self._after_heading_tags_seen = 0
+
+        elif tag == "img":
+            if self._in_body and self._want_images:
+                self.images_count += 1
+                alt = dict(attrs).get("alt")
+                if alt is not None and alt.strip():
+                    self.images_with_alt += 1
+                    self.alt_texts.append(alt.strip()[:100])
+                else:
+                    self.images_missing_alt += 1
 
-        if tag == "script":
+        elif tag == "script":
             self._in_script = True
-            self._script_type = attrs_dict.get("type", "")
-            self._script_content = ""
-        elif tag == "style":
-            self._in_style = True
+            # An empty type makes handle_data skip the body
+            self._script_type = dict(attrs).get("type", "") if self._want_json_ld else ""
+            self._script_parts = []
 
-        # Meta tags
-        if tag == "meta":
+        elif tag == "meta":
+            attrs_dict = dict(attrs)
             name = attrs_dict.get("name", "").lower()
             prop = attrs_dict.get("property", "").lower()
             content = attrs_dict.get("content", "")
@@ -105,128 +458,91 @@ class SEOSignalExtractor(HTMLParser):
             elif prop == "og:image":
                 self.og_image = content
 
-        # Canonical
-        if tag == "link":
+        elif tag == "link":
+            attrs_dict = dict(attrs)
             rel = attrs_dict.get("rel", "").lower()
             href = attrs_dict.get("href", "")
             if rel == "canonical" and href:
                 self.canonical = href
 
-        # Headings
-        if tag in ("h1", "h2", "h3", "h4", "h5", "h6"):
-            self._current_text = []
-            # Finalize any pending BLUF section
-            if self._collecting_after_heading and self._current_heading:
-                self._finalize_bluf_section()
-            if tag == "h2":
-                self._current_heading = {"tag": tag.upper()}
-                self._after_heading_content = []
-                self._collecting_after_heading = False
-                self._after_heading_tags_seen = 0
-
-        # Content elements after heading (for BLUF analysis)
-        if self._collecting_after_heading and tag in ("p", "ul", "ol", "table", "div"):
-            self._after_heading_tags_seen += 1
-            if self._after_heading_tags_seen <= 1:
-                self._current_text = []
-
-        # Count structural elements
-        if tag in ("ul", "ol") and self._in_body:
-            self.lists_count += 1
-        elif tag == "table" and self._in_body:
-            self.tables_count += 1
-        elif tag == "img" and self._in_body:
-            self.images_count += 1
-            alt = attrs_dict.get("alt")
-            if alt is not None and alt.strip():
-                self.images_with_alt += 1
-                self.alt_texts.append(alt.strip()[:100])
-            else:
-                self.images_missing_alt += 1
+        elif tag == "style":
+            self._in_style = True
 
-        # Links
-        if tag == "a" and self._in_body:
-            href = attrs_dict.get("href", "")
-            if href and href.startswith("http"):
-                self.links.append(href)
-            # Track anchor text for internal links
-            self._in_anchor = True
-            self._anchor_href = href
-            self._anchor_text_parts = []
+        elif tag == "body":
+            self._in_body = True
 
     def handle_endtag(self, tag):
-        tag = tag.lower()
-
-        if tag == "script":
-            self._in_script = False
-            if self._script_type == "application/ld+json" and self._script_content.strip():
-                try:
-                    parsed = json.loads(self._script_content)
-                    self.json_ld_raw.append(parsed)
-                except (json.JSONDecodeError, ValueError):
-                    pass
-            self._script_type = ""
-            self._script_content = ""
-        elif tag == "style":
-            self._in_style = False
-
-        if tag == "title" and not self._in_body:
-            self.title = " ".join(self._current_text).strip()
-            self._current_text = []
-
-        # Headings
-        if tag in ("h1", "h2", "h3", "h4", "h5", "h6"):
-            text = " ".join(self._current_text).strip()
-            is_question = bool(
-                re.search(
-                    r"\?$|^(what|how|why|when|where|who|which|can|do|does|is|are|should)\b",
-                    text,
-                    re.IGNORECASE,
+        if tag in BLUF_BLOCK_TAGS:
+            # Capture first content block after H2 for BLUF
+            if self._collecting_after_heading and self._after_heading_tags_seen == 1:
+                content = self._take_text().strip()
+                if content and self._after_heading_len < TEXT_PREFIX_LIMIT:
+                    self._after_heading_content.append(content)
+                    self._after_heading_len += len(content) + 1
+
+        elif tag == "a":
+            # Finalize anchor text for internal link tracking
+            if self._in_anchor:
+                anchor_text = " ".join(self._anchor_text_parts).strip()
+                if anchor_text and self._anchor_href:
+                    self.internal_link_anchors.append(
+                        {"text": anchor_text[:100], "href": self._anchor_href}
+                    )
+                self._in_anchor = False
+                self._anchor_href = ""
+                self._anchor_text_parts = []
+                self._anchor_text_len = 0
+
+        elif tag in HEADING_TAGS:
+            if not self._want_text:
+                return
+            text = self._take_text().strip()
+            if self._want_headings:
+                is_question = QUESTION_HEADING_RE.search(text) is not None
+                self.headings.append(
+                    {"tag": tag.upper(), "text": text[:120], "is_question": is_question}
                 )
-            )
-            self.headings.append(
-                {"tag": tag.upper(), "text": text[:120], "is_question": is_question}
-            )
             if tag == "h2" and self._current_heading:
                 self._current_heading["text"] = text[:120]
                 self._collecting_after_heading = True
                 self._after_heading_content = []
+                self._after_heading_len = 0
                 self._after_heading_tags_seen = 0
-            self._current_text = []
-
-        # Capture first content block after H2 for BLUF
-        if (
-            self._collecting_after_heading
-            and self._after_heading_tags_seen == 1
-            and tag in ("p", "ul", "ol", "table", "div")
-        ):
-            content = " ".join(self._current_text).strip()
-            if content:
-                self._after_heading_content.append(content)
-            self._current_text = []
-
-        # Finalize anchor text for internal link tracking
-        if tag == "a" and self._in_anchor:
-            anchor_text = " ".join(self._anchor_text_parts).strip()
-            if anchor_text and self._anchor_href:
-                self.internal_link_anchors.append(
-                    {"text": anchor_text[:100], "href": self._anchor_href}
-                )
-            self._in_anchor = False
-            self._anchor_href = ""
-            self._anchor_text_parts = []
 
-        if tag == "body":
+        elif tag == "script":
+            self._in_script = False
+            if self._script_type == "application/ld+json":
+                script_content = "".join(self._script_parts)
+                if script_content.strip():
+                    try:
+                        parsed = json.loads(script_content)
+                        self.json_ld_raw.append(parsed)
+                    except (json.JSONDecodeError, ValueError):
+                        pass
+            self._script_type = ""
+            self._script_parts = []
+
+        elif tag == "style":
+            self._in_style = False
+
+        elif tag == "title":
+            if not self._in_body:
+                self.title = self._take_text().strip()
+
+        elif tag == "body":
             if self._collecting_after_heading and self._current_heading:
                 self._finalize_bluf_section()
             self._in_body = False
 
-        if self._tag_stack and self._tag_stack[-1] == tag:
-            self._tag_stack.pop()
+        tag_stack = self._tag_stack
+        if tag_stack and tag_stack[-1] == tag:
+            tag_stack.pop()
 
     def handle_data(self, data):
         if self._in_script:
-            self._script_content += data
+            # Only JSON-LD bodies are needed; other scripts are skipped
+            if self._script_type == "application/ld+json":
+                self._script_parts.append(data)
             return
         if self._in_style:
             return
@@ -235,32 +551,43 @@ class SEOSignalExtractor(HTMLParser):
         if not stripped:
             return
 
-        # Title collection
-        if self._tag_stack and self._tag_stack[-1] == "title":
-            self._current_text.append(stripped)
-
-        # Heading text
-        if self._tag_stack and self._tag_stack[-1] in (
-            "h1", "h2", "h3", "h4", "h5", "h6",
-        ):
-            self._current_text.append(stripped)
-
-        # After-heading content
-        if (
-            self._collecting_after_heading
-            and self._after_heading_tags_seen == 1
-            and self._tag_stack
-            and self._tag_stack[-1] in ("p", "ul", "ol", "table", "div", "li", "td", "th", "span", "a", "strong", "em", "b", "i")
-        ):
-            self._current_text.append(stripped)
-
-        # Anchor text for internal link tracking
-        if self._in_anchor:
+        if self._want_text:
+            top = self._tag_stack[-1] if self._tag_stack else None
+            if top == "title":
+                # Title collection
+                self._append_text(stripped, keep_all=True)
+            elif top in HEADING_TAGS:
+                # Heading text
+                self._append_text(stripped)
+            elif (
+                self._collecting_after_heading
+                and self._after_heading_tags_seen == 1
+                and top in BLUF_TEXT_TAGS
+            ):
+                # After-heading content
+                self._append_text(stripped)
+
+        # Anchor text for internal link tracking (only the first 100 chars are kept)
+        if self._in_anchor and self._anchor_text_len < TEXT_PREFIX_LIMIT:
             self._anchor_text_parts.append(stripped)
+            self._anchor_text_len += len(stripped) + 1
 
-        # Body text for word count
-        if self._in_body:
-            self.body_text_parts.append(stripped)
+        # Word count, accumulated per fragment (fragments are already stripped)
+        if self._in_body and self._want_words:
+            self.word_count += len(stripped.split())
+
+        if self._in_body and self._want_fingerprint:
+            # Shingles span text fragments, so they are hashed once at the end
+            self._body_tokens.extend(WORD_TOKEN_RE.findall(stripped.lower()))
+
+    def _fingerprint_signals(self):
+        """Return the simhash/minhash fields of the body text."""
+        hashes = shingle_hashes(self._body_tokens)
+        simhash = simhash64(hashes)
+        return {
+            "simhash": f"{simhash:016x}" if simhash is not None else None,
+            "minhash": minhash_signature(hashes),
+        }
 
     def _classify_bluf_pattern(self, text):
         """Classify the BLUF pattern type of a text block.
@@ -271,22 +598,19 @@ class SEOSignalExtractor(HTMLParser):
             return "none"
         text_lower = text.lower().strip()
         # Yes/No pattern: starts with Yes/No
-        if re.match(r"^(yes|no)\b", text_lower):
+        if BLUF_YESNO_RE.match(text_lower):
             return "yesno"
         # Number pattern: starts with a number, currency, or contains cost/price early
-        if re.match(r"^[\$€£¥]?\d|^\d", text_lower):
+        if BLUF_NUMBER_RE.match(text_lower):
             return "number"
         # Step pattern: starts with step indicators or imperative verbs
-        if re.match(
-            r"^(step\s+\d|first,?\s|to\s+\w+,?\s|set\s+up|install|create|open|go\s+to|navigate|click|run|start)",
-            text_lower,
-        ):
+        if BLUF_STEP_RE.match(text_lower):
             return "step"
         # Verdict pattern: contains comparison words early
-        if re.search(r"^.{0,60}\b(better|best|worse|winner|recommend|choose|prefer|excels|superior)\b", text_lower):
+        if BLUF_VERDICT_RE.search(text_lower):
             return "verdict"
         # Definition pattern: contains "is a/an/the" or "refers to" or "means" early
-        if re.search(r"^.{0,80}\b(is\s+(a|an|the)\b|refers?\s+to|means|defined\s+as)", text_lower):
+        if BLUF_DEFINITION_RE.search(text_lower):
             return "definition"
         return "none"
 
@@ -296,60 +620,67 @@ class SEOSignalExtractor(HTMLParser):
             self._collecting_after_heading = False
             return
 
-        first_content = " ".join(self._after_heading_content).strip()[:250]
-        word_count = len(first_content.split()) if first_content else 0
-        starts_with_answer = bool(
-            re.search(
-                r"^[A-Z].*\b(is|are|means|refers|provides|includes|offers|was|were|has|have|can|will|should|does|do)\b",
-                first_content,
-                re.IGNORECASE,
+        if self._want_bluf:
+            first_content = " ".join(self._after_heading_content).strip()[:250]
+            word_count = len(first_content.split()) if first_content else 0
+            starts_with_answer = (
+                STARTS_WITH_ANSWER_RE.search(first_content) is not None
+            ) if first_content else False
+
+            self.h2_sections.append(
+                {
+                    "heading": self._current_heading.get("text", ""),
+                    "first_content": first_content,
+                    "word_count": word_count,
+                    "starts_with_answer": starts_with_answer,
+                    "bluf_pattern_type": self._classify_bluf_pattern(first_content),
+                }
             )
-        ) if first_content else False
-
-        self.h2_sections.append(
-            {
-                "heading": self._current_heading.get("text", ""),
-                "first_content": first_content,
-                "word_count": word_count,
-                "starts_with_answer": starts_with_answer,
-                "bluf_pattern_type": self._classify_bluf_pattern(first_content),
-            }
-        )
         self._current_heading = None
         self._collecting_after_heading = False
 
     def get_results(self, url=""):
-        """Return all extracted signals as a dict."""
-        # Compute word count from body text
-        body_text = " ".join(self.body_text_parts)
-        word_count = len(body_text.split()) if body_text else 0
-
+        """Return the extracted signals (only the requested fields, if any) as a dict."""
+        results = {
+            "url": url,
+            "title": self.title,
+            "meta_description": self.meta_description,
+            "og_title": self.og_title,
+            "og_description": self.og_description,
+            "og_image": self.og_image,
+            "twitter_card": self.twitter_card,
+            "canonical": self.canonical,
+            "word_count": self.word_count,
+            "headings": self.headings,
+        }
+        if self._want_json_ld:
+            results.update(self._schema_signals())
+        results.update({
+            "bluf_analysis": self.h2_sections,
+            "lists_count": self.lists_count,
+            "tables_count": self.tables_count,
+            "images_count": self.images_count,
+            "total_images": self.images_count,
+            "images_with_alt": self.images_with_alt,
+            "images_missing_alt": self.images_missing_alt,
+            "alt_texts": self.alt_texts,
+        })
+        if self._want_link_counts or self._want_anchors:
+            results.update(self._link_signals(url))
+        if self._want_fingerprint:
+            results.update(self._fingerprint_signals())
+
+        if self._fields is not None:
+            results = {k: v for k, v in results.items() if k in self._fields}
+        return results
+
+    def _schema_signals(self):
+        """Return the JSON-LD derived fields."""
         # Extract schema types from JSON-LD
         schema_types = []
         for item in self.json_ld_raw:
             self._collect_schema_types(item, schema_types)
 
-        # Determine page URL for link classification
-        page_host = ""
-        if url:
-            try:
-                page_host = urlparse(url).hostname or ""
-            except Exception:
-                pass
-
-        # Classify links
-        internal_links = 0
-        external_links = 0
-        for link in self.links:
-            try:
-                link_host = urlparse(link).hostname or ""
-                if page_host and link_host == page_host:
-                    internal_links += 1
-                else:
-                    external_links += 1
-            except Exception:
-                external_links += 1
-
         # JSON-LD type info
         json_ld_info = []
         for item in self.json_ld_raw:
@@ -369,8 +700,34 @@ class SEOSignalExtractor(HTMLParser):
         has_local_business_schema = any("localbusiness" in t or t.endswith("business") for t in types_lower)
         has_speakable_schema = any("speakable" in t for t in types_lower)
 
-        # Entity properties from JSON-LD
-        entity_props = self._extract_entity_properties()
+        return {
+            "json_ld": json_ld_info,
+            "schema_types": list(dict.fromkeys(schema_types)),
+            "has_faq_schema": has_faq,
+            "has_howto_schema": has_howto,
+            "has_article_schema": has_article,
+            "has_breadcrumb_schema": has_breadcrumb,
+            "has_video_object_schema": has_video_object_schema,
+            "has_local_business_schema": has_local_business_schema,
+            "has_speakable_schema": has_speakable_schema,
+            # Entity properties from JSON-LD
+            "entity_properties": self._extract_entity_properties(),
+        }
+
+    def _link_signals(self, url):
+        """Return link counts and same-host anchors relative to the page URL."""
+        # Determine page URL for link classification
+        page_host = ""
+        if url:
+            try:
+                page_host = url_hostname(url) or ""
+            except Exception:
+                pass
+
+        # Classify links
+        total_links = sum(self.link_hosts.values())
+        internal_links = self.link_hosts.get(page_host, 0) if page_host else 0
+        external_links = total_links - internal_links
 
         # Filter internal link anchors (keep only same-host links)
         filtered_anchors = []
@@ -381,40 +738,12 @@ class SEOSignalExtractor(HTMLParser):
                 filtered_anchors.append(anchor)
             elif page_host:
                 try:
-                    if urlparse(href).hostname == page_host:
+                    if url_hostname(href) == page_host:
                         filtered_anchors.append(anchor)
                 except Exception:
                     pass
 
         return {
-            "url": url,
-            "title": self.title,
-            "meta_description": self.meta_description,
-            "og_title": self.og_title,
-            "og_description": self.og_description,
-            "og_image": self.og_image,
-            "twitter_card": self.twitter_card,
-            "canonical": self.canonical,
-            "word_count": word_count,
-            "headings": self.headings,
-            "json_ld": json_ld_info,
-            "schema_types": list(dict.fromkeys(schema_types)),
-            "has_faq_schema": has_faq,
-            "has_howto_schema": has_howto,
-            "has_article_schema": has_article,
-            "has_breadcrumb_schema": has_breadcrumb,
-            "has_video_object_schema": has_video_object_schema,
-            "has_local_business_schema": has_local_business_schema,
-            "has_speakable_schema": has_speakable_schema,
-            "entity_properties": entity_props,
-            "bluf_analysis": self.h2_sections,
-            "lists_count": self.lists_count,
-            "tables_count": self.tables_count,
-            "images_count": self.images_count,
-            "total_images": self.images_count,
-            "images_with_alt": self.images_with_alt,
-            "images_missing_alt": self.images_missing_alt,
-            "alt_texts": self.alt_texts,
             "internal_links": internal_links,
             "external_links": external_links,
             "internal_link_anchors": filtered_anchors,
@@ -500,6 +829,620 @@ class SEOSignalExtractor(HTMLParser):
                 self._collect_schema_types(item, types)
 
 
+def feed_stream(parser, stream, chunk_size=READ_CHUNK_SIZE):
+    """Feed a text stream to an HTMLParser in chunks.
+
+    Chunks are cut just before a "<" so a text run is never split across
+    feed() calls; HTMLParser would otherwise report it as two fragments and
+    change the joined heading/title text. Peak memory is one chunk plus the
+    longest run of text without a "<".
+    """
+    pending = []
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        cut = chunk.rfind("<")
+        if cut < 0:
+            pending.append(chunk)
+            continue
+        pending.append(chunk[:cut])
+        data = "".join(pending)
+        if data:
+            parser.feed(data)
+        pending = [chunk[cut:]]
+    data = "".join(pending)
+    if data:
+        parser.feed(data)
+
+
+class _LxmlEventTarget:
+    """lxml parser target that replays libxml2 events as HTMLParser callbacks.
+
+    libxml2 reports a text run in pieces, so text is buffered and handed to
+    handle_data once per run, at the next tag, comment, doctype or
+    processing instruction, as html.parser does. End events of void
+    elements are dropped, as html.parser reports none for ``<img>``.
+    """
+
+    __slots__ = ("_extractor", "_text")
+
+    def __init__(self, extractor):
+        self._extractor = extractor
+        self._text = []
+
+    def _flush(self):
+        if self._text:
+            data = "".join(self._text)
+            self._text = []
+            self._extractor.handle_data(data)
+
+    def start(self, tag, attrib):
+        if self._text:
+            self._flush()
+        # handle_starttag builds a dict from attrs, which a dict already is
+        self._extractor.handle_starttag(tag, attrib)
+
+    def end(self, tag):
+        if tag in VOID_TAGS:
+            return
+        if self._text:
+            self._flush()
+        self._extractor.handle_endtag(tag)
+
+    def data(self, data):
+        self._text.append(data)
+
+    def comment(self, text):
+        self._flush()
+
+    def doctype(self, *args):
+        self._flush()
+
+    def pi(self, *args):
+        self._flush()
+
+    def close(self):
+        self._flush()
+
+
+class _LxmlFeeder:
+    """feed()/close() wrapper driving an extractor from lxml's HTML parser."""
+
+    __slots__ = ("_parser",)
+
+    def __init__(self, extractor):
+        self._parser = lxml_etree.HTMLParser(
+            target=_LxmlEventTarget(extractor), recover=True, no_network=True,
+            huge_tree=True, remove_blank_text=False,
+        )
+
+    def feed(self, data):
+        self._parser.feed(data)
+
+    def close(self):
+        try:
+            self._parser.close()
+        except lxml_etree.XMLSyntaxError:
+            # Empty or unrecoverable input: keep the signals seen so far
+            pass
+
+
+def resolve_backend(backend=DEFAULT_PARSER):
+    """Return the concrete parser backend ("stdlib" or "lxml") for a --parser choice.
+
+    Raises ValueError for an unknown backend or when lxml is requested but
+    not installed.
+    """
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend: {backend}")
+    if backend == "lxml" and lxml_etree is None:
+        raise ValueError("The lxml parser backend needs lxml (pip install lxml)")
+    return backend
+
+
+def feed_html(extractor, html_content, backend=DEFAULT_PARSER):
+    """Parse a whole HTML document into an extractor with the given backend."""
+    if resolve_backend(backend) == "lxml":
+        feeder = _LxmlFeeder(extractor)
+        feeder.feed(html_content)
+        feeder.close()
+    else:
+        extractor.feed(html_content)
+
+
+def _prepare_extractor(extractor, fields):
+    if extractor is None:
+        return SEOSignalExtractor(fields)
+    extractor.configure(fields)
+    extractor.reset()
+    return extractor
+
+
+def extract_signals(html_content, url="", fields=None, extractor=None, backend=DEFAULT_PARSER):
+    """Parse one HTML document and return its signals, optionally limited to fields.
+
+    Pass an existing SEOSignalExtractor to reuse it instead of creating one.
+    backend selects the parser (see resolve_backend).
+    """
+    extractor = _prepare_extractor(extractor, fields)
+    feed_html(extractor, html_content, backend)
+    return extractor.get_results(url=url)
+
+
+def extract_signals_from_stream(stream, url="", fields=None, chunk_size=READ_CHUNK_SIZE,
+                                extractor=None, backend=DEFAULT_PARSER):
+    """Like extract_signals, but reads the HTML from a text stream in chunks."""
+    extractor = _prepare_extractor(extractor, fields)
+    if resolve_backend(backend) == "lxml":
+        feeder = _LxmlFeeder(extractor)
+        feed_stream(feeder, stream, chunk_size)
+        feeder.close()
+    else:
+        feed_stream(extractor, stream, chunk_size)
+    return extractor.get_results(url=url)
+
+
+class SignalCache:
+    """On-disk cache of extraction results, keyed by content.
+
+    Keys are the SHA-256 of the extractor version, the parser backend, the
+    page URL, the requested field set (none for the default fields) and the
+    raw HTML bytes. Entries are JSON files under ``<directory>/<k[:2]>/<k>.json``;
+    a hit refreshes the file mtime and prune() deletes the least recently
+    used entries once the directory grows past max_bytes.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_CACHE_MAX_MB * 1024 * 1024,
+                 backend=DEFAULT_PARSER):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.backend = resolve_backend(backend)
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def _hasher(self, url, key_fields):
+        h = hashlib.sha256()
+        # Backends can differ on malformed markup, so their results are kept
+        # apart; stdlib keys predate backends and stay unchanged
+        version = EXTRACTOR_VERSION if self.backend == "stdlib" else f"{EXTRACTOR_VERSION}+{self.backend}"
+        if key_fields:
+            version += "+fields=" + ",".join(key_fields)
+        h.update(f"{version}\0{url}\0".encode("utf-8"))
+        return h
+
+    def key_for_bytes(self, data, url="", key_fields=()):
+        h = self._hasher(url, key_fields)
+        h.update(data)
+        return h.hexdigest()
+
+    def key_for_file(self, path, url="", key_fields=()):
+        h = self._hasher(url, key_fields)
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(block)
+        return h.hexdigest()
+
+    def spool_stream(self, stream, url="", key_fields=()):
+        """Copy a binary stream to a temporary file while hashing it.
+
+        Returns (key, file positioned at the start); the file stays in
+        memory up to STDIN_SPOOL_BYTES and the caller closes it.
+        """
+        h = self._hasher(url, key_fields)
+        spool = tempfile.SpooledTemporaryFile(max_size=STDIN_SPOOL_BYTES)
+        for block in iter(lambda: stream.read(1024 * 1024), b""):
+            h.update(block)
+            spool.write(block)
+        spool.seek(0)
+        return h.hexdigest(), spool
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + ".json")
+
+    def get(self, key):
+        """Return the cached result for key, or None (counted as a miss)."""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return result
+
+    def put(self, key, result):
+        """Store a result; write failures leave the cache unchanged."""
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(result, f, ensure_ascii=False)
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+    def prune(self):
+        """Evict least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        total = 0
+        try:
+            shards = list(os.scandir(self.directory))
+        except OSError:
+            return
+        for shard in shards:
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, entry.path))
+                total += st.st_size
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self.evicted += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def prune_if_due(self, interval=PRUNE_MIN_INTERVAL):
+        """Prune unless the cache was pruned within the last interval seconds.
+
+        The time of the last prune is the mtime of a marker file, so runs
+        that each extract one page do not walk the whole cache.
+        """
+        marker = os.path.join(self.directory, ".pruned")
+        try:
+            if time.time() - os.stat(marker).st_mtime < interval:
+                return
+        except OSError:
+            pass
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(marker, "a"):
+                pass
+            os.utime(marker)
+        except OSError:
+            pass
+        self.prune()
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "evicted": self.evicted}
+
+
+def cache_key_fields(fields):
+    """Return the field set a cache entry for this --fields projection is keyed by.
+
+    Only the requested fields are extracted and cached, so each projection
+    has its own entries; the default output has an empty key set.
+    """
+    return tuple(sorted(fields)) if fields else ()
+
+
+def extract_file_signals(path, url="", fields=None, cache=None, extractor=None,
+                         backend=DEFAULT_PARSER):
+    """Extract signals for an HTML file, going through the cache when given.
+
+    Returns (signals, cache_hit). With a cache, the cache's backend is used.
+    """
+    if cache is None:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return extract_signals_from_stream(f, url=url, fields=fields, extractor=extractor,
+                                               backend=backend), False
+    key = cache.key_for_file(path, url, cache_key_fields(fields))
+    results = cache.get(key)
+    if results is not None:
+        return results, True
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        results = extract_signals_from_stream(f, url=url, fields=fields, extractor=extractor,
+                                              backend=cache.backend)
+    cache.put(key, results)
+    return results, False
+
+
+def extract_bytes_signals(data, url="", fields=None, cache=None, extractor=None, encoding="utf-8",
+                          backend=DEFAULT_PARSER):
+    """Like extract_file_signals, for raw HTML bytes (e.g. an HTTP body)."""
+    key = cache.key_for_bytes(data, url, cache_key_fields(fields)) if cache is not None else None
+    if key is not None:
+        results = cache.get(key)
+        if results is not None:
+            return results, True
+    # Decode the way a text-mode file read does (including newline handling)
+    stream = io.TextIOWrapper(io.BytesIO(data), encoding=encoding, errors="replace")
+    results = extract_signals_from_stream(stream, url=url, fields=fields, extractor=extractor,
+                                          backend=cache.backend if key else backend)
+    if key is not None:
+        cache.put(key, results)
+    return results, False
+
+
+def extract_binary_stream_signals(stream, url="", fields=None, cache=None,
+                                  backend=DEFAULT_PARSER):
+    """Like extract_file_signals, for a binary stream read once (e.g. stdin).
+
+    With a cache the stream is hashed as it is spooled to a temporary file,
+    so memory stays bounded however large the input is.
+    """
+    if cache is None:
+        text = io.TextIOWrapper(stream, encoding="utf-8", errors="replace")
+        return extract_signals_from_stream(text, url=url, fields=fields, backend=backend), False
+    key, spool = cache.spool_stream(stream, url, cache_key_fields(fields))
+    with spool:
+        results = cache.get(key)
+        if results is not None:
+            return results, True
+        text = io.TextIOWrapper(spool, encoding="utf-8", errors="replace")
+        results = extract_signals_from_stream(text, url=url, fields=fields,
+                                              backend=cache.backend)
+    cache.put(key, results)
+    return results, False
+
+
+def _is_glob(pattern):
+    return any(c in pattern for c in "*?[")
+
+
+class BrokenArchive:
+    """Batch source standing for an archive that could not be read to the end."""
+
+    __slots__ = ("archive", "error")
+
+    def __init__(self, archive, error):
+        self.archive = archive
+        self.error = error
+
+
+def _iter_file_or_archive(path, archive_url_prefix):
+    if is_archive(path):
+        try:
+            yield from iter_archive_pages(path, archive_url_prefix)
+        except ArchiveError as e:
+            # Pages read before the damage are kept; the batch goes on
+            yield BrokenArchive(path, str(e)), None
+    else:
+        yield path, path
+
+
+def iter_batch_inputs(paths, manifest=None, archive_url_prefix=""):
+    """Yield (source, url) pairs from files, directories, glob patterns and a manifest.
+
+    Directories are walked recursively for .html/.htm/.xhtml files in sorted
+    order. Manifest lines are ``path<TAB>url`` (url optional, ``#`` comments);
+    ``-`` reads the manifest from stdin. The url defaults to the file path.
+    A source is a file path, or an ArchivePage for each HTML page of a
+    WARC/tar archive given directly or via a glob (url: the record's target
+    URI, or archive_url_prefix + the tar member name). An archive that cannot
+    be read to the end yields a BrokenArchive after its readable pages.
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.lower().endswith(HTML_EXTENSIONS):
+                        full = os.path.join(root, name)
+                        yield full, full
+        elif _is_glob(path) and not os.path.exists(path):
+            for match in sorted(glob.iglob(path, recursive=True)):
+                if os.path.isfile(match):
+                    yield from _iter_file_or_archive(match, archive_url_prefix)
+        else:
+            yield from _iter_file_or_archive(path, archive_url_prefix)
+
+    if manifest:
+        f = sys.stdin if manifest == "-" else open(manifest, "r", encoding="utf-8")
+        try:
+            for line in f:
+                line = line.rstrip("\r\n")
+                if not line.strip() or line.lstrip().startswith("#"):
+                    continue
+                path, _, url = line.partition("\t")
+                yield path, url.strip() or path
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+
+# Per-process cache used by batch workers, keyed by (directory, max_bytes, backend)
+_worker_caches = {}
+
+
+def _extract_batch_item(task):
+    """Worker: extract one page and return (index, failed, cache_hit, NDJSON line).
+
+    Errors are caught per page so one bad file never aborts the batch.
+    Archive pages are read here, from the memory-mapped archive when it is
+    uncompressed, and their records name the archive and the record in it.
+    """
+    index, source, url, fields, backend, cache_config = task
+    cache = None
+    if cache_config is not None:
+        cache = _worker_caches.get(cache_config)
+        if cache is None:
+            cache = _worker_caches[cache_config] = SignalCache(*cache_config)
+    if isinstance(source, BrokenArchive):
+        return index, True, False, json.dumps({"file": source.archive, "error": source.error},
+                                              ensure_ascii=False)
+    if isinstance(source, ArchivePage):
+        record = {"file": source.archive, "record": source.record}
+    else:
+        record = {"file": source}
+    hit = False
+    try:
+        if isinstance(source, ArchivePage):
+            signals, hit = extract_bytes_signals(source.read(), url=url, fields=fields, cache=cache,
+                                                 encoding=source.encoding, backend=backend)
+        else:
+            signals, hit = extract_file_signals(source, url=url, fields=fields, cache=cache,
+                                                backend=backend)
+        record.update(signals)
+        failed = False
+    except Exception as e:
+        record.update({"url": url, "error": f"{type(e).__name__}: {e}"})
+        failed = True
+    return index, failed, hit, json.dumps(record, ensure_ascii=False)
+
+
+def run_batch(inputs, out, fields=None, jobs=None, ordered=False, chunksize=8, cache=None,
+              backend=DEFAULT_PARSER):
+    """Extract signals for many pages, writing one NDJSON record per page.
+
+    Args:
+        inputs: Iterable of (path or ArchivePage, url) pairs
+        out: Text stream for NDJSON output
+        fields: Optional set of fields to keep
+        jobs: Worker processes (default: CPU count; 1 runs in-process)
+        ordered: Emit records in input order instead of completion order
+        chunksize: Tasks handed to a worker at a time
+        cache: Optional SignalCache; workers open the same directory, and
+            its hit/miss counters are updated from their results
+        backend: Parser backend (see resolve_backend)
+
+    Returns:
+        Tuple of (pages processed, pages with errors)
+    """
+    jobs = jobs or os.cpu_count() or 1
+    backend = resolve_backend(backend)
+    cache_config = (cache.directory, cache.max_bytes, cache.backend) if cache is not None else None
+    tasks = ((i, source, url, fields, backend, cache_config)
+             for i, (source, url) in enumerate(inputs))
+    processed = errors = 0
+
+    def emit(result):
+        nonlocal processed, errors
+        _, failed, hit, line = result
+        processed += 1
+        errors += failed
+        if cache is not None and not failed:
+            if hit:
+                cache.hits += 1
+            else:
+                cache.misses += 1
+        out.write(line)
+        out.write("\n")
+
+    if jobs == 1:
+        for task in tasks:
+            emit(_extract_batch_item(task))
+        return processed, errors
+
+    import multiprocessing
+
+    with multiprocessing.Pool(processes=jobs) as pool:
+        if ordered:
+            results = pool.imap(_extract_batch_item, tasks, chunksize=chunksize)
+        else:
+            results = pool.imap_unordered(_extract_batch_item, tasks, chunksize=chunksize)
+        for result in results:
+            emit(result)
+
+    return processed, errors
+
+
+def _read_requests(stream, framing):
+    """Yield raw request payloads (bytes) from a binary stream until EOF.
+
+    ndjson: one JSON object per line. length: an ASCII byte count on its own
+    line followed by exactly that many bytes of JSON.
+    """
+    if framing == "ndjson":
+        for line in stream:
+            if line.strip():
+                yield line
+        return
+    while True:
+        header = stream.readline()
+        if not header:
+            return
+        if not header.strip():
+            continue
+        size = int(header)
+        payload = stream.read(size)
+        if len(payload) < size:
+            raise EOFError(f"Expected {size} bytes, got {len(payload)}")
+        yield payload
+
+
+def _write_response(stream, response, framing):
+    payload = json.dumps(response, ensure_ascii=False).encode("utf-8")
+    if framing == "ndjson":
+        stream.write(payload + b"\n")
+    else:
+        stream.write(b"%d\n" % len(payload))
+        stream.write(payload)
+    stream.flush()
+
+
+def _serve_request(extractor, request, cache, backend):
+    fields = request.get("fields")
+    if isinstance(fields, str):
+        fields = {f.strip() for f in fields.split(",")}
+    if "html" in request:
+        return extract_signals(request["html"], url=request.get("url") or "",
+                               fields=fields, extractor=extractor, backend=backend)
+    if "path" in request:
+        path = request["path"]
+        results, _ = extract_file_signals(path, url=request.get("url") or path, fields=fields,
+                                          cache=cache, extractor=extractor, backend=backend)
+        return results
+    raise ValueError("Request needs 'html' or 'path'")
+
+
+def serve(inp, out, framing="ndjson", cache=None, backend=DEFAULT_PARSER):
+    """Answer extraction requests until EOF, reusing one extractor.
+
+    Each request is a JSON object with ``html`` (the document) or ``path``
+    (a file, read through the cache), plus optional ``url``, ``fields``
+    (list or comma-separated string) and ``id``. Each response is the
+    signals dict, or ``{"error": ...}``, with ``id`` echoed first when given.
+
+    Args:
+        inp: Binary input stream
+        out: Binary output stream (flushed after every response)
+        framing: "ndjson" or "length" (byte-count line before each message)
+        cache: Optional SignalCache for path requests
+        backend: Parser backend (see resolve_backend)
+
+    Returns:
+        Number of requests answered
+    """
+    backend = resolve_backend(backend)
+    extractor = SEOSignalExtractor()
+    count = 0
+    for payload in _read_requests(inp, framing):
+        request_id = None
+        try:
+            request = json.loads(payload)
+            if not isinstance(request, dict):
+                raise ValueError("Request must be a JSON object")
+            request_id = request.get("id")
+            results = _serve_request(extractor, request, cache, backend)
+        except Exception as e:
+            results = {"error": f"{type(e).__name__}: {e}"}
+        response = {"id": request_id} if request_id is not None else {}
+        response.update(results)
+        _write_response(out, response, framing)
+        count += 1
+        if cache is not None and count % SERVE_PRUNE_INTERVAL == 0:
+            cache.prune()
+    if cache is not None:
+        cache.prune()
+    return count
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Extract SEO/AEO signals from HTML. Outputs JSON to stdout.",
@@ -509,12 +1452,18 @@ def main():
             "  %(prog)s page.html --compact\n"
             "  %(prog)s page.html --fields title,word_count,schema_types\n"
             "  cat page.html | %(prog)s --url https://example.com/page\n"
+            "  %(prog)s ./pages/ --output signals.ndjson      # batch mode\n"
+            "  %(prog)s --manifest pages.tsv --ordered --jobs 8\n"
+            "  %(prog)s crawl.warc.gz --output signals.ndjson  # pages inside an archive\n"
+            "  %(prog)s page.html --parser stdlib             # force html.parser\n"
         ),
         formatter_class=argparse.RawDescriptionHelpFormatter,
     )
     parser.add_argument(
-        "file", nargs="?", default=None,
-        help="HTML file to analyze. Reads from stdin if omitted.",
+        "file", nargs="*", default=None,
+        help="HTML file to analyze. Reads from stdin if omitted. "
+             "Several files, directories, glob patterns or WARC/tar archives "
+             "switch to batch mode.",
     )
     parser.add_argument(
         "--url", default=None,
@@ -527,33 +1476,122 @@ def main():
     )
     parser.add_argument(
         "--fields", default=None,
-        help="Comma-separated list of fields to include in output. "
+        help="Comma-separated list of fields to include in output; collectors "
+             "for other fields are skipped while parsing. "
              "Example: --fields title,word_count,schema_types,bluf_analysis",
     )
+    parser.add_argument(
+        "--parser", choices=PARSER_CHOICES, default=DEFAULT_PARSER,
+        help="HTML parser backend: 'stdlib' (html.parser; default) or 'lxml' (faster, "
+             "needs lxml installed; signals differ on malformed markup).",
+    )
+    batch = parser.add_argument_group("batch mode")
+    batch.add_argument(
+        "--manifest", default=None,
+        help="File of 'path<TAB>url' lines to process ('-' for stdin).",
+    )
+    batch.add_argument(
+        "--batch", action="store_true",
+        help="Force batch (NDJSON) output even for a single input.",
+    )
+    batch.add_argument(
+        "--jobs", type=int, default=None,
+        help="Worker processes (default: number of CPU cores).",
+    )
+    batch.add_argument(
+        "--ordered", action="store_true",
+        help="Emit records in input order (default: completion order).",
+    )
+    batch.add_argument(
+        "--output", default=None,
+        help="Write NDJSON to this file instead of stdout.",
+    )
+    batch.add_argument(
+        "--archive-url-prefix", default="",
+        help="Prefix joined to tar member names to form page URLs, e.g. "
+             "'https://' for host/path layouts (WARC records use their target URI).",
+    )
+    parser.add_argument(
+        "--serve", nargs="?", const="ndjson", choices=("ndjson", "length"), default=None,
+        help="Run as a long-lived worker answering JSON requests on stdin "
+             "({html|path, url, fields, id}) with one response each on stdout. "
+             "Framing is NDJSON (default) or 'length' (byte count line + payload).",
+    )
+    caching = parser.add_argument_group("result cache")
+    caching.add_argument(
+        "--no-cache", action="store_true",
+        help="Always parse; do not read or write the result cache.",
+    )
+    caching.add_argument(
+        "--cache-dir", default=DEFAULT_CACHE_DIR,
+        help="Result cache directory (default: %(default)s).",
+    )
+    caching.add_argument(
+        "--cache-max-mb", type=float, default=DEFAULT_CACHE_MAX_MB,
+        help="Evict least recently used results beyond this size, after batch runs "
+             "and at most hourly otherwise (default: %(default)s).",
+    )
     args = parser.parse_args()
 
-    # Read HTML
-    if args.file:
+    try:
+        backend = resolve_backend(args.parser)
+    except ValueError as e:
+        print(json.dumps({"error": str(e)}), file=sys.stderr)
+        sys.exit(1)
+
+    cache = None
+    if not args.no_cache:
+        cache = SignalCache(args.cache_dir, int(args.cache_max_mb * 1024 * 1024), backend=backend)
+
+    if args.serve:
         try:
-            with open(args.file, "r", encoding="utf-8", errors="replace") as f:
-                html_content = f.read()
-        except FileNotFoundError:
-            print(json.dumps({"error": f"File not found: {args.file}"}), file=sys.stderr)
+            serve(sys.stdin.buffer, sys.stdout.buffer, framing=args.serve, cache=cache,
+                  backend=backend)
+        except (ValueError, EOFError) as e:
+            # Broken length framing: the stream cannot be resynchronized
+            print(json.dumps({"error": f"Bad request framing: {e}"}), file=sys.stderr)
             sys.exit(1)
-        url = args.url if args.url else args.file
-    else:
-        html_content = sys.stdin.read()
-        url = args.url or ""
+        return
 
-    # Parse and extract
-    extractor = SEOSignalExtractor()
-    extractor.feed(html_content)
-    results = extractor.get_results(url=url)
-
-    # Filter fields if requested
+    fields = None
     if args.fields:
-        requested = [f.strip() for f in args.fields.split(",")]
-        results = {k: v for k, v in results.items() if k in requested}
+        fields = {f.strip() for f in args.fields.split(",")}
+
+    files = args.file or []
+    if (args.batch or args.manifest or len(files) > 1
+            or any(os.path.isdir(p) or is_archive(p) or (_is_glob(p) and not os.path.exists(p))
+                   for p in files)):
+        inputs = iter_batch_inputs(files, args.manifest, args.archive_url_prefix)
+        out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+        try:
+            processed, errors = run_batch(inputs, out, fields=fields, jobs=args.jobs,
+                                          ordered=args.ordered, cache=cache, backend=backend)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        summary = f"Processed {processed} pages ({errors} errors)"
+        if cache is not None:
+            cache.prune()
+            summary += (f"; cache: {cache.hits} hits, {cache.misses} misses,"
+                        f" {cache.evicted} evicted")
+        print(summary, file=sys.stderr)
+        sys.exit(1 if processed and errors == processed else 0)
+
+    # Parse and extract, streaming the HTML in chunks
+    if files:
+        path = files[0]
+        url = args.url if args.url else path
+        try:
+            results, _ = extract_file_signals(path, url=url, fields=fields, cache=cache,
+                                              backend=backend)
+        except FileNotFoundError:
+            print(json.dumps({"error": f"File not found: {path}"}), file=sys.stderr)
+            sys.exit(1)
+    else:
+        results, _ = extract_binary_stream_signals(sys.stdin.buffer, url=args.url or "",
+                                                   fields=fields, cache=cache, backend=backend)
+    if cache is not None:
+        cache.prune_if_due()
 
     # Output JSON
     indent = None if args.compact else 2
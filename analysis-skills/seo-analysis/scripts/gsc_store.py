@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""Store GSC exports in a local SQLite database and analyze them with indexed SQL.
+
+Usage:
+    python3 gsc_store.py load seo/gsc.db gsc_current_*.json --period current
+    python3 gsc_store.py load seo/gsc.db gsc_prior_*.json --period prior
+    python3 gsc_store.py query seo/gsc.db quick_wins --brand acme --limit 20
+    python3 gsc_store.py query seo/gsc.db brand_split --brand acme --brand "acme corp"
+    python3 gsc_store.py query seo/gsc.db trends --period current --prior prior
+    python3 gsc_store.py sql seo/gsc.db "SELECT page, SUM(clicks) FROM gsc_rows GROUP BY page"
+
+load streams rows from query_analytics responses (JSON with "rows", one
+file per paginated pull) or NDJSON rows into the gsc_rows table, in
+batched inserts inside one transaction. "keys" are named by --dimensions
+(default: query,page; also date, country, device), and each load is
+tagged with a --period label so several windows share one database.
+Rows are keyed by (period, query, page, date, country, device), so
+loading a page twice replaces it instead of double counting. The table
+is indexed on query, page and date.
+
+Prebuilt queries (query subcommand), over one period with rows summed
+across dates/countries/devices and position weighted by impressions:
+    quick_wins    position 8-20 and impressions > 100, by impressions
+    zero_click    impressions > 200 and no clicks, by impressions
+    brand_split   brand vs non-brand totals (needs --brand)
+    top_pages     pages by clicks
+    trends        --period vs --prior joined on (query, page): click,
+                  impression, CTR and position deltas; rising / falling /
+                  stable (position change beyond 3), new, lost
+--brand terms (case-insensitive substrings) also exclude branded queries
+from quick_wins, zero_click, top_pages and trends.
+
+Output: JSON to stdout ({"query", "rows"} for queries; load counts).
+Dependencies: Python 3 stdlib only (no pip install required).
+"""
+
+import argparse
+import itertools
+import json
+import os
+import re
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ctr_opportunities import iter_gsc_rows  # noqa: E402
+
+KEY_COLUMNS = ("query", "page", "date", "country", "device")
+DEFAULT_DIMENSIONS = ("query", "page")
+INSERT_BATCH_ROWS = 10000
+# Page cache while loading (KiB): rows arrive in random key order, so the
+# primary key and indexes are updated all over the file
+LOAD_CACHE_KIB = 256 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS gsc_rows (
+    period TEXT NOT NULL,
+    query TEXT NOT NULL DEFAULT '',
+    page TEXT NOT NULL DEFAULT '',
+    date TEXT NOT NULL DEFAULT '',
+    country TEXT NOT NULL DEFAULT '',
+    device TEXT NOT NULL DEFAULT '',
+    clicks INTEGER NOT NULL DEFAULT 0,
+    impressions INTEGER NOT NULL DEFAULT 0,
+    ctr REAL NOT NULL DEFAULT 0,
+    position REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (period, query, page, date, country, device)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS gsc_rows_query ON gsc_rows (query);
+CREATE INDEX IF NOT EXISTS gsc_rows_page ON gsc_rows (page);
+CREATE INDEX IF NOT EXISTS gsc_rows_date ON gsc_rows (date);
+"""
+
+# Rows of one period summed over dates, countries and devices
+_PERIOD_TOTALS = """
+SELECT query, page, SUM(clicks) AS clicks, SUM(impressions) AS impressions,
+       SUM(position * impressions) / NULLIF(SUM(impressions), 0) AS position
+FROM gsc_rows WHERE period = {period} {brand_filter}
+GROUP BY query, page
+"""
+
+QUERIES = {
+    "quick_wins": """
+WITH totals AS ({totals})
+SELECT query, page, clicks, impressions,
+       ROUND(CAST(clicks AS REAL) / impressions, 4) AS ctr, ROUND(position, 1) AS position
+FROM totals
+WHERE position BETWEEN 8 AND 20 AND impressions > 100
+ORDER BY impressions DESC, query, page
+LIMIT :limit
+""",
+    "zero_click": """
+WITH totals AS ({totals})
+SELECT query, page, impressions, ROUND(position, 1) AS position
+FROM totals
+WHERE impressions > 200 AND clicks = 0
+ORDER BY impressions DESC, query, page
+LIMIT :limit
+""",
+    "top_pages": """
+SELECT page, COUNT(DISTINCT query) AS queries, SUM(clicks) AS clicks,
+       SUM(impressions) AS impressions,
+       ROUND(CAST(SUM(clicks) AS REAL) / NULLIF(SUM(impressions), 0), 4) AS ctr,
+       ROUND(SUM(position * impressions) / NULLIF(SUM(impressions), 0), 1) AS position
+FROM gsc_rows WHERE period = :period {brand_filter}
+GROUP BY page
+ORDER BY clicks DESC, impressions DESC, page
+LIMIT :limit
+""",
+    "brand_split": """
+SELECT CASE WHEN is_brand(query) THEN 'brand' ELSE 'non_brand' END AS segment,
+       COUNT(DISTINCT query) AS queries, SUM(clicks) AS clicks,
+       SUM(impressions) AS impressions,
+       ROUND(CAST(SUM(clicks) AS REAL) / NULLIF(SUM(impressions), 0), 4) AS ctr,
+       ROUND(SUM(position * impressions) / NULLIF(SUM(impressions), 0), 1) AS position
+FROM gsc_rows WHERE period = :period
+GROUP BY segment
+ORDER BY segment
+""",
+    "trends": """
+WITH cur AS ({totals}),
+     prev AS ({prior_totals}),
+     keys AS (SELECT query, page FROM cur UNION SELECT query, page FROM prev)
+SELECT keys.query, keys.page,
+       cur.clicks AS clicks, prev.clicks AS prior_clicks,
+       COALESCE(cur.clicks, 0) - COALESCE(prev.clicks, 0) AS clicks_delta,
+       cur.impressions AS impressions, prev.impressions AS prior_impressions,
+       COALESCE(cur.impressions, 0) - COALESCE(prev.impressions, 0) AS impressions_delta,
+       ROUND(CAST(cur.clicks AS REAL) / cur.impressions
+             - CAST(prev.clicks AS REAL) / prev.impressions, 4) AS ctr_delta,
+       ROUND(cur.position, 1) AS position, ROUND(prev.position, 1) AS prior_position,
+       ROUND(cur.position - prev.position, 1) AS position_delta,
+       CASE WHEN prev.query IS NULL THEN 'new'
+            WHEN cur.query IS NULL THEN 'lost'
+            WHEN cur.position - prev.position < -3 THEN 'rising'
+            WHEN cur.position - prev.position > 3 THEN 'falling'
+            ELSE 'stable' END AS trend
+FROM keys
+LEFT JOIN cur ON cur.query = keys.query AND cur.page = keys.page
+LEFT JOIN prev ON prev.query = keys.query AND prev.page = keys.page
+ORDER BY ABS(COALESCE(cur.clicks, 0) - COALESCE(prev.clicks, 0)) DESC,
+         ABS(COALESCE(cur.impressions, 0) - COALESCE(prev.impressions, 0)) DESC,
+         keys.query, keys.page
+LIMIT :limit
+""",
+}
+# Queries whose rows exclude branded queries when --brand is given
+BRAND_FILTERED = frozenset(("quick_wins", "zero_click", "top_pages", "trends"))
+
+
+def connect(path):
+    """Open (creating if needed) a GSC store."""
+    connection = sqlite3.connect(path)
+    connection.row_factory = sqlite3.Row
+    connection.execute("PRAGMA journal_mode = WAL")
+    connection.execute("PRAGMA synchronous = NORMAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def _row_values(rows, period, dimensions):
+    """Yield gsc_rows insert tuples for GSC rows."""
+    positions = [dimensions.index(c) if c in dimensions else None for c in KEY_COLUMNS]
+    for row in rows:
+        keys = row.get("keys")
+        if keys:
+            values = [keys[i] if i is not None else "" for i in positions]
+        else:
+            values = [row.get(c) or "" for c in KEY_COLUMNS]
+        impressions = row.get("impressions") or 0
+        clicks = row.get("clicks") or 0
+        ctr = row.get("ctr")
+        if ctr is None:
+            ctr = clicks / impressions if impressions else 0
+        yield (period, *values, clicks, impressions, ctr, row.get("position") or 0)
+
+
+def load_rows(connection, rows, period, dimensions=DEFAULT_DIMENSIONS):
+    """Insert GSC rows for a period in batches; return the number of rows read."""
+    values = _row_values(rows, period, dimensions)
+    count = 0
+    connection.execute(f"PRAGMA cache_size = -{LOAD_CACHE_KIB}")
+    with connection:
+        while True:
+            batch = list(itertools.islice(values, INSERT_BATCH_ROWS))
+            if not batch:
+                return count
+            connection.executemany(
+                "INSERT OR REPLACE INTO gsc_rows (period, query, page, date, country, device,"
+                " clicks, impressions, ctr, position) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                batch,
+            )
+            count += len(batch)
+
+
+def brand_matcher(terms):
+    """Return a function testing whether a query contains any brand term (case-insensitive).
+
+    Raises ValueError when every term is blank (an empty pattern matches every query).
+    """
+    terms = [t.strip().lower() for t in terms if t.strip()]
+    if not terms:
+        raise ValueError("--brand terms are all blank")
+    pattern = re.compile("|".join(re.escape(t) for t in terms))
+
+    def is_brand(query):
+        return bool(pattern.search(query.lower())) if query else False
+
+    return is_brand
+
+
+def run_query(connection, name, period="current", prior="prior", brand=(), limit=50):
+    """Run a prebuilt query; return its rows as dicts.
+
+    Raises ValueError for an unknown query, brand_split without brand terms,
+    or brand terms that are all blank.
+    """
+    if name not in QUERIES:
+        raise ValueError(f"Unknown query: {name} (choose from {', '.join(sorted(QUERIES))})")
+    if name == "brand_split" and not brand:
+        raise ValueError("brand_split needs --brand terms")
+    brand_filter = ""
+    if brand:
+        connection.create_function("is_brand", 1, brand_matcher(brand), deterministic=True)
+        if name in BRAND_FILTERED:
+            brand_filter = "AND NOT is_brand(query)"
+    sql = QUERIES[name].format(
+        totals=_PERIOD_TOTALS.format(period=":period", brand_filter=brand_filter),
+        prior_totals=_PERIOD_TOTALS.format(period=":prior", brand_filter=brand_filter),
+        brand_filter=brand_filter,
+    )
+    cursor = connection.execute(sql, {"period": period, "prior": prior, "limit": limit})
+    return [dict(row) for row in cursor]
+
+
+def periods(connection):
+    """Return {period: row count} for the loaded periods."""
+    return dict(connection.execute("SELECT period, COUNT(*) FROM gsc_rows GROUP BY period").fetchall())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load GSC exports into SQLite and run indexed analyses")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    load = commands.add_parser("load", help="Load GSC JSON responses or NDJSON rows")
+    load.add_argument("database", help="SQLite database file (created if missing)")
+    load.add_argument("inputs", nargs="+", help="GSC JSON responses or NDJSON rows ('-' for stdin)")
+    load.add_argument("--period", default="current", help="Label for this date window (default: %(default)s)")
+    load.add_argument("--dimensions", default=",".join(DEFAULT_DIMENSIONS),
+                      help="Names of the row 'keys', in request order (default: %(default)s)")
+
+    query = commands.add_parser("query", help="Run a prebuilt analysis")
+    query.add_argument("database", help="SQLite database file")
+    query.add_argument("name", choices=sorted(QUERIES), help="Prebuilt query")
+    query.add_argument("--period", default="current", help="Period to analyze (default: %(default)s)")
+    query.add_argument("--prior", default="prior", help="Period trends compare against (default: %(default)s)")
+    query.add_argument("--brand", action="append", default=[],
+                       help="Brand term (repeatable); branded queries are excluded from row lists")
+    query.add_argument("--limit", type=int, default=50, help="Maximum rows (default: %(default)s)")
+
+    sql = commands.add_parser("sql", help="Run an ad hoc SQL query")
+    sql.add_argument("database", help="SQLite database file")
+    sql.add_argument("statement", help="SQL over the gsc_rows table")
+
+    for sub in (load, query, sql):
+        sub.add_argument("--compact", action="store_true", help="Output minified JSON")
+    args = parser.parse_args()
+
+    if args.command != "load" and not os.path.exists(args.database):
+        print(json.dumps({"error": f"Database not found: {args.database}"}), file=sys.stderr)
+        sys.exit(1)
+    indent = None if args.compact else 2
+    try:
+        connection = connect(args.database)
+        if args.command == "load":
+            dimensions = tuple(d.strip() for d in args.dimensions.split(",") if d.strip())
+            unknown = [d for d in dimensions if d not in KEY_COLUMNS]
+            if unknown:
+                raise ValueError(f"Unsupported dimension: {unknown[0]} (use {', '.join(KEY_COLUMNS)})")
+            count = load_rows(connection, iter_gsc_rows(args.inputs), args.period, dimensions)
+            result = {"loaded": count, "period": args.period, "periods": periods(connection)}
+        elif args.command == "query":
+            rows = run_query(connection, args.name, args.period, args.prior, args.brand, args.limit)
+            result = {"query": args.name, "period": args.period, "rows": rows}
+        else:
+            result = {"rows": [dict(row) for row in connection.execute(args.statement)]}
+    except FileNotFoundError as e:
+        print(json.dumps({"error": f"File not found: {e.filename}"}), file=sys.stderr)
+        sys.exit(1)
+    except json.JSONDecodeError as e:
+        print(json.dumps({"error": f"Invalid JSON input: {e}"}), file=sys.stderr)
+        sys.exit(1)
+    except (ValueError, AttributeError, TypeError, IndexError) as e:
+        print(json.dumps({"error": f"Invalid input: {e}"}), file=sys.stderr)
+        sys.exit(1)
+    except sqlite3.Error as e:
+        print(json.dumps({"error": f"SQLite error: {e}"}), file=sys.stderr)
+        sys.exit(1)
+
+    print(json.dumps(result, indent=indent, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
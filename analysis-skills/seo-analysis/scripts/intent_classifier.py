@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""Classify search intent from SerpAPI responses with references/intent-classification.md.
+
+Usage:
+    python3 intent_classifier.py ~/.cache/seo-analysis/serp/2026-01-31/
+    python3 intent_classifier.py serp_responses.ndjson --brand acme --keywords-output intents.ndjson
+    cat serp.json | python3 intent_classifier.py -
+
+Input is serpapi_google_search responses: JSON files, NDJSON with one
+response per line, or directories of .json responses (such as a SERP
+cache). The query is read from search_parameters.q (or a top-level
+"query"). snake_case and camelCase field names are both accepted.
+
+Each response is reduced to a SERP feature bitmask in one pass:
+    answer_box_*        answer box type: definition (organic result,
+                        dictionary), list, table or number (calculator,
+                        converters, finance)
+    knowledge_graph_*   brand (company-like type, or title matching
+                        --brand) or entity
+    paa / paa_dominant  1-3 / 4+ People Also Ask questions
+    shopping, local_pack, top_stories, video, images, sitelinks
+    organic_*           informational or transactional lean of the top
+                        organic result URLs (blog/guide vs product/pricing)
+
+Intent, confidence, content format and BLUF pattern are looked up in a
+table precomputed for every reachable bitmask at import, so classifying
+a batch costs one dict lookup per keyword. The table follows the
+reference: features in "SerpAPI Intent Inference" priority pick the
+primary intent, the first feature pointing elsewhere gives the secondary
+intent (multi-intent), confidence is the strongest feature agreeing with
+the primary intent, and the BLUF pattern follows the answer box type
+(references/bluf-patterns.md) or the intent's content format.
+
+Output: JSON report to stdout (summary by intent, first --top keywords);
+--keywords-output writes every classification as NDJSON.
+Dependencies: Python 3 stdlib only (no pip install required).
+"""
+
+import argparse
+import itertools
+import json
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ctr_opportunities import iter_json_records  # noqa: E402
+
+FEATURES = (
+    "answer_box_definition", "answer_box_list", "answer_box_table", "answer_box_number",
+    "knowledge_graph_entity", "knowledge_graph_brand", "paa", "paa_dominant",
+    "shopping", "local_pack", "top_stories", "video", "images", "sitelinks",
+    "organic_informational", "organic_transactional",
+)
+BITS = {name: 1 << i for i, name in enumerate(FEATURES)}
+ANSWER_BOX_BITS = (BITS["answer_box_definition"] | BITS["answer_box_list"]
+                   | BITS["answer_box_table"] | BITS["answer_box_number"])
+KNOWLEDGE_GRAPH_BITS = BITS["knowledge_graph_entity"] | BITS["knowledge_graph_brand"]
+PAA_BITS = BITS["paa"] | BITS["paa_dominant"]
+
+# Mutually exclusive feature states; any combination of the other bits
+EXCLUSIVE_GROUPS = (
+    ("answer_box_definition", "answer_box_list", "answer_box_table", "answer_box_number"),
+    ("knowledge_graph_entity", "knowledge_graph_brand"),
+    ("paa", "paa_dominant"),
+    ("organic_informational", "organic_transactional"),
+)
+INDEPENDENT_FEATURES = ("shopping", "local_pack", "top_stories", "video", "images", "sitelinks")
+
+# (feature, primary intent, secondary intent, confidence), in inference priority:
+# answer box, shopping/local, brand, PAA 4+, then the remaining table rows
+FEATURE_INTENTS = (
+    ("answer_box_number", "transactional", "informational", "high"),
+    ("answer_box_definition", "informational", None, "high"),
+    ("answer_box_list", "informational", None, "high"),
+    ("answer_box_table", "informational", None, "high"),
+    ("shopping", "transactional", "commercial", "very_high"),
+    ("local_pack", "local", "transactional", "high"),
+    ("knowledge_graph_brand", "navigational", None, "very_high"),
+    ("sitelinks", "navigational", None, "very_high"),
+    ("knowledge_graph_entity", "navigational", "informational", "high"),
+    ("paa_dominant", "informational", None, "high"),
+    ("top_stories", "informational", None, "medium"),
+    ("video", "informational", None, "medium"),
+    ("images", "informational", "navigational", "low"),
+    ("organic_transactional", "transactional", None, "low"),
+    ("organic_informational", "informational", None, "low"),
+)
+CONFIDENCE_LEVELS = ("low", "medium", "high", "very_high")
+
+CONTENT_FORMATS = {
+    "informational": "Guide / How-to article",
+    "transactional": "Product/service page",
+    "commercial": "Comparison / review",
+    "navigational": "Landing page",
+    "local": "Location page",
+}
+BLUF_PATTERNS = {
+    "definition": "Pattern 1: Definition-first",
+    "number": "Pattern 2: Number-first",
+    "verdict": "Pattern 3: Verdict-first",
+    "step": "Pattern 4: Step-first",
+}
+ANSWER_BOX_PATTERNS = {
+    "answer_box_definition": "definition",
+    "answer_box_list": "step",
+    "answer_box_table": "verdict",
+    "answer_box_number": "number",
+}
+INTENT_PATTERNS = {
+    "informational": "definition",
+    "transactional": "number",
+    "commercial": "verdict",
+    "navigational": "definition",
+    "local": "number",
+}
+# Multi-intent feature combinations: (required bit groups, content strategy)
+COMBINATIONS = (
+    ((ANSWER_BOX_BITS, BITS["shopping"]),
+     "Guide with product recommendations and affiliate/purchase links"),
+    ((KNOWLEDGE_GRAPH_BITS, PAA_BITS), "Entity page with comprehensive FAQ section"),
+    ((BITS["local_pack"], ANSWER_BOX_BITS), "Location-specific guide with local service details"),
+    ((BITS["video"], PAA_BITS), "Step-by-step guide with embedded video and FAQ schema"),
+)
+
+NUMBER_ANSWER_TYPES = frozenset((
+    "calculator", "calculator_result", "currency_converter", "unit_converter",
+    "finance_results", "population_result", "sports_results", "weather_result",
+))
+BRAND_KG_TYPE_RE = re.compile(
+    r"\b(company|corporation|brand|business|manufacturer|retailer|website|organization)\b",
+    re.IGNORECASE,
+)
+INFORMATIONAL_URL_RE = re.compile(
+    r"wikipedia\.org|/(blog|blogs|guide|guides|learn|wiki|article|articles|news|resources|"
+    r"what-is|how-to|faq|help)(/|-|$)",
+    re.IGNORECASE,
+)
+TRANSACTIONAL_URL_RE = re.compile(
+    r"/(product|products|pricing|price|shop|store|buy|cart|checkout|p|dp|item|plans)(/|$)",
+    re.IGNORECASE,
+)
+PAA_DOMINANT_COUNT = 4
+ORGANIC_RESULTS_CHECKED = 10
+# Organic URLs needed, beyond the other kind, for an organic lean
+ORGANIC_LEAN_MARGIN = 2
+
+
+def response_field(response, *names):
+    """Return the first non-empty of a response's fields (snake_case or camelCase names)."""
+    for name in names:
+        value = response.get(name)
+        if value:
+            return value
+    return None
+
+
+def _answer_box_feature(answer_box):
+    if isinstance(answer_box, list):
+        answer_box = answer_box[0] if answer_box else {}
+    if str(answer_box.get("type", "")).lower() in NUMBER_ANSWER_TYPES:
+        return "answer_box_number"
+    if answer_box.get("list"):
+        return "answer_box_list"
+    if answer_box.get("table"):
+        return "answer_box_table"
+    return "answer_box_definition"
+
+
+def serp_feature_mask(response, brand_terms=()):
+    """Return the SERP feature bitmask of a SerpAPI response."""
+    mask = 0
+    answer_box = response_field(response, "answer_box", "answerBox")
+    if answer_box:
+        mask |= BITS[_answer_box_feature(answer_box)]
+
+    knowledge_graph = response_field(response, "knowledge_graph", "knowledgeGraph")
+    if knowledge_graph:
+        title = str(knowledge_graph.get("title", "")).lower()
+        is_brand = (BRAND_KG_TYPE_RE.search(str(knowledge_graph.get("type", "")))
+                    or any(term in title for term in brand_terms))
+        mask |= BITS["knowledge_graph_brand" if is_brand else "knowledge_graph_entity"]
+
+    questions = response_field(response, "related_questions", "people_also_ask", "peopleAlsoAsk")
+    if questions:
+        mask |= BITS["paa_dominant" if len(questions) >= PAA_DOMINANT_COUNT else "paa"]
+
+    if response_field(response, "shopping_results", "inline_shopping", "immersive_products",
+              "shoppingResults"):
+        mask |= BITS["shopping"]
+    if response_field(response, "local_results", "local_map", "localResults"):
+        mask |= BITS["local_pack"]
+    if response_field(response, "top_stories", "topStories"):
+        mask |= BITS["top_stories"]
+    if response_field(response, "inline_videos", "video_results", "inlineVideos"):
+        mask |= BITS["video"]
+    if response_field(response, "inline_images", "images_results", "inlineImages"):
+        mask |= BITS["images"]
+
+    organic = response_field(response, "organic_results", "organicResults") or ()
+    informational = transactional = 0
+    for result in organic[:ORGANIC_RESULTS_CHECKED]:
+        if result.get("sitelinks"):
+            mask |= BITS["sitelinks"]
+        link = result.get("link") or ""
+        if TRANSACTIONAL_URL_RE.search(link):
+            transactional += 1
+        elif INFORMATIONAL_URL_RE.search(link):
+            informational += 1
+    if informational >= transactional + ORGANIC_LEAN_MARGIN:
+        mask |= BITS["organic_informational"]
+    elif transactional >= informational + ORGANIC_LEAN_MARGIN:
+        mask |= BITS["organic_transactional"]
+    return mask
+
+
+def feature_names(mask):
+    """Return the feature names set in a bitmask."""
+    return [name for name in FEATURES if mask & BITS[name]]
+
+
+def _classify_mask(mask):
+    """Return the intent table entry of one bitmask."""
+    matched = [row for row in FEATURE_INTENTS if mask & BITS[row[0]]]
+    if not matched:
+        return {"primary_intent": "mixed", "secondary_intent": None, "confidence": "low",
+                "multi_intent": False, "content_format": None, "bluf_pattern": None,
+                "bluf_pattern_name": None, "strategy": None}
+
+    _, primary, secondary, _ = matched[0]
+    confidence = max((row[3] for row in matched if row[1] == primary),
+                     key=CONFIDENCE_LEVELS.index)
+    others = [row[1] for row in matched[1:] if row[1] != primary]
+    if others:
+        secondary = others[0]
+
+    answer_box = next((name for name in ANSWER_BOX_PATTERNS if mask & BITS[name]), None)
+    if answer_box:
+        pattern = ANSWER_BOX_PATTERNS[answer_box]
+    elif primary == "informational" and mask & BITS["video"] and mask & PAA_BITS:
+        # Video + PAA is how-to intent
+        pattern = "step"
+    else:
+        pattern = INTENT_PATTERNS[primary]
+    strategy = next((text for groups, text in COMBINATIONS
+                     if all(mask & bits for bits in groups)), None)
+    return {
+        "primary_intent": primary,
+        "secondary_intent": secondary if secondary != primary else None,
+        "confidence": confidence,
+        "multi_intent": bool(others),
+        "content_format": CONTENT_FORMATS[primary],
+        "bluf_pattern": pattern,
+        "bluf_pattern_name": BLUF_PATTERNS[pattern],
+        "strategy": strategy,
+    }
+
+
+def build_intent_table():
+    """Return {bitmask: intent entry} for every reachable feature bitmask."""
+    exclusive = [(0,) + tuple(BITS[name] for name in group) for group in EXCLUSIVE_GROUPS]
+    independent = [(0, BITS[name]) for name in INDEPENDENT_FEATURES]
+    return {sum(bits): _classify_mask(sum(bits))
+            for bits in itertools.product(*exclusive, *independent)}
+
+
+INTENT_TABLE = build_intent_table()
+
+
+def response_query(response):
+    """Return (query, gl, hl) of a SerpAPI response."""
+    params = response.get("search_parameters") or response.get("searchParameters") or {}
+    query = params.get("q") or response.get("query") or response.get("q") or ""
+    return query, params.get("gl") or response.get("gl"), params.get("hl") or response.get("hl")
+
+
+def classify_response(response, brand_terms=()):
+    """Return the intent classification record of a SerpAPI response."""
+    mask = serp_feature_mask(response, brand_terms)
+    query, gl, hl = response_query(response)
+    record = {"query": query, "gl": gl, "hl": hl, "features": feature_names(mask)}
+    record.update(INTENT_TABLE[mask])
+    return record
+
+
+def iter_responses(paths):
+    """Yield SerpAPI responses from JSON/NDJSON files and directories of .json files."""
+    for path in paths:
+        if path != "-" and os.path.isdir(path):
+            files = sorted(os.path.join(path, name) for name in os.listdir(path)
+                           if name.endswith(".json"))
+            yield from iter_json_records(files)
+        else:
+            yield from iter_json_records([path])
+
+
+def analyze(responses, brand_terms=(), top=50):
+    """Classify responses; return (report dict, list of classification records)."""
+    brand_terms = tuple(term.lower() for term in brand_terms)
+    records = [classify_response(response, brand_terms) for response in responses
+               if isinstance(response, dict) and not response.get("error")]
+    by_intent = {}
+    for record in records:
+        by_intent[record["primary_intent"]] = by_intent.get(record["primary_intent"], 0) + 1
+    report = {
+        "summary": {
+            "keywords": len(records),
+            "by_primary_intent": dict(sorted(by_intent.items(), key=lambda item: -item[1])),
+            "multi_intent": sum(1 for record in records if record["multi_intent"]),
+        },
+        "keywords": records[:top],
+    }
+    return report, records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Classify search intent from SerpAPI responses")
+    parser.add_argument("inputs", nargs="+",
+                        help="SerpAPI JSON/NDJSON responses or directories of them ('-' for stdin)")
+    parser.add_argument("--brand", action="append", default=[],
+                        help="Brand term: a Knowledge Graph title containing it is a brand "
+                             "(repeatable)")
+    parser.add_argument("--top", type=int, default=50,
+                        help="Keywords listed in the report (default: %(default)s)")
+    parser.add_argument("--keywords-output", default=None,
+                        help="Write every keyword classification to this NDJSON file")
+    parser.add_argument("--compact", action="store_true", help="Output minified JSON")
+    args = parser.parse_args()
+
+    try:
+        report, records = analyze(iter_responses(args.inputs), args.brand, top=args.top)
+    except FileNotFoundError as e:
+        print(json.dumps({"error": f"File not found: {e.filename}"}), file=sys.stderr)
+        sys.exit(1)
+    except json.JSONDecodeError as e:
+        print(json.dumps({"error": f"Invalid JSON input: {e}"}), file=sys.stderr)
+        sys.exit(1)
+    except (AttributeError, TypeError) as e:
+        print(json.dumps({"error": f"Invalid SerpAPI response: {e}"}), file=sys.stderr)
+        sys.exit(1)
+
+    if args.keywords_output:
+        with open(args.keywords_output, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False))
+                f.write("\n")
+
+    print(json.dumps(report, indent=None if args.compact else 2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
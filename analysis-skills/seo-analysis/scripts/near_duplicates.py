@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""Find near-duplicate pages from body text fingerprints.
+
+Usage:
+    python3 extract_page_signals.py ./pages/ --fields url,title,simhash,minhash --output fp.ndjson
+    python3 near_duplicates.py fp.ndjson
+    python3 near_duplicates.py fp.ndjson --threshold 0.9 --linking-pairs-output pairs.ndjson
+    python3 crawl_site.py https://example.com/ --fields url,title,simhash,minhash | python3 near_duplicates.py -
+
+Input is NDJSON from extract_page_signals.py or crawl_site.py with the
+opt-in minhash field (simhash and title are reported when present).
+Records without a minhash signature are counted but not compared.
+
+Pages are indexed with MinHash locality-sensitive hashing: the signature is
+split into --bands bands, and pages whose band values are identical in any
+band become candidates. Each candidate is checked against the pages already
+kept for its bucket, and a pair is a near duplicate when the share of equal
+signature values (the estimated Jaccard similarity of the pages' 5-word
+shingle sets) is at least --threshold. Work grows with the number of pages
+and candidates rather than all pairs, so a 100k-page site is clustered in
+seconds. The default 16 bands of 4 values find pairs at 0.8 similarity
+with over 99.9% probability.
+
+Near duplicates are joined into clusters (connected components): pages in
+one cluster compete for the same queries (duplicate content or keyword
+cannibalization) and are candidates for consolidation or canonicals.
+Pages already in one cluster are not compared again, so the pairs reported
+are the linking pairs that join each cluster (a spanning tree of it, one
+fewer than its pages), not every near-duplicate pair within it.
+Shared boilerplate (navigation, footers) raises similarity, so very short
+pages on one template can cluster together.
+
+Output: JSON report to stdout (summary, largest clusters, most similar
+linking pairs); --linking-pairs-output writes every linking pair as NDJSON.
+Dependencies: Python 3 stdlib only (no pip install required).
+"""
+
+import argparse
+import json
+import operator
+import sys
+from array import array
+
+DEFAULT_BANDS = 16
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_TOP = 20
+
+
+def iter_records(paths):
+    """Yield JSON records from NDJSON files ('-' for stdin), skipping blank lines."""
+    for path in paths:
+        f = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+        try:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+
+def _find(parent, node):
+    """Return the union-find root of node, halving the path on the way."""
+    while parent[node] != node:
+        parent[node] = parent[parent[node]]
+        node = parent[node]
+    return node
+
+
+class FingerprintIndex:
+    """MinHash signatures of a site's pages, packed for banding and comparison.
+
+    Signatures are stored as bytes of 32-bit values, so a band key is a
+    bytes slice and comparing two signatures runs in C.
+    """
+
+    def __init__(self):
+        self.urls = []
+        self.titles = []
+        self.simhashes = []
+        self.signatures = []
+        self.length = None
+        self.skipped = 0
+
+    @classmethod
+    def from_records(cls, records):
+        """Build an index from extracted signal records.
+
+        Raises ValueError when signatures differ in length.
+        """
+        index = cls()
+        for record in records:
+            index.add(record)
+        return index
+
+    def add(self, record):
+        minhash = record.get("minhash")
+        if not minhash:
+            self.skipped += 1
+            return
+        if self.length is None:
+            self.length = len(minhash)
+        elif len(minhash) != self.length:
+            raise ValueError(f"minhash signatures differ in length ({len(minhash)} vs {self.length})")
+        self.urls.append(record.get("url") or record.get("file") or "")
+        self.titles.append(record.get("title"))
+        simhash = record.get("simhash")
+        self.simhashes.append(int(simhash, 16) if simhash else None)
+        self.signatures.append(array("I", minhash).tobytes())
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def similarity(self, a, b):
+        """Return the estimated Jaccard similarity of pages a and b."""
+        left = memoryview(self.signatures[a]).cast("I")
+        right = memoryview(self.signatures[b]).cast("I")
+        return sum(map(operator.eq, left, right)) / self.length
+
+    def simhash_distance(self, a, b):
+        """Return the Hamming distance of two pages' SimHashes (None if either is missing)."""
+        left, right = self.simhashes[a], self.simhashes[b]
+        if left is None or right is None:
+            return None
+        return bin(left ^ right).count("1")
+
+    def near_duplicates(self, bands=DEFAULT_BANDS, threshold=DEFAULT_THRESHOLD):
+        """Yield (a, b, similarity) for the near-duplicate pairs linking clusters.
+
+        One band is bucketed at a time, so memory holds a single band's keys.
+        Each bucket keeps representatives: a page is compared with them in
+        order and joins the first one it matches, else becomes one itself.
+        Pairs already connected through earlier pairs are not compared again,
+        so each cluster of n pages yields n - 1 pairs.
+        """
+        if not self.signatures:
+            return
+        rows = self.length // bands
+        width = rows * array("I").itemsize
+        parent = list(range(len(self.signatures)))
+
+        for band in range(bands):
+            start = band * width
+            end = start + width
+            buckets = {}
+            for page, signature in enumerate(self.signatures):
+                key = signature[start:end]
+                representatives = buckets.get(key)
+                if representatives is None:
+                    buckets[key] = [page]
+                    continue
+                root = _find(parent, page)
+                for other in representatives:
+                    other_root = _find(parent, other)
+                    if other_root == root:
+                        break
+                    similarity = self.similarity(other, page)
+                    if similarity >= threshold:
+                        parent[root] = other_root
+                        yield other, page, similarity
+                        break
+                else:
+                    representatives.append(page)
+
+
+def find_clusters(count, pairs):
+    """Return clusters (lists of page indexes, size >= 2) connected by pairs."""
+    parent = list(range(count))
+    for a, b in pairs:
+        root_a, root_b = _find(parent, a), _find(parent, b)
+        if root_a != root_b:
+            parent[root_b] = root_a
+    members = {}
+    for node in range(count):
+        members.setdefault(_find(parent, node), []).append(node)
+    return [pages for pages in members.values() if len(pages) > 1]
+
+
+def analyze(index, bands=DEFAULT_BANDS, threshold=DEFAULT_THRESHOLD, top=DEFAULT_TOP):
+    """Find near duplicates; return (report dict, list of linking pair records)."""
+    pairs = []
+    for a, b, similarity in index.near_duplicates(bands, threshold):
+        pairs.append({
+            "url": index.urls[a],
+            "duplicate_url": index.urls[b],
+            "similarity": round(similarity, 3),
+            "simhash_distance": index.simhash_distance(a, b),
+            "_pages": (a, b),
+        })
+    clusters = find_clusters(len(index), [pair.pop("_pages") for pair in pairs])
+    clusters.sort(key=lambda pages: (-len(pages), index.urls[pages[0]]))
+    pairs.sort(key=lambda pair: (-pair["similarity"], pair["url"], pair["duplicate_url"]))
+
+    report = {
+        "summary": {
+            "pages": len(index) + index.skipped,
+            "fingerprinted_pages": len(index),
+            "linking_pairs": len(pairs),
+            "clusters": len(clusters),
+            "pages_in_clusters": sum(len(pages) for pages in clusters),
+            "threshold": threshold,
+            "bands": bands,
+        },
+        "clusters": [
+            {
+                "size": len(pages),
+                "pages": [{"url": index.urls[p], "title": index.titles[p]} for p in pages],
+            }
+            for pages in clusters[:top]
+        ],
+        "top_linking_pairs": pairs[:top],
+    }
+    return report, pairs
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Find near-duplicate pages from MinHash/SimHash body fingerprints"
+    )
+    parser.add_argument("inputs", nargs="+", help="NDJSON signal files ('-' for stdin)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Minimum estimated Jaccard similarity of a pair (default: %(default)s)")
+    parser.add_argument("--bands", type=int, default=DEFAULT_BANDS,
+                        help="LSH bands the signature is split into; more bands find "
+                             "less similar candidates (default: %(default)s)")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP,
+                        help="Clusters and pairs listed in the report (default: %(default)s)")
+    parser.add_argument("--linking-pairs-output", default=None,
+                        help="Write the near-duplicate pairs linking each cluster "
+                             "to this NDJSON file")
+    parser.add_argument("--compact", action="store_true", help="Output minified JSON")
+    args = parser.parse_args()
+
+    if not 0 < args.threshold <= 1:
+        print(json.dumps({"error": "--threshold must be between 0 and 1"}), file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        index = FingerprintIndex.from_records(iter_records(args.inputs))
+    except FileNotFoundError as e:
+        print(json.dumps({"error": f"File not found: {e.filename}"}), file=sys.stderr)
+        sys.exit(1)
+    except json.JSONDecodeError as e:
+        print(json.dumps({"error": f"Invalid NDJSON input: {e}"}), file=sys.stderr)
+        sys.exit(1)
+    except (ValueError, TypeError, OverflowError) as e:
+        print(json.dumps({"error": f"Invalid minhash signature: {e}"}), file=sys.stderr)
+        sys.exit(1)
+    if index.length is not None and not 0 < args.bands <= index.length:
+        print(json.dumps({"error": f"--bands must be between 1 and {index.length}"}), file=sys.stderr)
+        sys.exit(1)
+
+    report, pairs = analyze(index, bands=args.bands, threshold=args.threshold, top=args.top)
+    if args.linking_pairs_output:
+        with open(args.linking_pairs_output, "w", encoding="utf-8") as f:
+            for pair in pairs:
+                f.write(json.dumps(pair, ensure_ascii=False))
+                f.write("\n")
+
+    print(json.dumps(report, indent=None if args.compact else 2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""Read HTML pages directly from WARC and tar crawl archives.
+
+Usage:
+    python3 page_archives.py crawl.warc.gz                 # list HTML records
+    python3 page_archives.py site.tar.gz --url-prefix https://
+
+extract_page_signals.py batch mode expands archives given as inputs with
+iter_archive_pages(), so captures are analyzed without unpacking them:
+    python3 extract_page_signals.py crawl.warc.gz --output signals.ndjson
+
+WARC files (.warc, .warc.gz) yield one page per HTML response or resource
+record, with the record's WARC-Target-URI as the page URL; chunked transfer
+and gzip/deflate content encoding are undone. Tar files (.tar, .tar.gz,
+.tgz, .tar.bz2, .tar.xz) yield one page per .html/.htm/.xhtml member, with
+the member name (after --url-prefix) as the URL.
+
+Only headers are read while listing. Pages in uncompressed archives are
+described by offset and length, and read() memory-maps the archive, so
+batch workers read page bytes straight from the page cache; compressed
+archives are decompressed as a stream and each page's bytes travel with
+it. Nothing is written to disk.
+
+Output: one NDJSON line per HTML page (archive, record, url, bytes).
+Dependencies: Python 3 stdlib only (no pip install required).
+"""
+
+import argparse
+import codecs
+import gzip
+import json
+import mmap
+import sys
+import tarfile
+import zlib
+
+WARC_EXTENSIONS = (".warc", ".warc.gz")
+TAR_EXTENSIONS = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+HTML_CONTENT_TYPES = frozenset(("text/html", "application/xhtml+xml"))
+HTML_EXTENSIONS = (".html", ".htm", ".xhtml")
+
+# Longest WARC or HTTP header block accepted before a record is rejected
+MAX_HEADER_BYTES = 64 * 1024
+
+# Archives memory-mapped by read() in this process, keyed by path
+_maps = {}
+
+
+class ArchiveError(ValueError):
+    """An archive could not be opened or read (corrupt, truncated or missing)."""
+
+
+def is_archive(path):
+    """Return True if path has a WARC or tar archive extension."""
+    return path.lower().endswith(WARC_EXTENSIONS + TAR_EXTENSIONS)
+
+
+def _mapped(path):
+    mapped = _maps.get(path)
+    if mapped is None:
+        with open(path, "rb") as f:
+            mapped = _maps[path] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return mapped
+
+
+class ArchivePage:
+    """One HTML page inside an archive, small enough to send to a batch worker.
+
+    Either ``offset``/``length`` locate the stored payload in an uncompressed
+    archive, or ``data`` holds it. ``record`` identifies the page within the
+    archive (WARC-Record-ID or tar member name).
+    """
+
+    __slots__ = ("archive", "record", "offset", "length", "data", "encoding",
+                 "chunked", "content_encoding")
+
+    def __init__(self, archive, record, offset=0, length=0, data=None, encoding="utf-8",
+                 chunked=False, content_encoding=""):
+        self.archive = archive
+        self.record = record
+        self.offset = offset
+        self.length = length
+        self.data = data
+        self.encoding = encoding
+        self.chunked = chunked
+        self.content_encoding = content_encoding
+
+    @property
+    def size(self):
+        return len(self.data) if self.data is not None else self.length
+
+    def read(self):
+        """Return the page body as bytes, with HTTP transfer/content encodings undone."""
+        if self.data is not None:
+            body = self.data
+        else:
+            body = _mapped(self.archive)[self.offset:self.offset + self.length]
+        if self.chunked:
+            body = _dechunk(body)
+        if self.content_encoding:
+            body = _decode_content(body, self.content_encoding)
+        return body
+
+
+def _dechunk(data):
+    """Undo chunked transfer encoding; data that is not chunked is returned as is.
+
+    Some WARC writers store the decoded body but keep the original
+    Transfer-Encoding header, so a malformed chunk header means "not chunked".
+    """
+    parts = []
+    pos = 0
+    while True:
+        eol = data.find(b"\r\n", pos)
+        if eol < 0:
+            return data
+        try:
+            size = int(data[pos:eol].split(b";", 1)[0], 16)
+        except ValueError:
+            return data
+        if size == 0:
+            return b"".join(parts)
+        start = eol + 2
+        parts.append(data[start:start + size])
+        pos = start + size + 2
+        if pos > len(data):
+            return b"".join(parts)
+
+
+def _decode_content(data, content_encoding):
+    if content_encoding in ("gzip", "x-gzip"):
+        try:
+            return gzip.decompress(data)
+        except (OSError, EOFError, zlib.error):
+            # Stored already decoded
+            return data
+    if content_encoding == "deflate":
+        for wbits in (zlib.MAX_WBITS, -zlib.MAX_WBITS):
+            try:
+                return zlib.decompress(data, wbits)
+            except zlib.error:
+                continue
+        return data
+    if content_encoding == "identity":
+        return data
+    raise ValueError(f"Unsupported Content-Encoding: {content_encoding}")
+
+
+def _read_headers(f, limit):
+    """Read "Name: value" lines up to a blank line.
+
+    Returns (headers with lowercased names, bytes consumed).
+    """
+    headers = {}
+    consumed = 0
+    name = None
+    while True:
+        line = f.readline(MAX_HEADER_BYTES)
+        consumed += len(line)
+        if not line or consumed > limit:
+            raise ValueError("Truncated or oversized header block")
+        if line in (b"\r\n", b"\n"):
+            return headers, consumed
+        text = line.decode("utf-8", errors="replace").rstrip("\r\n")
+        if text[:1] in (" ", "\t") and name is not None:
+            # Folded continuation line
+            headers[name] += " " + text.strip()
+            continue
+        name, _, value = text.partition(":")
+        name = name.strip().lower()
+        headers[name] = value.strip()
+
+
+def _mime_and_charset(content_type):
+    mime, *params = content_type.split(";")
+    charset = "utf-8"
+    for param in params:
+        key, _, value = param.partition("=")
+        if key.strip().lower() == "charset" and value.strip():
+            charset = value.strip().strip('"\'')
+            break
+    try:
+        codecs.lookup(charset)
+    except LookupError:
+        charset = "utf-8"
+    return mime.strip().lower(), charset
+
+
+def iter_warc_pages(path):
+    """Yield (ArchivePage, target URI) for each HTML record in a WARC file.
+
+    Response records need a 2xx status and an HTML Content-Type; resource
+    records need an HTML WARC Content-Type. Other record types (request,
+    revisit, metadata, warcinfo) are skipped.
+    """
+    compressed = path.lower().endswith(".gz")
+    opener = gzip.open if compressed else open
+    with opener(path, "rb") as f:
+        while True:
+            line = f.readline(MAX_HEADER_BYTES)
+            if not line:
+                return
+            if not line.strip():
+                continue
+            if not line.startswith(b"WARC/"):
+                raise ValueError(f"{path}: expected a WARC record at offset {f.tell() - len(line)}")
+            headers, _ = _read_headers(f, MAX_HEADER_BYTES)
+            length = int(headers.get("content-length") or 0)
+            block_end = f.tell() + length
+            page = _warc_record_page(f, path, headers, length, compressed)
+            if page is not None:
+                yield page, headers.get("warc-target-uri", "").strip("<>")
+            # Forward seeks in a gzip stream decompress without keeping the data
+            f.seek(block_end)
+
+
+def _warc_record_page(f, path, headers, length, compressed):
+    record_type = headers.get("warc-type", "")
+    record = headers.get("warc-record-id", "").strip("<>")
+    chunked = False
+    content_encoding = ""
+    if record_type == "response":
+        if not headers.get("content-type", "").startswith("application/http"):
+            return None
+        status_line = f.readline(MAX_HEADER_BYTES)
+        http_headers, consumed = _read_headers(f, min(length, MAX_HEADER_BYTES))
+        consumed += len(status_line)
+        mime, charset = _mime_and_charset(http_headers.get("content-type", ""))
+        if not mime:
+            mime, _ = _mime_and_charset(headers.get("warc-identified-payload-type", ""))
+        if mime not in HTML_CONTENT_TYPES or not 200 <= _http_status(status_line) < 300:
+            return None
+        chunked = "chunked" in http_headers.get("transfer-encoding", "").lower()
+        content_encoding = http_headers.get("content-encoding", "").strip().lower()
+        length -= consumed
+    elif record_type == "resource":
+        mime, charset = _mime_and_charset(headers.get("content-type", ""))
+        if mime not in HTML_CONTENT_TYPES:
+            return None
+    else:
+        return None
+
+    if compressed:
+        return ArchivePage(path, record, data=f.read(length), encoding=charset,
+                           chunked=chunked, content_encoding=content_encoding)
+    return ArchivePage(path, record, offset=f.tell(), length=length, encoding=charset,
+                       chunked=chunked, content_encoding=content_encoding)
+
+
+def _http_status(status_line):
+    """Return the code from an "HTTP/1.1 200 OK" line (0 if malformed)."""
+    parts = status_line.split()
+    try:
+        return int(parts[1])
+    except (IndexError, ValueError):
+        return 0
+
+
+def iter_tar_pages(path, url_prefix=""):
+    """Yield (ArchivePage, url) for each HTML member of a tar file.
+
+    The url is url_prefix + member name (without a leading "./").
+    """
+    seekable = path.lower().endswith(".tar")
+    with tarfile.open(path, "r:" if seekable else "r|*") as tar:
+        while True:
+            member = tar.next()
+            if member is None:
+                return
+            # TarFile remembers every member; forget them so huge archives
+            # do not grow memory
+            tar.members = []
+            if not member.isfile() or member.issparse():
+                continue
+            name = member.name[2:] if member.name.startswith("./") else member.name
+            if not name.lower().endswith(HTML_EXTENSIONS):
+                continue
+            if seekable:
+                page = ArchivePage(path, name, offset=member.offset_data, length=member.size)
+            else:
+                page = ArchivePage(path, name, data=tar.extractfile(member).read())
+            yield page, url_prefix + name
+
+
+def iter_archive_pages(path, url_prefix=""):
+    """Yield (ArchivePage, url) for every HTML page in a WARC or tar archive.
+
+    Raises ArchiveError when the archive cannot be read.
+    """
+    if path.lower().endswith(WARC_EXTENSIONS):
+        pages = iter_warc_pages(path)
+    else:
+        pages = iter_tar_pages(path, url_prefix)
+    try:
+        yield from pages
+    except ArchiveError:
+        raise
+    except (OSError, EOFError, ValueError, tarfile.TarError, zlib.error) as e:
+        raise ArchiveError(f"{path}: {type(e).__name__}: {e}") from e
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List the HTML pages in WARC/tar archives as NDJSON")
+    parser.add_argument("archives", nargs="+", help="WARC or tar archives")
+    parser.add_argument("--url-prefix", default="",
+                        help="Prefix joined to tar member names to form URLs (e.g. https://)")
+    args = parser.parse_args()
+
+    count = 0
+    for path in args.archives:
+        if not is_archive(path):
+            print(json.dumps({"error": f"Not a WARC or tar archive: {path}"}), file=sys.stderr)
+            sys.exit(1)
+        try:
+            for page, url in iter_archive_pages(path, args.url_prefix):
+                print(json.dumps({"archive": path, "record": page.record, "url": url,
+                                  "bytes": page.size}, ensure_ascii=False))
+                count += 1
+        except ArchiveError as e:
+            print(json.dumps({"error": str(e)}), file=sys.stderr)
+            sys.exit(1)
+    print(f"Listed {count} pages", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""Compare two GSC periods on (query, page) as in references/gsc-query-patterns.md.
+
+Usage:
+    python3 period_compare.py --current gsc_current_*.json --prior gsc_prior_*.json
+    python3 period_compare.py --current cur.ndjson --prior prev.ndjson --min-impressions 100 --top 50
+    python3 period_compare.py --current cur.json --prior prev.json --pairs-output pairs.ndjson
+
+Inputs are Search Console query_analytics output for each period, as read
+by ctr_opportunities.py: JSON responses with "rows" (one file per
+paginated pull) or NDJSON rows. "keys" are named by --dimensions
+(default: query,page); rows with extra dimensions (date, country,
+device) are summed per (query, page), position weighted by impressions.
+
+Both periods are interned into one query/page dictionary while they are
+read, which is the build side of the join: equal keys get equal integer
+ids, and the (query, page) pairs of both periods are then matched and
+aggregated in a few array operations. Only the key dictionaries and
+compact per-row columns are held, so millions of rows per period fit in
+memory.
+
+For every (query, page) pair in either period:
+    clicks_delta, impressions_delta   current - prior
+    ctr_delta, position_delta         current - prior, pairs in both periods
+    trend       rising (position_delta < -3), falling (> 3), stable,
+                new (current only) or lost (prior only)
+    significant changes beyond noise:
+                clicks, impressions  |delta| / sqrt(current + prior) >= 1.96
+                                     (Poisson counts)
+                ctr       two-proportion z-test on clicks / impressions,
+                          |z| >= 1.96
+                position  |position_delta| > 3
+New and lost queries are reported separately, by query over all pages.
+
+Output: JSON report to stdout (period totals, trend counts, top gains and
+losses by clicks, new and lost queries); --pairs-output writes every
+pair as NDJSON.
+Dependencies: numpy (pip install numpy).
+"""
+
+import argparse
+import json
+import os
+import sys
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ctr_opportunities import DEFAULT_DIMENSIONS, GscRows, iter_gsc_rows  # noqa: E402
+
+# Rising / falling position change, per the Trend Calculation rules
+POSITION_CHANGE = 3
+# Two-sided 95% z threshold for clicks, impressions and CTR changes
+SIGNIFICANCE_Z = 1.96
+SIGNIFICANCE_METRICS = ("clicks", "impressions", "ctr", "position")
+
+
+def load_periods(current_paths, prior_paths, dimensions=DEFAULT_DIMENSIONS):
+    """Read both periods into GscRows tables that share query and page ids."""
+    current = GscRows.from_rows(iter_gsc_rows(current_paths), dimensions)
+    prior = GscRows()
+    prior.queries, prior.pages = current.queries, current.pages
+    prior.extend(iter_gsc_rows(prior_paths), dimensions)
+    return current, prior
+
+
+def _columns(table):
+    return (np.frombuffer(table.query_ids, dtype=np.int64),
+            np.frombuffer(table.page_ids, dtype=np.int64),
+            np.frombuffer(table.clicks, dtype=np.float64),
+            np.frombuffer(table.impressions, dtype=np.float64),
+            np.frombuffer(table.positions, dtype=np.float64))
+
+
+def _period_totals(slot, n, clicks, impressions, positions):
+    """Sum one period's rows into the pair slots; return (rows, clicks, impressions, position)."""
+    rows = np.bincount(slot, minlength=n)
+    # bincount of an empty period is int64 even with weights
+    weighted = np.bincount(slot, weights=positions * impressions, minlength=n).astype(np.float64)
+    summed = np.bincount(slot, weights=positions, minlength=n).astype(np.float64)
+    clicks = np.bincount(slot, weights=clicks, minlength=n).astype(np.float64)
+    impressions = np.bincount(slot, weights=impressions, minlength=n).astype(np.float64)
+    # Impression-weighted position; plain mean for pairs without impressions
+    position = np.where(impressions > 0, _ratio(weighted, impressions), _ratio(summed, rows))
+    return rows, clicks, impressions, position
+
+
+def _ratio(numerator, denominator):
+    return np.divide(numerator, denominator, out=np.zeros(len(numerator)),
+                     where=denominator > 0)
+
+
+def _count_z(current, prior):
+    """Poisson z-score of a count change."""
+    return _ratio(current - prior, np.sqrt(current + prior))
+
+
+def compare(current, prior):
+    """Join two periods on (query, page); return a dict of per-pair arrays."""
+    n_pages = max(len(current.pages), 1)
+    cur_q, cur_p, cur_c, cur_i, cur_pos = _columns(current)
+    pri_q, pri_p, pri_c, pri_i, pri_pos = _columns(prior)
+    keys, slots = np.unique(np.concatenate((cur_q * n_pages + cur_p, pri_q * n_pages + pri_p)),
+                            return_inverse=True)
+    n = len(keys)
+    cur_rows, clicks, impressions, position = _period_totals(
+        slots[:len(cur_q)], n, cur_c, cur_i, cur_pos)
+    pri_rows, prior_clicks, prior_impressions, prior_position = _period_totals(
+        slots[len(cur_q):], n, pri_c, pri_i, pri_pos)
+
+    in_current, in_prior = cur_rows > 0, pri_rows > 0
+    both = in_current & in_prior
+    ctr, prior_ctr = _ratio(clicks, impressions), _ratio(prior_clicks, prior_impressions)
+    has_ctr = both & (impressions > 0) & (prior_impressions > 0)
+    position_delta = np.where(both, position - prior_position, np.nan)
+
+    pooled = _ratio(clicks + prior_clicks, impressions + prior_impressions)
+    ctr_se = np.sqrt(pooled * (1 - pooled) * (_ratio(np.ones(n), impressions)
+                                               + _ratio(np.ones(n), prior_impressions)))
+    ctr_z = np.where(has_ctr, _ratio(ctr - prior_ctr, ctr_se), 0.0)
+
+    trend = np.full(n, "stable", dtype=object)
+    trend[both & (position_delta < -POSITION_CHANGE)] = "rising"
+    trend[both & (position_delta > POSITION_CHANGE)] = "falling"
+    trend[~in_prior] = "new"
+    trend[~in_current] = "lost"
+    return {
+        "query_ids": keys // n_pages,
+        "page_ids": keys % n_pages,
+        "in_current": in_current,
+        "in_prior": in_prior,
+        "clicks": clicks,
+        "prior_clicks": prior_clicks,
+        "impressions": impressions,
+        "prior_impressions": prior_impressions,
+        "ctr": np.where(in_current, ctr, np.nan),
+        "prior_ctr": np.where(in_prior, prior_ctr, np.nan),
+        "ctr_delta": np.where(has_ctr, ctr - prior_ctr, np.nan),
+        "position": np.where(in_current, position, np.nan),
+        "prior_position": np.where(in_prior, prior_position, np.nan),
+        "position_delta": position_delta,
+        "trend": trend,
+        "significant": {
+            "clicks": np.abs(_count_z(clicks, prior_clicks)) >= SIGNIFICANCE_Z,
+            "impressions": np.abs(_count_z(impressions, prior_impressions)) >= SIGNIFICANCE_Z,
+            "ctr": np.abs(ctr_z) >= SIGNIFICANCE_Z,
+            "position": both & (np.abs(np.nan_to_num(position_delta)) > POSITION_CHANGE),
+        },
+    }
+
+
+def _query_totals(table, n_queries):
+    query_ids, _, clicks, impressions, _ = _columns(table)
+    return (np.bincount(query_ids, minlength=n_queries) > 0,
+            np.bincount(query_ids, weights=clicks, minlength=n_queries),
+            np.bincount(query_ids, weights=impressions, minlength=n_queries))
+
+
+def _top(values, candidates, top):
+    """Return candidate indexes with the largest values, descending (ties keep order)."""
+    candidates = np.flatnonzero(candidates)
+    values = values[candidates]
+    if top is not None and top < len(candidates):
+        keep = np.argpartition(-values, top)[:top]
+        candidates, values = candidates[keep], values[keep]
+    return candidates[np.argsort(-values, kind="stable")]
+
+
+def _period_summary(table):
+    _, _, clicks, impressions, positions = _columns(table)
+    total_clicks, total_impressions = float(clicks.sum()), float(impressions.sum())
+    return {
+        "rows": len(table),
+        "clicks": int(total_clicks),
+        "impressions": int(total_impressions),
+        "ctr": round(total_clicks / total_impressions, 4) if total_impressions else None,
+        "position": (round(float((positions * impressions).sum()) / total_impressions, 1)
+                     if total_impressions else None),
+    }
+
+
+def _number(value, digits):
+    value = float(value)
+    return None if value != value else round(value, digits)
+
+
+def analyze(current, prior, min_impressions=0, top=20):
+    """Compare periods; return (report dict, iterator of pair records)."""
+    pairs = compare(current, prior)
+    queries = list(current.queries)
+    pages = list(current.pages)
+    significant = pairs["significant"]
+
+    def record(i):
+        return {
+            "query": queries[pairs["query_ids"][i]],
+            "page": pages[pairs["page_ids"][i]],
+            "clicks": int(pairs["clicks"][i]),
+            "prior_clicks": int(pairs["prior_clicks"][i]),
+            "clicks_delta": int(pairs["clicks"][i] - pairs["prior_clicks"][i]),
+            "impressions": int(pairs["impressions"][i]),
+            "prior_impressions": int(pairs["prior_impressions"][i]),
+            "impressions_delta": int(pairs["impressions"][i] - pairs["prior_impressions"][i]),
+            "ctr": _number(pairs["ctr"][i], 4),
+            "prior_ctr": _number(pairs["prior_ctr"][i], 4),
+            "ctr_delta": _number(pairs["ctr_delta"][i], 4),
+            "position": _number(pairs["position"][i], 1),
+            "prior_position": _number(pairs["prior_position"][i], 1),
+            "position_delta": _number(pairs["position_delta"][i], 1),
+            "trend": pairs["trend"][i],
+            "significant": [m for m in SIGNIFICANCE_METRICS if significant[m][i]],
+        }
+
+    n_queries = len(queries)
+    in_current, cur_clicks, cur_impressions = _query_totals(current, n_queries)
+    in_prior, pri_clicks, pri_impressions = _query_totals(prior, n_queries)
+    new_queries, lost_queries = in_current & ~in_prior, in_prior & ~in_current
+
+    def query_records(indexes, clicks, impressions):
+        return [{"query": queries[q], "clicks": int(clicks[q]), "impressions": int(impressions[q])}
+                for q in indexes]
+
+    clicks_delta = pairs["clicks"] - pairs["prior_clicks"]
+    eligible = np.maximum(pairs["impressions"], pairs["prior_impressions"]) >= min_impressions
+    trend = pairs["trend"]
+    report = {
+        "summary": {
+            "current": _period_summary(current),
+            "prior": _period_summary(prior),
+            "pairs": len(trend),
+            "trends": {t: int((trend == t).sum())
+                       for t in ("rising", "falling", "stable", "new", "lost")},
+            "significant": {m: int(significant[m].sum()) for m in SIGNIFICANCE_METRICS},
+            "new_queries": int(new_queries.sum()),
+            "lost_queries": int(lost_queries.sum()),
+        },
+        "top_gains": [record(i) for i in _top(clicks_delta, eligible & (clicks_delta > 0), top)],
+        "top_losses": [record(i) for i in _top(-clicks_delta, eligible & (clicks_delta < 0), top)],
+        "new_queries": query_records(_top(cur_impressions, new_queries, top),
+                                     cur_clicks, cur_impressions),
+        "lost_queries": query_records(_top(pri_impressions, lost_queries, top),
+                                      pri_clicks, pri_impressions),
+    }
+
+    def all_pairs():
+        for i in range(len(trend)):
+            yield record(i)
+
+    return report, all_pairs()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two GSC periods on (query, page)")
+    parser.add_argument("--current", nargs="+", required=True,
+                        help="Current period GSC JSON responses or NDJSON rows ('-' for stdin)")
+    parser.add_argument("--prior", nargs="+", required=True,
+                        help="Prior period GSC JSON responses or NDJSON rows")
+    parser.add_argument("--dimensions", default=",".join(DEFAULT_DIMENSIONS),
+                        help="Names of the row 'keys', in request order (default: %(default)s)")
+    parser.add_argument("--min-impressions", type=float, default=0,
+                        help="Ignore pairs with fewer impressions in both periods in top "
+                             "gains/losses (default: %(default)s)")
+    parser.add_argument("--top", type=int, default=20,
+                        help="Pairs and queries listed per section (default: %(default)s)")
+    parser.add_argument("--pairs-output", default=None,
+                        help="Write every (query, page) pair comparison to this NDJSON file")
+    parser.add_argument("--compact", action="store_true", help="Output minified JSON")
+    args = parser.parse_args()
+
+    if np is None:
+        print(json.dumps({"error": "period_compare.py needs numpy (pip install numpy)"}),
+              file=sys.stderr)
+        sys.exit(1)
+
+    dimensions = tuple(d.strip() for d in args.dimensions.split(",") if d.strip())
+    try:
+        current, prior = load_periods(args.current, args.prior, dimensions)
+    except FileNotFoundError as e:
+        print(json.dumps({"error": f"File not found: {e.filename}"}), file=sys.stderr)
+        sys.exit(1)
+    except json.JSONDecodeError as e:
+        print(json.dumps({"error": f"Invalid JSON input: {e}"}), file=sys.stderr)
+        sys.exit(1)
+    except (ValueError, AttributeError, TypeError, IndexError) as e:
+        print(json.dumps({"error": f"Invalid GSC row: {e}"}), file=sys.stderr)
+        sys.exit(1)
+
+    report, pairs = analyze(current, prior, min_impressions=args.min_impressions, top=args.top)
+    if args.pairs_output:
+        with open(args.pairs_output, "w", encoding="utf-8") as f:
+            for record in pairs:
+                f.write(json.dumps(record, ensure_ascii=False))
+                f.write("\n")
+
+    print(json.dumps(report, indent=None if args.compact else 2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
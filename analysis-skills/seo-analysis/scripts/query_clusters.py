@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""Cluster GSC queries by keyword stem into a topical authority map.
+
+Usage:
+    python3 query_clusters.py gsc_query_page.json
+    python3 query_clusters.py gsc_page1.json gsc_page2.json --merge-threshold 0.5 --markdown
+    python3 query_clusters.py gsc_rows.ndjson --queries-output query_clusters.ndjson
+
+Input is Search Console query_analytics output with ["query", "page"]
+dimensions, as read by ctr_opportunities.py: JSON responses with "rows",
+several paginated responses, or NDJSON rows.
+
+Implements the clustering in references/topical-clustering.md:
+
+1. Every distinct query is tokenized once. Plurals are stemmed, and
+   stopwords and modifiers ("best", "how", "tools", years) are dropped.
+2. A query's candidate stems are its terms and adjacent term pairs.
+   Postings (candidate stem, query id) give each candidate's query
+   count; pairs count double, so "project management" wins over
+   "project" unless "project" is in more than twice as many queries.
+   Each query joins its highest-weighted candidate (ties: pairs first,
+   then the alphabetically first).
+3. Per cluster: distinct queries, distinct pages, average position (each
+   query at its best-ranking page), page-1 rate (share of queries at
+   position <= 10), impressions and clicks, computed with grouped array
+   operations over all rows at once.
+
+With --merge-threshold, clusters are compared as sparse TF-IDF vectors of
+the other terms their queries use (each cluster's top terms besides its
+stem), and pairs with cosine similarity at or above the threshold are
+merged. This joins near-synonym stems that occur in the same contexts
+("project management" and "project manager" with certification, course,
+salary). Only clusters sharing a context term are compared.
+
+Authority level: strong (page-1 rate > 60% and 5+ queries), weak
+(page-1 rate < 20% or fewer than 3 queries), otherwise emerging.
+Knowledge Graph presence needs SerpAPI and is left as null.
+
+Output: JSON report to stdout (summary and clusters by impressions), or
+the authority map table with --markdown; --queries-output writes each
+query's cluster as NDJSON.
+Dependencies: numpy (pip install numpy).
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import sys
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ctr_opportunities import GscRows, iter_gsc_rows  # noqa: E402
+
+TOKEN_RE = re.compile(r"[^\W_]+(?:['.-][^\W_]+)*")
+YEAR_OR_NUMBER_RE = re.compile(r"^\d+$")
+# Dropped terms, in stemmed form: function words and intent/format modifiers
+STOPWORDS = frozenset((
+    "a", "an", "the", "and", "or", "of", "for", "to", "in", "on", "with", "by", "at",
+    "from", "into", "about", "is", "are", "was", "be", "do", "doe", "can", "should",
+    "i", "me", "my", "you", "your", "it", "this", "that", "near", "vs", "versus",
+    "how", "what", "why", "when", "where", "which", "who",
+    "best", "top", "free", "cheap", "good", "new", "online", "easy", "beginner",
+    "price", "pricing", "cost", "buy", "download", "alternative", "compare", "comparison",
+    "guide", "tutorial", "review", "example", "idea", "tip", "list",
+    "tool", "software", "app", "platform", "service", "solution",
+))
+# Weight of two-term stems relative to single terms when choosing a stem
+PAIR_WEIGHT = 2
+
+PAGE_ONE_POSITION = 10
+STRONG_PAGE_ONE_RATE = 0.6
+WEAK_PAGE_ONE_RATE = 0.2
+STRONG_MIN_QUERIES = 5
+WEAK_MIN_QUERIES = 3
+
+# TF-IDF merge: terms kept per cluster, and terms shared by more clusters
+# than this are too common to propose merges
+MERGE_TOP_TERMS = 8
+MERGE_MAX_POSTINGS = 200
+
+
+def stem_token(token):
+    """Return a light plural stem of a lowercase token ("tools" -> "tool", "companies" -> "company")."""
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 4 and token.endswith(("sses", "shes", "ches", "xes")):
+        return token[:-2]
+    if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+
+class QueryTerms:
+    """Stemmed content terms of each distinct query, as interned term ids."""
+
+    def __init__(self, queries):
+        self.vocabulary = {}
+        self.terms = []
+        stems = {}
+        vocabulary = self.vocabulary
+        for query in queries:
+            ids = []
+            for token in TOKEN_RE.findall(query.lower()):
+                stem = stems.get(token)
+                if stem is None:
+                    stem = stems[token] = stem_token(token)
+                if stem in STOPWORDS or YEAR_OR_NUMBER_RE.match(stem):
+                    continue
+                term_id = vocabulary.get(stem)
+                if term_id is None:
+                    term_id = vocabulary[stem] = len(vocabulary)
+                ids.append(term_id)
+            self.terms.append(ids)
+
+    def words(self):
+        """Return the term strings, indexed by term id."""
+        return list(self.vocabulary)
+
+
+def assign_stems(query_terms, queries):
+    """Return (stem per query as int array, stem strings) by highest-weighted candidate.
+
+    Candidates are a query's terms and adjacent term pairs; a query with no
+    content terms is its own candidate.
+    """
+    words = query_terms.words()
+    candidates = {}
+    pair_query = array("q")
+    pair_candidate = array("q")
+    for query_id, ids in enumerate(query_terms.terms):
+        names = [words[i] for i in ids]
+        names += [f"{a} {b}" for a, b in zip(names, names[1:]) if a != b]
+        if not names:
+            names = [queries[query_id].strip().lower()]
+        for name in dict.fromkeys(names):
+            candidate = candidates.get(name)
+            if candidate is None:
+                candidate = candidates[name] = len(candidates)
+            pair_query.append(query_id)
+            pair_candidate.append(candidate)
+
+    names = list(candidates)
+    if not names:
+        return np.zeros(0, dtype=np.int64), names
+    query_of = np.frombuffer(pair_query, dtype=np.int64)
+    candidate_of = np.frombuffer(pair_candidate, dtype=np.int64)
+    # Postings per candidate = the number of queries containing it
+    query_count = np.bincount(candidate_of, minlength=len(names))
+
+    is_pair = np.fromiter((" " in name for name in names), dtype=bool, count=len(names))
+    weight = query_count * np.where(is_pair, PAIR_WEIGHT, 1)
+    alphabetical = np.empty(len(names), dtype=np.int64)
+    alphabetical[np.argsort(np.asarray(names, dtype=object), kind="stable")] = np.arange(len(names))
+
+    # Per query, the last entry after sorting by (query, weight, pair, -alphabetical rank)
+    ranked = np.lexsort((-alphabetical[candidate_of], is_pair[candidate_of],
+                         weight[candidate_of], query_of))
+    last = np.flatnonzero(np.r_[query_of[ranked][1:] != query_of[ranked][:-1], True])
+    return candidate_of[ranked][last], names
+
+
+def _find(parent, node):
+    while parent[node] != node:
+        parent[node] = parent[parent[node]]
+        node = parent[node]
+    return node
+
+
+def merge_similar(query_cluster, query_terms, stem_labels, cluster_size, threshold):
+    """Merge clusters whose context TF-IDF vectors have cosine similarity >= threshold.
+
+    A cluster's vector counts the terms of its queries other than its own
+    stem's terms, which every member shares and which differ between any
+    two clusters. Returns the cluster of each query after merging; a
+    merged cluster keeps the id of its member with the largest cluster_size.
+    """
+    clusters = len(cluster_size)
+    lengths = np.fromiter((len(t) for t in query_terms.terms), dtype=np.int64,
+                          count=len(query_terms.terms))
+    if not lengths.sum():
+        return query_cluster
+    term_of = np.fromiter((t for ids in query_terms.terms for t in ids), dtype=np.int64,
+                          count=int(lengths.sum()))
+    cluster_of = np.repeat(query_cluster, lengths)
+
+    # Drop each cluster's stem terms (up to two per stem; -1 pads)
+    stem_terms = np.full((clusters, 2), -1, dtype=np.int64)
+    for cluster, label in enumerate(stem_labels):
+        ids = [query_terms.vocabulary.get(word, -1) for word in label.split(" ")[:2]]
+        stem_terms[cluster, :len(ids)] = ids
+    context = (term_of != stem_terms[cluster_of, 0]) & (term_of != stem_terms[cluster_of, 1])
+    cluster_of, term_of = cluster_of[context], term_of[context]
+    if not len(term_of):
+        return query_cluster
+
+    vocabulary = len(query_terms.vocabulary)
+    keys, tf = np.unique(cluster_of * vocabulary + term_of, return_counts=True)
+    cluster_of, term_of = keys // vocabulary, keys % vocabulary
+    document_frequency = np.bincount(term_of, minlength=vocabulary)
+    # Smoothed IDF: terms in every cluster keep a small weight
+    idf = np.log((1 + clusters) / (1 + document_frequency[term_of])) + 1
+    weight = (1 + np.log(tf)) * idf
+
+    # Keep each cluster's top terms, then L2-normalize
+    order = np.lexsort((-weight, cluster_of))
+    cluster_of, term_of, weight = cluster_of[order], term_of[order], weight[order]
+    starts = np.r_[0, np.flatnonzero(cluster_of[1:] != cluster_of[:-1]) + 1]
+    rank = np.arange(len(cluster_of)) - np.repeat(starts, np.diff(np.r_[starts, len(cluster_of)]))
+    keep = rank < MERGE_TOP_TERMS
+    cluster_of, term_of, weight = cluster_of[keep], term_of[keep], weight[keep]
+    norms = np.sqrt(np.bincount(cluster_of, weight * weight, minlength=clusters))
+    weight = weight / norms[cluster_of]
+
+    # Postings per term; every pair within a posting list adds w_a * w_b
+    order = np.argsort(term_of, kind="stable")
+    cluster_of, term_of, weight = cluster_of[order], term_of[order], weight[order]
+    bounds = np.r_[0, np.flatnonzero(term_of[1:] != term_of[:-1]) + 1, len(term_of)]
+    firsts, seconds, products = [], [], []
+    pair_indexes = {}
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        size = end - start
+        if size < 2 or size > MERGE_MAX_POSTINGS:
+            continue
+        left, right = pair_indexes.get(size) or pair_indexes.setdefault(size, np.triu_indices(size, 1))
+        firsts.append(cluster_of[start:end][left])
+        seconds.append(cluster_of[start:end][right])
+        products.append(weight[start:end][left] * weight[start:end][right])
+    if not firsts:
+        return query_cluster
+    first, second = np.concatenate(firsts), np.concatenate(seconds)
+    low, high = np.minimum(first, second), np.maximum(first, second)
+    pairs, inverse = np.unique(low * clusters + high, return_inverse=True)
+    similarity = np.bincount(inverse, np.concatenate(products))
+
+    parent = list(range(clusters))
+    for pair in pairs[similarity >= threshold - 1e-9].tolist():
+        a, b = _find(parent, pair // clusters), _find(parent, pair % clusters)
+        if a != b:
+            if (cluster_size[b], -b) > (cluster_size[a], -a):
+                a, b = b, a
+            parent[b] = a
+    roots = np.fromiter((_find(parent, c) for c in range(clusters)), dtype=np.int64, count=clusters)
+    return roots[query_cluster]
+
+
+def cluster_queries(table, merge_threshold=None):
+    """Cluster the queries of a GscRows table; return (report rows, query cluster ids, labels)."""
+    queries = list(table.queries)
+    if not queries:
+        return [], np.zeros(0, dtype=np.int64), []
+    query_terms = QueryTerms(queries)
+    stem_of_query, stems = assign_stems(query_terms, queries)
+    labels, query_cluster = np.unique(stem_of_query, return_inverse=True)
+    stem_labels = [stems[s] for s in labels.tolist()]
+
+    query_ids = np.frombuffer(table.query_ids, dtype=np.int64)
+    page_ids = np.frombuffer(table.page_ids, dtype=np.int64)
+    positions = np.frombuffer(table.positions, dtype=np.float64)
+    impressions = np.frombuffer(table.impressions, dtype=np.float64)
+    clicks = np.frombuffer(table.clicks, dtype=np.float64)
+    query_impressions = np.bincount(query_ids, impressions, minlength=len(queries))
+
+    merged_from = {}
+    if merge_threshold is not None and len(stem_labels) > 1:
+        cluster_impressions = np.bincount(query_cluster, query_impressions, minlength=len(stem_labels))
+        merged = merge_similar(query_cluster, query_terms, stem_labels, cluster_impressions,
+                              merge_threshold)
+        for old, new in set(zip(query_cluster.tolist(), merged.tolist())):
+            if old != new:
+                merged_from.setdefault(new, []).append(stem_labels[old])
+        query_cluster = merged
+
+    # Renumber clusters densely
+    kept, query_cluster = np.unique(query_cluster, return_inverse=True)
+    names = [stem_labels[c] for c in kept.tolist()]
+    merged_stems = [sorted(merged_from.get(c, ())) for c in kept.tolist()]
+    clusters = len(names)
+
+    # Each query at its best-ranking page
+    best_position = np.full(len(queries), np.inf)
+    np.minimum.at(best_position, query_ids, np.where(positions > 0, positions, np.inf))
+    ranked = np.isfinite(best_position)
+    query_count = np.bincount(query_cluster, minlength=clusters)
+    ranked_count = np.bincount(query_cluster, ranked, minlength=clusters)
+    position_sum = np.bincount(query_cluster, np.where(ranked, best_position, 0), minlength=clusters)
+    page_one = np.bincount(query_cluster, ranked & (best_position <= PAGE_ONE_POSITION),
+                           minlength=clusters)
+    row_cluster = query_cluster[query_ids]
+    cluster_pages = np.unique(row_cluster * max(len(table.pages), 1) + page_ids) // max(len(table.pages), 1)
+    page_count = np.bincount(cluster_pages, minlength=clusters)
+    cluster_impressions = np.bincount(row_cluster, impressions, minlength=clusters)
+    cluster_clicks = np.bincount(row_cluster, clicks, minlength=clusters)
+
+    average_position = np.divide(position_sum, ranked_count, out=np.full(clusters, np.nan),
+                                 where=ranked_count > 0)
+    page_one_rate = page_one / np.maximum(query_count, 1)
+    level = np.select(
+        [(page_one_rate > STRONG_PAGE_ONE_RATE) & (query_count >= STRONG_MIN_QUERIES),
+         (page_one_rate < WEAK_PAGE_ONE_RATE) | (query_count < WEAK_MIN_QUERIES)],
+        ["strong", "weak"], "emerging",
+    )
+
+    # Top queries per cluster by impressions
+    by_cluster = np.lexsort((-query_impressions, query_cluster))
+    starts = np.searchsorted(query_cluster[by_cluster], np.arange(clusters))
+
+    order = np.lexsort((np.asarray(names, dtype=object).astype(str), -cluster_impressions))
+    rows = []
+    for c in order.tolist():
+        top = by_cluster[starts[c]:starts[c] + min(query_count[c], 3)]
+        rows.append({
+            "cluster": names[c],
+            "queries": int(query_count[c]),
+            "pages": int(page_count[c]),
+            "avg_position": None if math.isnan(average_position[c]) else round(float(average_position[c]), 1),
+            "page1_rate": round(float(page_one_rate[c]), 3),
+            "impressions": int(cluster_impressions[c]),
+            "clicks": int(cluster_clicks[c]),
+            "kg_present": None,
+            "authority_level": str(level[c]),
+            "top_queries": [queries[q] for q in top.tolist()],
+            "merged_stems": merged_stems[c],
+        })
+    return rows, query_cluster, names
+
+
+def markdown_table(rows):
+    """Return the authority map table of references/topical-clustering.md."""
+    lines = [
+        "| Topic Cluster | Queries | Pages | Avg Position | Page-1 Rate | KG Present? | Authority Level |",
+        "|--------------|---------|-------|-------------|-------------|-------------|-----------------|",
+    ]
+    for row in rows:
+        position = "—" if row["avg_position"] is None else f"{row['avg_position']:.1f}"
+        kg = "—" if row["kg_present"] is None else ("Yes" if row["kg_present"] else "No")
+        lines.append(
+            f"| \"{row['cluster']}\" | {row['queries']} | {row['pages']} | {position} | "
+            f"{row['page1_rate']:.0%} | {kg} | {row['authority_level'].capitalize()} |"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cluster GSC queries into a topical authority map")
+    parser.add_argument("inputs", nargs="+", help="GSC JSON responses or NDJSON rows ('-' for stdin)")
+    parser.add_argument("--dimensions", default="query,page",
+                        help="Names of the row 'keys', in request order (default: %(default)s)")
+    parser.add_argument("--merge-threshold", type=float, default=None,
+                        help="Merge clusters with TF-IDF cosine similarity >= this (e.g. 0.5)")
+    parser.add_argument("--top", type=int, default=50,
+                        help="Clusters listed, by impressions (default: %(default)s)")
+    parser.add_argument("--markdown", action="store_true",
+                        help="Print the authority map table instead of JSON")
+    parser.add_argument("--queries-output", default=None,
+                        help="Write each query's cluster to this NDJSON file")
+    parser.add_argument("--compact", action="store_true", help="Output minified JSON")
+    args = parser.parse_args()
+
+    if np is None:
+        print(json.dumps({"error": "query_clusters.py needs numpy (pip install numpy)"}), file=sys.stderr)
+        sys.exit(1)
+    if args.merge_threshold is not None and not 0 < args.merge_threshold <= 1:
+        print(json.dumps({"error": "--merge-threshold must be between 0 and 1"}), file=sys.stderr)
+        sys.exit(1)
+
+    dimensions = tuple(d.strip() for d in args.dimensions.split(",") if d.strip())
+    if "query" not in dimensions:
+        print(json.dumps({"error": "--dimensions must include query"}), file=sys.stderr)
+        sys.exit(1)
+    try:
+        table = GscRows.from_rows(iter_gsc_rows(args.inputs), dimensions)
+    except FileNotFoundError as e:
+        print(json.dumps({"error": f"File not found: {e.filename}"}), file=sys.stderr)
+        sys.exit(1)
+    except json.JSONDecodeError as e:
+        print(json.dumps({"error": f"Invalid JSON input: {e}"}), file=sys.stderr)
+        sys.exit(1)
+    except (ValueError, AttributeError, TypeError, IndexError) as e:
+        print(json.dumps({"error": f"Invalid GSC row: {e}"}), file=sys.stderr)
+        sys.exit(1)
+
+    rows, query_cluster, names = cluster_queries(table, args.merge_threshold)
+    if args.queries_output:
+        with open(args.queries_output, "w", encoding="utf-8") as f:
+            for query, cluster in zip(table.queries, query_cluster.tolist()):
+                f.write(json.dumps({"query": query, "cluster": names[cluster]}, ensure_ascii=False))
+                f.write("\n")
+
+    if args.markdown:
+        print(markdown_table(rows[:args.top]))
+        return
+    levels = [row["authority_level"] for row in rows]
+    report = {
+        "summary": {
+            "queries": len(table.queries),
+            "rows": len(table),
+            "clusters": len(rows),
+            "authority_levels": {level: levels.count(level) for level in ("strong", "emerging", "weak")},
+        },
+        "clusters": rows[:args.top],
+    }
+    print(json.dumps(report, indent=None if args.compact else 2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
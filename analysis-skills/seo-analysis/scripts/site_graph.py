@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""Build a site's internal link graph from extracted page signals.
+
+Usage:
+    python3 extract_page_signals.py --manifest pages.tsv --fields url,internal_link_anchors --output signals.ndjson
+    python3 site_graph.py signals.ndjson --home https://example.com/
+    python3 site_graph.py signals.ndjson site_signals.ndjson --top 50 --pages-output graph.ndjson
+    cat signals.ndjson | python3 site_graph.py - --damping 0.85
+
+Input is NDJSON from extract_page_signals.py batch mode or crawl_site.py:
+each record's url is a page, and its internal_link_anchors are that page's
+out-links. Relative hrefs are resolved against the page URL, fragments are
+dropped, and self-links and non-HTTP links are ignored. Page URLs must be
+http(s): extract_page_signals.py batch mode only knows them from a
+--manifest (path<TAB>url lines) or WARC records, and records whose url is
+a file path are skipped.
+
+URLs are interned to integer ids and links are stored as CSR arrays
+(indptr/indices, one row per source page, duplicates removed), so PageRank,
+in-degree, click depth and anchor-text counts are computed with NumPy array
+operations; a million links take seconds, most of it reading the input.
+
+Reported per page: internal PageRank (damping 0.85, sums to 1 over all
+pages, including linked pages that were not crawled), in-degree and
+out-degree, click depth from the home page (breadth-first over links;
+null when unreachable), orphan status (a crawled page no other page links
+to) and the most common anchor texts pointing at it. The home page is
+--home, or the most linked-to crawled root URL ("/").
+
+Output: JSON report to stdout (summary, top pages by PageRank, orphans,
+deepest pages); --pages-output writes one NDJSON record per page.
+Dependencies: numpy (pip install numpy).
+"""
+
+import argparse
+import json
+import sys
+from array import array
+from urllib.parse import urljoin, urlsplit
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+DEFAULT_DAMPING = 0.85
+DEFAULT_TOP = 20
+DEFAULT_ANCHORS_PER_PAGE = 10
+PAGERANK_TOLERANCE = 1e-10
+PAGERANK_MAX_ITERATIONS = 200
+
+
+def normalize_anchor_text(text):
+    """Collapse whitespace and casefold so anchor variants count together."""
+    return " ".join(text.split()).casefold()
+
+
+def _base_urls(page_url):
+    """Return (origin, directory URL) of a page, used to resolve hrefs."""
+    parts = urlsplit(page_url)
+    origin = f"{parts.scheme}://{parts.netloc}"
+    return origin, origin + parts.path[:parts.path.rfind("/") + 1] if parts.path else origin + "/"
+
+
+def _resolve_href(href, page_url, origin, directory):
+    """Return the absolute, fragment-free http(s) URL for an href, or None.
+
+    Common href shapes are joined by string concatenation; anything with
+    dot segments or an unusual form goes through urljoin.
+    """
+    if href.startswith("#"):
+        return None
+    if href.endswith("?") or "?#" in href:
+        # urljoin drops an empty query
+        url = urljoin(page_url, href)
+    elif href.startswith(("https://", "http://")):
+        url = href
+    elif ":" in href.partition("/")[0] and urlsplit(href).scheme not in ("", "http", "https"):
+        # mailto:, tel:, javascript: and friends
+        return None
+    elif not href or href[0] in ".?" or "//" in href or ":" in href or "/." in href:
+        url = urljoin(page_url, href)
+    elif href.startswith("/"):
+        url = origin + href
+    else:
+        url = directory + href
+    if not url.startswith(("https://", "http://")):
+        return None
+    return url.partition("#")[0]
+
+
+class SiteGraph:
+    """Internal link graph with interned URLs and CSR adjacency.
+
+    Attributes:
+        urls: Node id -> URL
+        crawled: Boolean array, True for pages present in the input
+        indptr, indices: Out-links of node i are indices[indptr[i]:indptr[i+1]]
+            (sorted, unique, no self-links)
+        anchor_texts: Anchor text id -> normalized text
+        anchor_target, anchor_text, anchor_count: One row per (target node,
+            anchor text) pair with the number of links using it
+        links: Number of followed links read (before removing duplicates)
+        skipped: Records skipped because their url is not http(s)
+    """
+
+    def __init__(self, urls, crawled, src, dst, texts, anchor_texts):
+        n = len(urls)
+        self.urls = urls
+        self.crawled = crawled
+        self.anchor_texts = anchor_texts
+        self.links = len(src)
+        self.skipped = 0
+
+        keep = src != dst
+        src, dst, texts = src[keep], dst[keep], texts[keep]
+
+        # Unique edges sorted by (source, target) give the CSR rows directly
+        edge_keys = np.unique(src.astype(np.int64) * n + dst)
+        edge_src = edge_keys // n
+        self.indices = (edge_keys % n).astype(np.int32)
+        self.indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(edge_src, minlength=n), out=self.indptr[1:])
+
+        pair_keys, counts = np.unique(dst.astype(np.int64) * max(len(anchor_texts), 1) + texts,
+                                      return_counts=True)
+        self.anchor_target = (pair_keys // max(len(anchor_texts), 1)).astype(np.int32)
+        self.anchor_text = (pair_keys % max(len(anchor_texts), 1)).astype(np.int32)
+        self.anchor_count = counts
+
+    @classmethod
+    def from_records(cls, records):
+        """Build the graph from extraction records (dicts with url and internal_link_anchors).
+
+        Raises ValueError when records were read but none has an http(s) url.
+        """
+        ids = {}
+        urls = []
+        crawled_ids = array("q")
+        # Normalized and raw anchor text -> text id
+        text_ids = {}
+        raw_text_ids = {}
+        anchor_texts = []
+        src = array("q")
+        dst = array("q")
+        texts = array("q")
+        skipped = 0
+
+        def intern(url):
+            node = ids.get(url)
+            if node is None:
+                node = ids[url] = len(urls)
+                urls.append(url)
+            return node
+
+        for record in records:
+            page_url = record.get("url")
+            if "error" in record:
+                continue
+            if not page_url or not page_url.startswith(("https://", "http://")):
+                # A file path (batch mode without --manifest): links cannot be resolved
+                skipped += 1
+                continue
+            page_url = page_url.partition("#")[0]
+            page = intern(page_url)
+            crawled_ids.append(page)
+            origin, directory = _base_urls(page_url)
+            for anchor in record.get("internal_link_anchors") or ():
+                target_url = _resolve_href(anchor.get("href") or "", page_url, origin, directory)
+                if target_url is None:
+                    continue
+                raw_text = anchor.get("text") or ""
+                text_id = raw_text_ids.get(raw_text)
+                if text_id is None:
+                    text = normalize_anchor_text(raw_text)
+                    text_id = text_ids.get(text)
+                    if text_id is None:
+                        text_id = text_ids[text] = len(anchor_texts)
+                        anchor_texts.append(text)
+                    raw_text_ids[raw_text] = text_id
+                src.append(page)
+                dst.append(intern(target_url))
+                texts.append(text_id)
+
+        if skipped and not crawled_ids:
+            raise ValueError(f"none of the {skipped} records has an http(s) url; pass page URLs "
+                             "with extract_page_signals.py --manifest or use crawl_site.py output")
+        crawled = np.zeros(len(urls), dtype=bool)
+        crawled[np.frombuffer(crawled_ids, dtype=np.int64)] = True
+        graph = cls(
+            urls, crawled,
+            np.frombuffer(src, dtype=np.int64), np.frombuffer(dst, dtype=np.int64),
+            np.frombuffer(texts, dtype=np.int64), anchor_texts,
+        )
+        graph.skipped = skipped
+        return graph
+
+    @property
+    def nodes(self):
+        return len(self.urls)
+
+    @property
+    def edges(self):
+        return len(self.indices)
+
+    def out_degree(self):
+        return np.diff(self.indptr)
+
+    def in_degree(self):
+        return np.bincount(self.indices, minlength=self.nodes)
+
+    def pagerank(self, damping=DEFAULT_DAMPING, tol=PAGERANK_TOLERANCE,
+                 max_iterations=PAGERANK_MAX_ITERATIONS):
+        """Power-iteration PageRank; rank of pages without out-links is spread evenly."""
+        n = self.nodes
+        if n == 0:
+            return np.zeros(0)
+        if not self.edges:
+            # Every page is dangling, so rank stays uniform
+            return np.full(n, 1.0 / n)
+        out_degree = self.out_degree()
+        dangling = out_degree == 0
+        inv_out = np.zeros(n)
+        inv_out[~dangling] = 1.0 / out_degree[~dangling]
+        sources = np.repeat(np.arange(n), out_degree)
+        rank = np.full(n, 1.0 / n)
+        for _ in range(max_iterations):
+            spread = (rank * inv_out)[sources]
+            # bincount of no edges is int64 even with weights
+            new = np.bincount(self.indices, weights=spread, minlength=n).astype(np.float64)
+            new += rank[dangling].sum() / n
+            new = damping * new + (1.0 - damping) / n
+            delta = np.abs(new - rank).sum()
+            rank = new
+            if delta < tol:
+                break
+        return rank
+
+    def click_depth(self, start):
+        """Breadth-first link distance from node start (-1: unreachable)."""
+        depth = np.full(self.nodes, -1, dtype=np.int32)
+        if start is None:
+            return depth
+        depth[start] = 0
+        frontier = np.array([start], dtype=np.int64)
+        level = 0
+        while frontier.size:
+            starts = self.indptr[frontier]
+            counts = self.indptr[frontier + 1] - starts
+            total = int(counts.sum())
+            if not total:
+                break
+            # Positions of every out-link of every frontier node
+            row_offsets = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+            neighbors = self.indices[row_offsets + np.arange(total)]
+            frontier = np.unique(neighbors[depth[neighbors] < 0])
+            level += 1
+            depth[frontier] = level
+        return depth
+
+    def find_home(self, home=None):
+        """Return the node id of the home page (None if it cannot be found)."""
+        if home:
+            node = self.urls.index(home) if home in self.urls else None
+            if node is None and not home.endswith("/"):
+                node = self.urls.index(home + "/") if home + "/" in self.urls else None
+            return node
+        in_degree = self.in_degree()
+        roots = [i for i, url in enumerate(self.urls)
+                 if self.crawled[i] and urlsplit(url).path in ("", "/") and not urlsplit(url).query]
+        candidates = roots or np.flatnonzero(self.crawled).tolist()
+        if not candidates:
+            return None
+        return max(candidates, key=lambda i: (in_degree[i], -i))
+
+    def top_anchors(self, per_page=DEFAULT_ANCHORS_PER_PAGE):
+        """Return {node id: [(text, count), ...]} with the most used anchor texts per target."""
+        order = np.lexsort((-self.anchor_count, self.anchor_target))
+        targets = self.anchor_target[order]
+        group_start = np.searchsorted(targets, targets, side="left")
+        keep = order[np.arange(len(order)) - group_start < per_page]
+        anchors = {}
+        for target, text, count in zip(self.anchor_target[keep].tolist(),
+                                       self.anchor_text[keep].tolist(),
+                                       self.anchor_count[keep].tolist()):
+            anchors.setdefault(target, []).append((self.anchor_texts[text], count))
+        return anchors
+
+
+def iter_records(paths):
+    """Yield JSON records from NDJSON files ('-' for stdin), skipping blank lines."""
+    for path in paths:
+        f = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+        try:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+
+def analyze(graph, home=None, damping=DEFAULT_DAMPING, top=DEFAULT_TOP,
+            anchors_per_page=DEFAULT_ANCHORS_PER_PAGE):
+    """Compute the per-page metrics; return (report dict, per-page record iterator)."""
+    rank = graph.pagerank(damping)
+    in_degree = graph.in_degree()
+    out_degree = graph.out_degree()
+    home_node = graph.find_home(home)
+    depth = graph.click_depth(home_node)
+    orphan = graph.crawled & (in_degree == 0)
+    if home_node is not None:
+        orphan[home_node] = False
+    anchors = graph.top_anchors(anchors_per_page)
+
+    def page(i):
+        return {
+            "url": graph.urls[i],
+            "crawled": bool(graph.crawled[i]),
+            "pagerank": round(float(rank[i]), 10),
+            "in_degree": int(in_degree[i]),
+            "out_degree": int(out_degree[i]),
+            "click_depth": int(depth[i]) if depth[i] >= 0 else None,
+            "orphan": bool(orphan[i]),
+            "top_anchors": [{"text": t, "count": c} for t, c in anchors.get(i, [])],
+        }
+
+    crawled_depth = depth[graph.crawled]
+    levels, level_counts = np.unique(crawled_depth[crawled_depth >= 0], return_counts=True)
+    depth_distribution = {str(int(d)): int(c) for d, c in zip(levels, level_counts)}
+    unreachable = int((crawled_depth < 0).sum())
+    if unreachable:
+        depth_distribution["unreachable"] = unreachable
+
+    by_rank = np.argsort(-rank, kind="stable")[:top]
+    orphan_nodes = np.flatnonzero(orphan)
+    reachable = np.flatnonzero(graph.crawled & (depth >= 0))
+    deepest = reachable[np.argsort(-depth[reachable], kind="stable")[:top]]
+
+    report = {
+        "pages": int(graph.crawled.sum()),
+        "records_without_url": graph.skipped,
+        "uncrawled_link_targets": int(graph.nodes - graph.crawled.sum()),
+        "links": graph.links,
+        "unique_links": graph.edges,
+        "home": graph.urls[home_node] if home_node is not None else None,
+        "orphan_pages": int(orphan_nodes.size),
+        "click_depth_distribution": depth_distribution,
+        "top_pages": [page(i) for i in by_rank.tolist()],
+        "orphans": [graph.urls[i] for i in orphan_nodes[:top].tolist()],
+        "deepest_pages": [{"url": graph.urls[i], "click_depth": int(depth[i])}
+                          for i in deepest.tolist()],
+    }
+    return report, (page(i) for i in range(graph.nodes))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Internal link graph metrics (PageRank, orphans, click depth, anchors) "
+                    "from extract_page_signals.py/crawl_site.py NDJSON.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("inputs", nargs="+", help="NDJSON signal files ('-' for stdin)")
+    parser.add_argument("--home", default=None,
+                        help="Home page URL for click depth (default: most linked-to root URL)")
+    parser.add_argument("--damping", type=float, default=DEFAULT_DAMPING,
+                        help="PageRank damping factor (default: %(default)s)")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP,
+                        help="Pages listed per report section (default: %(default)s)")
+    parser.add_argument("--anchors-per-page", type=int, default=DEFAULT_ANCHORS_PER_PAGE,
+                        help="Anchor texts kept per target page (default: %(default)s)")
+    parser.add_argument("--pages-output", default=None,
+                        help="Write one NDJSON record per page (crawled or linked) to this file")
+    parser.add_argument("--compact", action="store_true", help="Output minified JSON")
+    args = parser.parse_args()
+
+    if np is None:
+        print(json.dumps({"error": "site_graph.py needs numpy (pip install numpy)"}), file=sys.stderr)
+        sys.exit(1)
+    if not 0 < args.damping < 1:
+        print(json.dumps({"error": "--damping must be between 0 and 1"}), file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        graph = SiteGraph.from_records(iter_records(args.inputs))
+    except FileNotFoundError as e:
+        print(json.dumps({"error": f"File not found: {e.filename}"}), file=sys.stderr)
+        sys.exit(1)
+    except json.JSONDecodeError as e:
+        print(json.dumps({"error": f"Invalid NDJSON input: {e}"}), file=sys.stderr)
+        sys.exit(1)
+    except ValueError as e:
+        print(json.dumps({"error": str(e)}), file=sys.stderr)
+        sys.exit(1)
+    if args.home and graph.find_home(args.home) is None:
+        print(json.dumps({"error": f"Home page not found in input: {args.home}"}), file=sys.stderr)
+        sys.exit(1)
+
+    report, pages = analyze(graph, home=args.home, damping=args.damping, top=args.top,
+                            anchors_per_page=args.anchors_per_page)
+    if args.pages_output:
+        with open(args.pages_output, "w", encoding="utf-8") as f:
+            for record in pages:
+                f.write(json.dumps(record, ensure_ascii=False))
+                f.write("\n")
+
+    print(json.dumps(report, indent=None if args.compact else 2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""Generate deterministic synthetic HTML pages for benchmarking the extractor.
+
+Usage:
+    python3 synthetic_pages.py ./bench-pages                    # all cases
+    python3 synthetic_pages.py ./bench-pages --cases blog_small,jsonld_huge
+
+Cases range from small blog posts to 5 MB pages with huge inline JSON-LD,
+deeply nested markup and thousands of links and images, plus pages as a
+browser serializes them and malformed tag soup, where parsers disagree. Pages depend only
+on the case name and index (string-seeded random, independent of hash
+randomization), so every machine generates the same pages; bump
+GENERATOR_VERSION when a builder changes.
+
+Output: one .html file per page under <outdir>/<case>/.
+Dependencies: Python 3 stdlib only (no pip install required).
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+
+GENERATOR_VERSION = "1"
+
+WORDS = (
+    "search engine answer page content schema question structured data ranking "
+    "query intent snippet crawl index link anchor image alt heading section topic "
+    "cluster entity author review product price guide tutorial install configure "
+    "create open run start step first better best compare choose recommend means "
+    "refers defined cost free plan team customer platform data pipeline workflow "
+    "report metric dashboard traffic click impression position audience segment "
+    "profile journey campaign email mobile desktop local business video speakable "
+    "breadcrumb article faq howto organization website service support help"
+).split()
+
+QUESTION_WORDS = ("What", "How", "Why", "When", "Which", "Can", "Does", "Is", "Should")
+BLUF_OPENERS = (
+    "{Topic} is a {word} that helps teams {verb} {noun}.",
+    "Yes, {noun} can be {verb}d in under {n} minutes.",
+    "{n} {noun}s are included in every plan.",
+    "Step 1: {verb} the {noun} from the dashboard.",
+    "The best option for most teams is {noun} because it is {word}.",
+    "It depends on how your {noun} is configured.",
+)
+
+MB = 1024 * 1024
+
+# Browser serialization (see browser_serialized)
+TAG_NAME_RE = re.compile(r"(</?)([A-Za-z][A-Za-z0-9]*)")
+SENTENCE_GAP_RE = re.compile(r"\. (?=[A-Z])")
+BLOCK_END_RE = re.compile(r"</(?:p|h[1-6]|ul|ol|li|table|tr|header|nav|footer|title)>|<meta[^>]*>|<link[^>]*>")
+
+
+def _words(r, n):
+    return " ".join(r.choice(WORDS) for _ in range(n))
+
+
+def _sentence(r, lo=8, hi=20):
+    text = _words(r, r.randint(lo, hi))
+    return text[0].upper() + text[1:] + "."
+
+
+def _paragraph(r, sentences=4):
+    return "<p>" + " ".join(_sentence(r) for _ in range(sentences)) + "</p>"
+
+
+def _bluf(r):
+    return r.choice(BLUF_OPENERS).format(
+        Topic=r.choice(WORDS).capitalize(), word=r.choice(WORDS), verb=r.choice(WORDS),
+        noun=r.choice(WORDS), n=r.randint(2, 90),
+    )
+
+
+def _link(r, host, i):
+    kind = r.random()
+    if kind < 0.6:
+        href = f"https://{host}/{r.choice(WORDS)}/{i}"
+    elif kind < 0.8:
+        href = f"/{r.choice(WORDS)}-{i}"
+    else:
+        href = f"https://{r.choice(WORDS)}.example.org/{i}"
+    return f'<a href="{href}">{_words(r, r.randint(1, 5))}</a>'
+
+
+def _image(r, i):
+    if r.random() < 0.7:
+        return f'<img src="/img/{i}.png" alt="{_words(r, r.randint(2, 8))}">'
+    return f'<img src="/img/{i}.png">'
+
+
+def _head(r, title, json_ld=None):
+    parts = [
+        "<!DOCTYPE html><html lang=\"en\"><head><meta charset=\"utf-8\">",
+        f"<title>{title}</title>",
+        f'<meta name="description" content="{_sentence(r)}">',
+        f'<meta property="og:title" content="{title}">',
+        f'<meta property="og:description" content="{_sentence(r)}">',
+        '<meta property="og:image" content="https://example.com/og.png">',
+        '<meta name="twitter:card" content="summary_large_image">',
+        '<link rel="canonical" href="https://example.com/page">',
+        "<style>body{font-family:sans-serif}</style>",
+        "<script>window.dataLayer=window.dataLayer||[];function gtag(){dataLayer.push(arguments)}</script>",
+    ]
+    if json_ld is not None:
+        parts.append(f'<script type="application/ld+json">{json.dumps(json_ld)}</script>')
+    parts.append("</head>")
+    return "".join(parts)
+
+
+def _article_ld(r, title):
+    return {
+        "@context": "https://schema.org",
+        "@type": "BlogPosting",
+        "headline": title,
+        "author": {"@type": "Person", "name": _words(r, 2).title(),
+                   "url": "https://example.com/about",
+                   "sameAs": ["https://www.linkedin.com/in/example"]},
+        "about": {"@type": "Thing", "name": r.choice(WORDS)},
+        "mainEntityOfPage": "https://example.com/page",
+    }
+
+
+def _faq_ld(r, questions):
+    return {
+        "@context": "https://schema.org",
+        "@type": "FAQPage",
+        "mainEntity": [
+            {"@type": "Question", "name": q,
+             "acceptedAnswer": {"@type": "Answer", "text": _sentence(r)}}
+            for q in questions
+        ],
+    }
+
+
+def _howto_graph_ld(r, title):
+    return {
+        "@context": "https://schema.org",
+        "@graph": [
+            {"@type": "HowTo", "name": title,
+             "step": [{"@type": "HowToStep", "text": _sentence(r)} for _ in range(4)]},
+            {"@type": "BreadcrumbList", "itemListElement": [
+                {"@type": "ListItem", "position": i + 1, "name": r.choice(WORDS)} for i in range(3)
+            ]},
+            {"@type": ["LocalBusiness", "ProfessionalService"], "name": _words(r, 2),
+             "sameAs": "https://example.org/biz"},
+            {"@type": "VideoObject", "name": _words(r, 3),
+             "speakable": {"@type": "SpeakableSpecification", "cssSelector": ["h1"]}},
+        ],
+    }
+
+
+def _heading(r):
+    style = r.random()
+    if style < 0.6:
+        return f"{r.choice(QUESTION_WORDS)} {_words(r, r.randint(3, 7))}?"
+    if style < 0.8:
+        # Question word without a question mark
+        return f"{r.choice(QUESTION_WORDS)} to {_words(r, r.randint(2, 5))}"
+    return _words(r, r.randint(2, 6)).title()
+
+
+def blog_post(r, sections, host="example.com"):
+    """A blog post with question headings, BLUF openers, lists, a table and links."""
+    title = _words(r, 6).title() + " &amp; More"
+    questions = [_heading(r) for _ in range(sections)]
+    kind = r.random()
+    if kind < 0.4:
+        json_ld = _article_ld(r, title)
+    elif kind < 0.7:
+        json_ld = _faq_ld(r, questions)
+    else:
+        json_ld = _howto_graph_ld(r, title)
+    body = [f"<body><header><nav>{''.join(_link(r, host, i) for i in range(8))}</nav></header>",
+            f"<main><article><h1>{title}</h1>", _paragraph(r, 3)]
+    if r.random() < 0.2:
+        # Invalid JSON-LD is ignored by the extractor
+        body.append('<script type="application/ld+json">{"@type": "Article",}</script>')
+    link_id = 100
+    for i, question in enumerate(questions):
+        body.append(f"<h2>{question}</h2>")
+        body.append(f"<p>{_bluf(r)} {_sentence(r)} {_link(r, host, link_id)}</p>")
+        link_id += 1
+        for _ in range(r.randint(1, 3)):
+            body.append(_paragraph(r, r.randint(2, 6)))
+        if i % 2 == 0:
+            body.append("<ul>" + "".join(f"<li>{_sentence(r, 4, 9)}</li>" for _ in range(r.randint(3, 6))) + "</ul>")
+        if i % 3 == 1:
+            body.append(f"<H3>{_heading(r)}</H3><p><STRONG>{_sentence(r, 3, 6)}</STRONG></p>")
+            body.append("<table>" + "".join(
+                f"<tr><td>{r.choice(WORDS)}</td><td>{r.randint(1, 999)}</td></tr>" for _ in range(5)
+            ) + "</table>")
+        body.append(_image(r, i))
+    body.append("</article></main><footer>" + "".join(_link(r, host, 900 + i) for i in range(12)))
+    body.append("</footer></body></html>")
+    return _head(r, title, json_ld) + "".join(body)
+
+
+def link_heavy(r, links=5000, images=2000, host="example.com"):
+    """A directory-style page with thousands of links and images."""
+    title = _words(r, 4).title() + " Directory"
+    body = [f"<body><h1>{title}</h1>"]
+    for i in range(links):
+        if i % 50 == 0:
+            body.append(f"<h2>{_words(r, 3).title()}</h2><ul>")
+        body.append(f"<li>{_link(r, host, i)}</li>")
+        if i % 50 == 49:
+            body.append("</ul>")
+    body.append("</ul><div class=\"gallery\">")
+    body.extend(_image(r, i) for i in range(images))
+    body.append("</div></body></html>")
+    return _head(r, title) + "".join(body)
+
+
+def deep_nesting(r, depth=3000, host="example.com"):
+    """Markup nested thousands of levels deep, with text at every level."""
+    title = _words(r, 5).title()
+    tags = ("div", "section", "span", "div", "strong")
+    opened = []
+    body = [f"<body><h1>{title}</h1><h2>{r.choice(QUESTION_WORDS)} {_words(r, 4)}?</h2>"]
+    for i in range(depth):
+        tag = tags[i % len(tags)]
+        opened.append(tag)
+        body.append(f"<{tag} class=\"l{i}\">{_words(r, 3)}")
+        if i % 100 == 0:
+            body.append(_link(r, host, i))
+    body.extend(f"</{tag}>" for tag in reversed(opened))
+    body.append("</body></html>")
+    return _head(r, title) + "".join(body)
+
+
+def jsonld_huge(r, target_bytes=5 * MB):
+    """A short page carrying a multi-megabyte inline JSON-LD @graph."""
+    title = _words(r, 5).title()
+    graph = []
+    size = 0
+    i = 0
+    while size < target_bytes:
+        node = {
+            "@type": "Product",
+            "@id": f"https://example.com/p/{i}",
+            "name": _words(r, 4),
+            "description": _sentence(r, 20, 40),
+            "sku": f"SKU-{i:07d}",
+            "offers": {"@type": "Offer", "price": f"{r.randint(1, 999)}.{r.randint(0, 99):02d}",
+                       "priceCurrency": "USD"},
+            "review": [{"@type": "Review", "author": {"@type": "Person", "name": _words(r, 2)},
+                        "reviewBody": _sentence(r)} for _ in range(2)],
+        }
+        if i % 10 == 0:
+            node["sameAs"] = [f"https://example.org/{i}"]
+        graph.append(node)
+        size += len(json.dumps(node))
+        i += 1
+    json_ld = {"@context": "https://schema.org", "@graph": graph}
+    body = f"<body><h1>{title}</h1>{_paragraph(r)}</body></html>"
+    return _head(r, title, json_ld) + body
+
+
+def large_text(r, target_bytes=5 * MB, host="example.com"):
+    """A very long article: many H2 sections of body text."""
+    title = _words(r, 6).title()
+    body = [f"<body><h1>{title}</h1>"]
+    size = 0
+    i = 0
+    while size < target_bytes:
+        section = (f"<h2>{r.choice(QUESTION_WORDS)} {_words(r, 5)}?</h2><p>{_bluf(r)}</p>"
+                   + "".join(_paragraph(r, 6) for _ in range(4))
+                   + f"<p>{_link(r, host, i)} {_image(r, i)}</p>")
+        body.append(section)
+        size += len(section)
+        i += 1
+    body.append("</body></html>")
+    return _head(r, title, _article_ld(r, title)) + "".join(body)
+
+
+def markup_quirks(r, sections=6, host="example.com"):
+    """Sections using markup the parser backends have disagreed on.
+
+    Void elements inside headings and BLUF paragraphs, unclosed <p>, a
+    block nested in <p>, a missing </body> and body-less fragments.
+    """
+    title = _words(r, 4).title()
+    body = []
+    for i in range(sections):
+        question = f"{r.choice(QUESTION_WORDS)} {_words(r, 3)}?"
+        quirk = r.randrange(4)
+        if quirk == 0:
+            words = question.split(" ", 2)
+            body.append(f"<h2>{words[0]} {words[1]} <img src=\"/i/{i}.png\"> {words[2]}</h2>")
+            body.append(f"<p>{_bluf(r)}</p>")
+        elif quirk == 1:
+            body.append(f"<h2>{question}</h2><p>{_sentence(r, 3, 6)}<br>{_sentence(r)}</p>")
+        elif quirk == 2:
+            body.append(f"<h2>{question}</h2><p>{_bluf(r)}<p>{_sentence(r)}")
+        else:
+            body.append(f"<h2>{question}</h2><p>{_words(r, 3)} <div>{_sentence(r)}</div> "
+                        f"{_words(r, 4)}.</p>")
+        if r.random() < 0.3:
+            body.append(f"<p>{_link(r, host, i)} <hr> {_sentence(r)}</p>")
+    if r.random() < 0.3:
+        # A fragment, as pasted or rendered from a component
+        return f"<h1>{title}</h1>" + "".join(body)
+    closing = "</html>" if r.random() < 0.5 else "</body></html>"
+    return _head(r, title) + f"<body><h1>{title}</h1>" + "".join(body) + closing
+
+
+def browser_serialized(r, host="example.com"):
+    """A blog post as a browser serializes its DOM (e.g. Playwright's page.content()).
+
+    Tag names are lowercased, tables get their implied <tbody> and block
+    elements are separated by newlines; void elements keep no slash. Some
+    headings carry an icon and some sentences are split by <br>.
+    """
+    html = blog_post(r, sections=r.randint(3, 8), host=host)
+    html = SENTENCE_GAP_RE.sub(lambda m: ".<br>" if r.random() < 0.2 else m.group(0), html)
+    html = html.replace("<h2>", '<h2><img src="/icons/q.svg" alt="">' if r.random() < 0.5 else "<h2>")
+    html = TAG_NAME_RE.sub(lambda m: m.group(1) + m.group(2).lower(), html)
+    html = html.replace("<table>", "<table><tbody>").replace("</table>", "</tbody></table>")
+    html = BLOCK_END_RE.sub(lambda m: m.group(0) + "\n", html)
+    return html.replace("<head>", "<head>\n").replace("<body>", "\n<body>\n")
+
+
+def malformed(r, sections=8, host="example.com"):
+    """Tag soup: mis-nested, unclosed and stray tags, odd attributes and comments.
+
+    A third of the pages are cut off mid-document, as a truncated download is.
+    """
+    title = _words(r, 4).title()
+    parts = [_head(r, title) if r.random() < 0.7 else f"<title>{title}</title>",
+             f"<BODY><H1 CLASS=hero>{title}</h1>"]
+    for i in range(sections):
+        parts.append(f"<h2>{r.choice(QUESTION_WORDS)} <!-- note --> {_words(r, 3)}?</h2>")
+        style = r.randrange(6)
+        if style == 0:
+            parts.append(f"<p><b><i>{_bluf(r)}</b></i> {_sentence(r)}")
+        elif style == 1:
+            parts.append(f"</div><p>{_bluf(r)}</span> {_sentence(r)}</p></p>")
+        elif style == 2:
+            parts.append("<ul>" + "".join(f"<li>{_sentence(r, 3, 7)}" for _ in range(4)) + "</ul>")
+        elif style == 3:
+            parts.append("<table><tr><td>" + "<td>".join(_words(r, 2) for _ in range(3))
+                         + "<tr><td>" + _words(r, 2) + "</table>")
+        elif style == 4:
+            parts.append(f"<p>{_bluf(r)} <a href=/{r.choice(WORDS)}-{i} title=x>{_words(r, 2)}</a>"
+                         f" <IMG SRC=/i/{i}.png ALT=\"{_words(r, 2)}\"></p>")
+        else:
+            parts.append(f"<div><p>{_sentence(r)}<script>if (a < b) document.write('</div>')"
+                         f"</script> {_words(r, 3)}</div>")
+        if r.random() < 0.3:
+            parts.append(_link(r, host, i))
+    parts.append("</body></html>")
+    html = "".join(parts)
+    if r.random() < 1 / 3:
+        html = html[:r.randint(len(html) // 2, len(html) - 1)]
+    return html
+
+
+# name -> (builder, default page count)
+CASES = {
+    "blog_small": (lambda r: blog_post(r, sections=r.randint(3, 6)), 200),
+    "blog_large": (lambda r: blog_post(r, sections=r.randint(40, 60)), 40),
+    "link_heavy": (link_heavy, 5),
+    "deep_nesting": (deep_nesting, 5),
+    "jsonld_huge": (jsonld_huge, 2),
+    "large_text": (large_text, 2),
+    "markup_quirks": (markup_quirks, 40),
+    "browser_serialized": (browser_serialized, 60),
+    "malformed": (malformed, 60),
+}
+
+
+def generate_page(case, index):
+    """Return the HTML for page `index` of a case."""
+    builder, _ = CASES[case]
+    return builder(random.Random(f"{GENERATOR_VERSION}:{case}:{index}"))
+
+
+def iter_case_pages(case, count=None):
+    """Yield (name, html) for the first `count` pages of a case (default: its full size)."""
+    count = CASES[case][1] if count is None else count
+    for index in range(count):
+        yield f"{case}/{index:04d}", generate_page(case, index)
+
+
+def page_url(name):
+    """The URL used when extracting a synthetic page."""
+    return f"https://example.com/{name}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write synthetic benchmark pages to a directory")
+    parser.add_argument("outdir", help="Directory to write <case>/<index>.html files into")
+    parser.add_argument("--cases", default=None,
+                        help=f"Comma-separated cases (default: all of {', '.join(CASES)})")
+    args = parser.parse_args()
+
+    cases = args.cases.split(",") if args.cases else list(CASES)
+    unknown = [c for c in cases if c not in CASES]
+    if unknown:
+        print(json.dumps({"error": f"Unknown cases: {', '.join(unknown)}"}), file=sys.stderr)
+        sys.exit(1)
+
+    written = 0
+    for case in cases:
+        os.makedirs(os.path.join(args.outdir, case), exist_ok=True)
+        for name, html in iter_case_pages(case):
+            with open(os.path.join(args.outdir, name + ".html"), "w", encoding="utf-8") as f:
+                f.write(html)
+            written += 1
+    print(f"Wrote {written} pages to {args.outdir}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
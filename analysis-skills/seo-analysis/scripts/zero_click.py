@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+"""Diagnose zero-click queries with references/zero-click-strategy.md.
+
+Usage:
+    python3 zero_click.py plan gsc_query_page_*.json --budget 10
+    python3 zero_click.py put serp_response.json --query "what is crm"
+    python3 zero_click.py classify gsc_query_page_*.json --signals signals.ndjson --competitor hubspot.com
+
+A three-step pipeline around serpapi_google_search, which is an MCP tool
+the agent calls itself:
+
+plan      selects zero-click candidates from GSC rows (per query and page,
+          impressions > 200 and clicks = 0), folds them into one lookup
+          per query (case and whitespace insensitive), drops queries
+          already in the SERP cache and lists the rest by impressions,
+          up to --budget lookups; the remainder is reported as deferred
+put       stores a serpapi_google_search response in the SERP cache, under
+          the query, gl and hl of its search_parameters unless given
+classify  classifies every candidate with a cached SERP:
+              Type A  AI Overview or answer box present
+              Type C  answer box owned by a --competitor domain
+              Type D  4+ People Also Ask questions and page position 4+
+              Type B  none of the above (intent mismatch)
+          adding the SERP intent from intent_classifier.py, whether the
+          page URL matches it, and the page's BLUF patterns (bluf_analysis
+          from extract_page_signals.py --signals) against the pattern
+          recommended for the SERP
+
+The SERP cache holds one JSON response per (query, gl, hl, date) under
+<cache-dir>/<date>/<sha256>.json, so repeated analyses do not spend the
+budget twice; --max-age-days also accepts responses from earlier days.
+A date directory is itself valid intent_classifier.py input.
+
+GSC input is query_analytics output for ["query", "page"] as read by
+ctr_opportunities.py (JSON responses with "rows", or NDJSON rows); rows
+with extra dimensions are summed per (query, page).
+
+Output: JSON to stdout (plan: lookups with their cache files; classify:
+summary by type and the top diagnoses); classify --queries-output writes
+every diagnosis as NDJSON.
+Dependencies: Python 3 stdlib only (no pip install required).
+"""
+
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cannibalization import page_key  # noqa: E402
+from ctr_opportunities import DEFAULT_DIMENSIONS, iter_gsc_rows, iter_json_records  # noqa: E402
+from intent_classifier import (  # noqa: E402
+    INFORMATIONAL_URL_RE, PAA_DOMINANT_COUNT, TRANSACTIONAL_URL_RE, classify_response,
+    response_field, response_query,
+)
+
+DEFAULT_SERP_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "seo-analysis", "serp",
+)
+DEFAULT_GL = "us"
+DEFAULT_HL = "en"
+# Reference call budget: top 10 zero-click queries by impressions
+DEFAULT_BUDGET = 10
+MIN_IMPRESSIONS = 200
+# PAA absorption needs the page below the PAA box
+PAA_MIN_POSITION = 4
+
+ROOT_CAUSES = {
+    "A": "AI Overview / Answer Box Absorption",
+    "B": "Intent Mismatch",
+    "C": "Brand Answer Box Owned",
+    "D": "PAA Absorption",
+}
+
+
+def normalize_query(query):
+    """Return the query form used to deduplicate lookups and key the cache."""
+    return " ".join(query.lower().split())
+
+
+class SerpCache:
+    """On-disk cache of SerpAPI responses keyed by (query, gl, hl, date).
+
+    Entries are JSON files under ``<directory>/<date>/<k>.json``, where k is
+    the SHA-256 of the normalized query, gl and hl.
+    """
+
+    def __init__(self, directory=DEFAULT_SERP_CACHE_DIR):
+        self.directory = directory
+
+    @staticmethod
+    def key(query, gl, hl):
+        return hashlib.sha256(f"{normalize_query(query)}\0{gl}\0{hl}".encode("utf-8")).hexdigest()
+
+    def path(self, query, gl, hl, date):
+        return os.path.join(self.directory, date, self.key(query, gl, hl) + ".json")
+
+    def find(self, query, gl, hl, date, max_age_days=0):
+        """Return (path, date) of the newest entry within max_age_days of date, or None."""
+        day = datetime.date.fromisoformat(date)
+        for age in range(max_age_days + 1):
+            entry_date = (day - datetime.timedelta(days=age)).isoformat()
+            path = self.path(query, gl, hl, entry_date)
+            if os.path.exists(path):
+                return path, entry_date
+        return None
+
+    def get(self, query, gl, hl, date, max_age_days=0):
+        """Return the newest cached response within max_age_days of date, or None."""
+        found = self.find(query, gl, hl, date, max_age_days)
+        if found is None:
+            return None
+        try:
+            with open(found[0], "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, response, date, query=None, gl=None, hl=None):
+        """Store a response; return (query, gl, hl, path).
+
+        query, gl and hl default to the response's own search parameters,
+        then to us/en; the values used are recorded in search_parameters.
+        """
+        searched, searched_gl, searched_hl = response_query(response)
+        query = query or searched
+        if not query:
+            raise ValueError("no query given and no search_parameters.q in the response")
+        gl = gl or searched_gl or DEFAULT_GL
+        hl = hl or searched_hl or DEFAULT_HL
+        params = response.setdefault("search_parameters", {})
+        params.setdefault("q", query)
+        params.setdefault("gl", gl)
+        params.setdefault("hl", hl)
+        path = self.path(query, gl, hl, date)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(response, f, ensure_ascii=False)
+        os.replace(tmp, path)
+        return query, gl, hl, path
+
+
+def select_candidates(rows, dimensions=DEFAULT_DIMENSIONS, min_impressions=MIN_IMPRESSIONS):
+    """Return zero-click candidates, one per normalized query, by impressions descending.
+
+    Each candidate is {"query", "impressions", "pages": [{page, impressions,
+    position}]} over its (query, page) pairs with impressions >
+    min_impressions and no clicks, pages by impressions descending.
+    """
+    query_index = dimensions.index("query") if "query" in dimensions else None
+    page_index = dimensions.index("page") if "page" in dimensions else None
+    pairs = {}
+    for row in rows:
+        keys = row.get("keys")
+        if keys:
+            query = keys[query_index] if query_index is not None else ""
+            page = keys[page_index] if page_index is not None else ""
+        else:
+            query, page = row.get("query", ""), row.get("page", "")
+        impressions = row.get("impressions") or 0
+        totals = pairs.get((query, page))
+        if totals is None:
+            totals = pairs[(query, page)] = [0, 0, 0.0]
+        totals[0] += row.get("clicks") or 0
+        totals[1] += impressions
+        totals[2] += (row.get("position") or 0) * impressions
+
+    candidates = {}
+    for (query, page), (clicks, impressions, weighted) in pairs.items():
+        if clicks or impressions <= min_impressions:
+            continue
+        candidate = candidates.get(normalize_query(query))
+        if candidate is None:
+            candidate = candidates[normalize_query(query)] = {
+                "query": query, "impressions": 0, "pages": []}
+        candidate["impressions"] += impressions
+        candidate["pages"].append({"page": page, "impressions": impressions,
+                                   "position": round(weighted / impressions, 1)})
+    for candidate in candidates.values():
+        candidate["pages"].sort(key=lambda p: (-p["impressions"], p["page"]))
+    return sorted(candidates.values(), key=lambda c: (-c["impressions"], c["query"]))
+
+
+def plan_lookups(candidates, cache, gl, hl, date, budget=DEFAULT_BUDGET, max_age_days=0):
+    """Split candidates into cached, lookups (within budget) and deferred; return a report."""
+    cached, lookups, deferred = [], [], []
+    for candidate in candidates:
+        found = cache.find(candidate["query"], gl, hl, date, max_age_days)
+        entry = {"query": candidate["query"], "impressions": candidate["impressions"],
+                 "pages": len(candidate["pages"])}
+        if found is not None:
+            entry["cached_date"] = found[1]
+            cached.append(entry)
+        elif len(lookups) < budget:
+            entry["cache_file"] = cache.path(candidate["query"], gl, hl, date)
+            lookups.append(entry)
+        else:
+            deferred.append(entry)
+    return {
+        "date": date,
+        "gl": gl,
+        "hl": hl,
+        "summary": {
+            "candidate_queries": len(candidates),
+            "cached": len(cached),
+            "lookups": len(lookups),
+            "deferred": len(deferred),
+        },
+        "lookups": lookups,
+        "cached": cached,
+        "deferred": [entry["query"] for entry in deferred],
+    }
+
+
+def load_bluf_patterns(paths):
+    """Return {page key: [bluf_pattern_type per H2 section]} from extract_page_signals records."""
+    patterns = {}
+    for record in iter_json_records(paths):
+        url = record.get("url")
+        if url and not record.get("error"):
+            patterns[page_key(url)] = [section.get("bluf_pattern_type")
+                                       for section in record.get("bluf_analysis") or ()]
+    return patterns
+
+
+def _domain(url):
+    host = urlparse(url or "").hostname or ""
+    return host[4:] if host.startswith("www.") else host
+
+
+def _page_kind(url):
+    path = urlparse(url).path or "/"
+    # Content sections win: /blog/price is an article about pricing
+    if INFORMATIONAL_URL_RE.search(url):
+        return "informational"
+    if TRANSACTIONAL_URL_RE.search(path):
+        return "transactional"
+    return None
+
+
+def diagnose(candidate, response, bluf_patterns=None, competitors=(), brand_terms=()):
+    """Return the zero-click diagnosis of a candidate from its SerpAPI response."""
+    intent = classify_response(response, brand_terms)
+    page = candidate["pages"][0]
+    answer_box = response_field(response, "answer_box", "answerBox")
+    if isinstance(answer_box, list):
+        answer_box = answer_box[0] if answer_box else None
+    ai_overview = bool(response_field(response, "ai_overview", "aiOverview"))
+    answer_box_domain = (_domain(answer_box.get("link") or answer_box.get("url"))
+                         if answer_box else None)
+    paa_count = len(response_field(response, "related_questions", "people_also_ask",
+                           "peopleAlsoAsk") or ())
+
+    if answer_box and answer_box_domain and any(
+            answer_box_domain == c or answer_box_domain.endswith("." + c) for c in competitors):
+        cause = "C"
+    elif ai_overview or answer_box:
+        cause = "A"
+    elif paa_count >= PAA_DOMINANT_COUNT and page["position"] >= PAA_MIN_POSITION:
+        cause = "D"
+    else:
+        cause = "B"
+
+    page_kind = _page_kind(page["page"])
+    intent_mismatch = None
+    if page_kind and intent["primary_intent"] in ("informational", "transactional"):
+        intent_mismatch = page_kind != intent["primary_intent"]
+    sections = None
+    if bluf_patterns is not None:
+        sections = bluf_patterns.get(page_key(page["page"]))
+    page_patterns = sorted({p for p in sections or () if p and p != "none"})
+    return {
+        "query": candidate["query"],
+        "type": cause,
+        "root_cause": ROOT_CAUSES[cause],
+        "impressions": candidate["impressions"],
+        "page": page["page"],
+        "position": page["position"],
+        "other_pages": [p["page"] for p in candidate["pages"][1:]],
+        "serp": {
+            "features": intent["features"],
+            "ai_overview": ai_overview,
+            "answer_box_domain": answer_box_domain,
+            "paa_count": paa_count,
+        },
+        "intent": {
+            "primary": intent["primary_intent"],
+            "secondary": intent["secondary_intent"],
+            "confidence": intent["confidence"],
+        },
+        "page_kind": page_kind,
+        "intent_mismatch": intent_mismatch,
+        "recommended_bluf_pattern": intent["bluf_pattern"],
+        "page_bluf_patterns": page_patterns if sections is not None else None,
+        "bluf_match": (intent["bluf_pattern"] in page_patterns
+                       if sections is not None and intent["bluf_pattern"] else None),
+    }
+
+
+def classify_candidates(candidates, cache, gl, hl, date, max_age_days=0, bluf_patterns=None,
+                        competitors=(), brand_terms=(), top=20):
+    """Diagnose candidates with cached SERPs; return (report dict, list of diagnoses)."""
+    competitors = tuple(_domain(c if "//" in c else "//" + c) or c for c in competitors)
+    brand_terms = tuple(term.lower() for term in brand_terms)
+    diagnoses, missing = [], []
+    for candidate in candidates:
+        response = cache.get(candidate["query"], gl, hl, date, max_age_days)
+        if response is None:
+            missing.append(candidate["query"])
+            continue
+        diagnoses.append(diagnose(candidate, response, bluf_patterns, competitors, brand_terms))
+    by_type = {cause: 0 for cause in ROOT_CAUSES}
+    impressions = {cause: 0 for cause in ROOT_CAUSES}
+    for record in diagnoses:
+        by_type[record["type"]] += 1
+        impressions[record["type"]] += record["impressions"]
+    report = {
+        "summary": {
+            "candidate_queries": len(candidates),
+            "classified": len(diagnoses),
+            "without_serp": len(missing),
+            "by_type": by_type,
+            "impressions_by_type": impressions,
+            "intent_mismatches": sum(1 for r in diagnoses if r["intent_mismatch"]),
+            "bluf_mismatches": sum(1 for r in diagnoses if r["bluf_match"] is False),
+        },
+        "diagnoses": diagnoses[:top],
+        "without_serp": missing[:top],
+    }
+    return report, diagnoses
+
+
+def _read_response(path):
+    if path == "-":
+        return json.load(sys.stdin)
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _add_serp_options(parser, from_response=False):
+    parser.add_argument("--cache-dir", default=DEFAULT_SERP_CACHE_DIR,
+                        help="SERP response cache directory (default: %(default)s)")
+    if from_response:
+        # Stored responses are keyed by the gl/hl they were searched with
+        parser.add_argument("--gl", default=None,
+                            help=f"SerpAPI country (default: the response's "
+                                 f"search_parameters.gl, else {DEFAULT_GL})")
+        parser.add_argument("--hl", default=None,
+                            help=f"SerpAPI language (default: the response's "
+                                 f"search_parameters.hl, else {DEFAULT_HL})")
+    else:
+        parser.add_argument("--gl", default=DEFAULT_GL,
+                            help="SerpAPI country (default: %(default)s)")
+        parser.add_argument("--hl", default=DEFAULT_HL,
+                            help="SerpAPI language (default: %(default)s)")
+    parser.add_argument("--date", default=None,
+                        help="SERP date, YYYY-MM-DD (default: today)")
+
+
+def _add_gsc_options(parser):
+    parser.add_argument("inputs", nargs="+", help="GSC JSON responses or NDJSON rows ('-' for stdin)")
+    parser.add_argument("--dimensions", default=",".join(DEFAULT_DIMENSIONS),
+                        help="Names of the row 'keys', in request order (default: %(default)s)")
+    parser.add_argument("--min-impressions", type=float, default=MIN_IMPRESSIONS,
+                        help="Candidates need more impressions than this (default: %(default)s)")
+    parser.add_argument("--max-age-days", type=int, default=0,
+                        help="Also use cached SERPs up to this many days old (default: %(default)s)")
+    _add_serp_options(parser)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Diagnose zero-click queries from GSC and SerpAPI")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    plan = commands.add_parser("plan", help="Select candidates and the SERP lookups to run")
+    _add_gsc_options(plan)
+    plan.add_argument("--budget", type=int, default=DEFAULT_BUDGET,
+                      help="SerpAPI lookups to plan (default: %(default)s)")
+
+    put = commands.add_parser("put", help="Store a serpapi_google_search response in the cache")
+    put.add_argument("response", help="SerpAPI response JSON file ('-' for stdin)")
+    put.add_argument("--query", default=None,
+                     help="Query searched (default: the response's search_parameters.q)")
+    _add_serp_options(put, from_response=True)
+
+    classify = commands.add_parser("classify", help="Classify candidates with cached SERPs")
+    _add_gsc_options(classify)
+    classify.add_argument("--signals", nargs="*", default=None,
+                          help="extract_page_signals.py NDJSON with bluf_analysis for the pages")
+    classify.add_argument("--competitor", action="append", default=[],
+                          help="Competitor domain: its answer boxes are Type C (repeatable)")
+    classify.add_argument("--brand", action="append", default=[],
+                          help="Brand term for intent classification (repeatable)")
+    classify.add_argument("--top", type=int, default=20,
+                          help="Diagnoses listed in the report (default: %(default)s)")
+    classify.add_argument("--queries-output", default=None,
+                          help="Write every diagnosis to this NDJSON file")
+
+    for sub in (plan, put, classify):
+        sub.add_argument("--compact", action="store_true", help="Output minified JSON")
+    args = parser.parse_args()
+
+    date = args.date or datetime.date.today().isoformat()
+    cache = SerpCache(args.cache_dir)
+    try:
+        datetime.date.fromisoformat(date)
+        if args.command == "put":
+            query, gl, hl, path = cache.put(_read_response(args.response), date, args.query,
+                                            args.gl, args.hl)
+            result = {"query": query, "gl": gl, "hl": hl, "cache_file": path}
+        else:
+            dimensions = tuple(d.strip() for d in args.dimensions.split(",") if d.strip())
+            candidates = select_candidates(iter_gsc_rows(args.inputs), dimensions,
+                                           args.min_impressions)
+            if args.command == "plan":
+                result = plan_lookups(candidates, cache, args.gl, args.hl, date, args.budget,
+                                      args.max_age_days)
+            else:
+                bluf_patterns = load_bluf_patterns(args.signals) if args.signals else None
+                result, diagnoses = classify_candidates(
+                    candidates, cache, args.gl, args.hl, date, args.max_age_days, bluf_patterns,
+                    args.competitor, args.brand, args.top)
+                if args.queries_output:
+                    with open(args.queries_output, "w", encoding="utf-8") as f:
+                        for record in diagnoses:
+                            f.write(json.dumps(record, ensure_ascii=False))
+                            f.write("\n")
+    except FileNotFoundError as e:
+        print(json.dumps({"error": f"File not found: {e.filename}"}), file=sys.stderr)
+        sys.exit(1)
+    except json.JSONDecodeError as e:
+        print(json.dumps({"error": f"Invalid JSON input: {e}"}), file=sys.stderr)
+        sys.exit(1)
+    except (ValueError, AttributeError, TypeError, IndexError) as e:
+        print(json.dumps({"error": f"Invalid input: {e}"}), file=sys.stderr)
+        sys.exit(1)
+    except OSError as e:
+        print(json.dumps({"error": f"Cache error: {e}"}), file=sys.stderr)
+        sys.exit(1)
+
+    print(json.dumps(result, indent=None if args.compact else 2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -234,6 +234,33 @@ class TreasureDataTagAPI:
             logger.error(f"Error applying tag: {e}")
             return TagResponse(success=False, message=str(e))
 
+    def list_tables(self, database: str) -> List[Dict]:
+        """
+        List tables with lightweight metadata
+
+        One request returns every table's name, updated_at and row count,
+        which makes it cheap enough to poll for schema changes.
+
+        Args:
+            database: Database name
+
+        Returns:
+            List of table metadata dicts (empty on failure)
+        """
+        try:
+            path = f"/v3/table/list/{database}"
+            status, response = self._request('GET', path)
+
+            if status == 200:
+                return response.get('tables', [])
+            else:
+                logger.error(f"Failed to list tables: {response}")
+                return []
+
+        except Exception as e:
+            logger.error(f"Error listing tables: {e}")
+            return []
+
     def get_column_tags(self, database: str, table: str, column: str) -> List[str]:
         """
         Get tags applied to a column
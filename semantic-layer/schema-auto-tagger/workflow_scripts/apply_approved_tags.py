@@ -2,6 +2,12 @@
 """
 Apply Approved Tags Script for Workflow
 Uses TD API to apply approved tags to columns
+
+Every tag result is appended to a progress journal (NDJSON) as soon as it
+completes. APPLY_MODE controls how an existing journal is used:
+  full            - start over, truncating the journal (default)
+  resume          - skip tags already journaled as applied
+  retry-failures  - only re-send tags whose last journaled result failed
 """
 
 import os
@@ -9,16 +15,20 @@ import sys
 import json
 import logging
 from datetime import datetime
+from typing import Dict, Optional, TextIO, Tuple
 
 # Add path to import TD API module from parent directory
 scripts_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, scripts_dir)
 
 from schema_tagger_td_api import TreasureDataTagAPI
+from run_tracing import Tracer, file_size, get_tracer
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+APPLY_MODES = ('full', 'resume', 'retry-failures')
+
 
 def load_approved_tags(tags_file: str) -> dict:
     """Load approved tags"""
@@ -26,8 +36,85 @@ def load_approved_tags(tags_file: str) -> dict:
         return json.load(f)
 
 
+def load_journal(journal_file: str, database: str) -> Dict[Tuple[str, str, str], dict]:
+    """
+    Load the latest journaled result for each (table, column, tag)
+
+    A truncated final line (process killed mid-write) is ignored.
+
+    Args:
+        journal_file: Path to progress journal
+        database: Only entries for this database are returned
+
+    Returns:
+        Dict of {(table, column, tag): journal entry}
+    """
+    state = {}
+    if not os.path.exists(journal_file):
+        return state
+
+    with open(journal_file, 'r') as f:
+        for line_num, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"Ignoring unreadable journal line {line_num} in {journal_file}")
+                continue
+            if entry.get('database') != database:
+                continue
+            state[(entry['table'], entry['column'], entry['tag'])] = entry
+
+    return state
+
+
+def open_journal(journal_file: str, mode: str) -> TextIO:
+    """
+    Open the progress journal for this run
+
+    Full runs truncate the journal. Resume runs append to it, first
+    terminating a partial last line left by a killed process so the next
+    entry is not glued onto it.
+    """
+    if mode == 'full':
+        return open(journal_file, 'w')
+
+    if os.path.exists(journal_file) and os.path.getsize(journal_file) > 0:
+        with open(journal_file, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) != b'\n'
+        if needs_newline:
+            with open(journal_file, 'a') as f:
+                f.write('\n')
+
+    return open(journal_file, 'a')
+
+
+def journal_result(journal: Optional[TextIO], database: str, table: str,
+                   column: str, tag: str, status: str, error: str = None):
+    """Append one tag result to the progress journal and flush it"""
+    if journal is None:
+        return
+    entry = {
+        'database': database,
+        'table': table,
+        'column': column,
+        'tag': tag,
+        'status': status,
+        'timestamp': datetime.now().isoformat()
+    }
+    if error is not None:
+        entry['error'] = error
+    journal.write(json.dumps(entry) + '\n')
+    journal.flush()
+
+
 def apply_tags(api_client: TreasureDataTagAPI, database: str,
-              tag_assignments: dict) -> dict:
+              tag_assignments: dict, journal: Optional[TextIO] = None,
+              journal_state: Optional[dict] = None, mode: str = 'full',
+              tracer: Optional[Tracer] = None) -> dict:
     """
     Apply approved tags to columns
 
@@ -35,17 +122,30 @@ def apply_tags(api_client: TreasureDataTagAPI, database: str,
         api_client: TD API client
         database: Database name
         tag_assignments: Dict of {table: {column: [tags]}}
+        journal: Open progress journal to append results to
+        journal_state: Results from a previous attempt (see load_journal)
+        mode: One of APPLY_MODES
+        tracer: Optional tracer for per-tag spans
 
     Returns:
-        Log of applied tags
+        Log of applied tags. Tags skipped because a previous attempt
+        already applied them are reported as applied and counted in
+        summary['skipped'].
     """
+    if mode not in APPLY_MODES:
+        raise ValueError(f"Unsupported apply mode: {mode}")
+    journal_state = journal_state or {}
+    tracer = tracer or Tracer('apply')
+
     log = {
         'database': database,
         'timestamp': datetime.now().isoformat(),
+        'mode': mode,
         'summary': {
             'total_tags': 0,
             'applied': 0,
-            'failed': 0
+            'failed': 0,
+            'skipped': 0
         },
         'details': {}
     }
@@ -61,8 +161,25 @@ def apply_tags(api_client: TreasureDataTagAPI, database: str,
             col_log = {'applied': [], 'failed': []}
 
             for tag in tags:
+                previous = journal_state.get((table_name, col_name, tag), {}).get('status')
+
+                if mode != 'full' and previous == 'applied':
+                    col_log['applied'].append(tag)
+                    table_log['applied'] += 1
+                    log['summary']['total_tags'] += 1
+                    log['summary']['applied'] += 1
+                    log['summary']['skipped'] += 1
+                    continue
+
+                if mode == 'retry-failures' and previous != 'failed':
+                    # Never attempted: leave it for a resume run
+                    log['summary']['skipped'] += 1
+                    continue
+
                 try:
-                    response = api_client.apply_tag_to_column(database, table_name, col_name, tag)
+                    with tracer.span('apply.tag', table=table_name) as span:
+                        response = api_client.apply_tag_to_column(database, table_name, col_name, tag)
+                        span.set(applied=int(response.success), failed=int(not response.success))
 
                     log['summary']['total_tags'] += 1
 
@@ -70,17 +187,21 @@ def apply_tags(api_client: TreasureDataTagAPI, database: str,
                         col_log['applied'].append(tag)
                         table_log['applied'] += 1
                         log['summary']['applied'] += 1
+                        journal_result(journal, database, table_name, col_name, tag, 'applied')
                         logger.info(f"✓ Applied {tag} to {table_name}.{col_name}")
                     else:
                         col_log['failed'].append({'tag': tag, 'error': response.message})
                         table_log['failed'] += 1
                         log['summary']['failed'] += 1
+                        journal_result(journal, database, table_name, col_name, tag,
+                                       'failed', response.message)
                         logger.error(f"✗ Failed to apply {tag} to {table_name}.{col_name}: {response.message}")
 
                 except Exception as e:
                     col_log['failed'].append({'tag': tag, 'error': str(e)})
                     table_log['failed'] += 1
                     log['summary']['failed'] += 1
+                    journal_result(journal, database, table_name, col_name, tag, 'failed', str(e))
                     logger.error(f"✗ Exception applying {tag} to {table_name}.{col_name}: {e}")
 
             if col_log['applied'] or col_log['failed']:
@@ -109,6 +230,8 @@ def generate_summary_report(log: dict) -> str:
     summary.append(f"  Total Tags Applied: {s['total_tags']}")
     summary.append(f"  Successful: {s['applied']} ({success_rate:.1f}%)")
     summary.append(f"  Failed: {s['failed']}")
+    if s.get('skipped'):
+        summary.append(f"  Skipped (journaled): {s['skipped']}")
     summary.append("")
 
     if s['failed'] > 0:
@@ -131,8 +254,16 @@ def main():
     tags_file = os.environ.get('APPROVED_TAGS', '/tmp/approved_tags.json')
     database = os.environ.get('DATABASE', 'analytics')
     log_file = os.environ.get('LOG_FILE', '/tmp/apply_tags_log.json')
+    journal_file = os.environ.get('PROGRESS_JOURNAL', f'{log_file}.journal.ndjson')
+    mode = os.environ.get('APPLY_MODE', 'full').lower()
     api_key = os.environ.get('TD_API_KEY')
 
+    if mode not in APPLY_MODES:
+        logger.error(f"Invalid APPLY_MODE '{mode}', expected one of {', '.join(APPLY_MODES)}")
+        sys.exit(1)
+
+    tracer = get_tracer('apply')
+
     # Initialize API client
     try:
         api_client = TreasureDataTagAPI(api_key=api_key)
@@ -147,7 +278,16 @@ def main():
     # Apply tags
     logger.info(f"Applying {approved['approval_summary']['approved']} approved tags")
     tag_assignments = approved.get('tables', {})
-    log = apply_tags(api_client, database, tag_assignments)
+
+    journal_state = {}
+    if mode != 'full':
+        journal_state = load_journal(journal_file, database)
+        logger.info(f"Loaded {len(journal_state)} journaled results from {journal_file} ({mode})")
+
+    with open_journal(journal_file, mode) as journal:
+        log = apply_tags(api_client, database, tag_assignments,
+                         journal=journal, journal_state=journal_state, mode=mode,
+                         tracer=tracer)
 
     # Generate report
     report = generate_summary_report(log)
@@ -159,6 +299,12 @@ def main():
 
     logger.info(f"Execution log saved to {log_file}")
 
+    s = log['summary']
+    tracer.finish(status='ok' if s['failed'] == 0 else 'error',
+                  items=s['total_tags'], applied=s['applied'],
+                  failed=s['failed'], skipped=s['skipped'],
+                  input_bytes=file_size(tags_file), output_bytes=file_size(log_file))
+
     # Exit with error if any tags failed
     if log['summary']['failed'] > 0:
         logger.warning(f"{log['summary']['failed']} tag applications failed")
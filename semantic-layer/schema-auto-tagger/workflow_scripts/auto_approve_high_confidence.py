@@ -2,17 +2,39 @@
 """
 Auto-Approve High Confidence Suggestions
 Filters suggestions by confidence level for automatic approval
+
+Set STREAMING=true to filter in constant memory: suggestions are read one
+table at a time (NDJSON or incremental JSON) and approved tables are written
+to the output as they are produced.
 """
 
 import os
 import json
 import logging
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple
+
+from run_tracing import file_size, get_tracer
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+CONFIDENCE_ORDER = {'HIGH': 3, 'MEDIUM': 2, 'LOW': 1}
+
+VALID_TAG_PREFIXES = (
+    'data_classification:',
+    'business_domain:',
+    'technical:',
+    'compliance:',
+    'governance:'
+)
+
+# Streaming reads grow the buffer from this size when a value spans chunks
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Only the first few validation errors are kept in memory when streaming
+MAX_REPORTED_ERRORS = 100
+
 
 def load_suggestions(suggestions_file: str) -> dict:
     """Load suggestions from file"""
@@ -33,8 +55,7 @@ def filter_by_confidence(suggestions: dict, min_confidence: str = "HIGH",
     Returns:
         Dict with filtered/approved suggestions
     """
-    confidence_order = {'HIGH': 3, 'MEDIUM': 2, 'LOW': 1}
-    min_level = confidence_order.get(min_confidence, 2)
+    min_level = CONFIDENCE_ORDER.get(min_confidence, 2)
 
     approved = {
         'database': suggestions.get('database'),
@@ -52,36 +73,60 @@ def filter_by_confidence(suggestions: dict, min_confidence: str = "HIGH",
     }
 
     for table_name, columns in suggestions.get('tables', {}).items():
-        approved_columns = {}
+        approved_columns = filter_table(table_name, columns, min_level,
+                                        approved['approval_summary'])
+        if approved_columns:
+            approved['tables'][table_name] = approved_columns
 
-        for col_name, col_suggestions in columns.items():
-            # Filter by confidence
-            approved_tags = []
+    log_approval_summary(approved['approval_summary'])
 
-            for sugg in col_suggestions:
-                sugg_level = confidence_order.get(sugg.get('confidence', 'LOW'), 1)
+    return approved
 
-                if sugg_level >= min_level:
-                    approved_tags.append(sugg.get('tag'))
-                    logger.debug(f"Approved: {table_name}.{col_name} = {sugg.get('tag')}")
 
-            if approved_tags:
-                approved_columns[col_name] = approved_tags
-                approved['approval_summary']['approved'] += len(approved_tags)
-            else:
-                approved['approval_summary']['rejected'] += len(col_suggestions)
+def filter_table(table_name: str, columns: dict, min_level: int,
+                 summary: dict) -> Dict[str, List[str]]:
+    """
+    Filter one table's column suggestions by confidence level
 
-            approved['approval_summary']['total_suggestions'] += len(col_suggestions)
+    Args:
+        table_name: Table name
+        columns: Dict of {column: [suggestions]}
+        min_level: Minimum confidence level (see CONFIDENCE_ORDER)
+        summary: Approval summary counters, updated in place
 
-        if approved_columns:
-            approved['tables'][table_name] = approved_columns
+    Returns:
+        Dict of {column: [approved tags]}
+    """
+    approved_columns = {}
 
-    logger.info(f"Approval Summary:\n"
-                f"  Total suggestions: {approved['approval_summary']['total_suggestions']}\n"
-                f"  Approved: {approved['approval_summary']['approved']}\n"
-                f"  Rejected: {approved['approval_summary']['rejected']}")
+    for col_name, col_suggestions in columns.items():
+        # Filter by confidence
+        approved_tags = []
 
-    return approved
+        for sugg in col_suggestions:
+            sugg_level = CONFIDENCE_ORDER.get(sugg.get('confidence', 'LOW'), 1)
+
+            if sugg_level >= min_level:
+                approved_tags.append(sugg.get('tag'))
+                logger.debug(f"Approved: {table_name}.{col_name} = {sugg.get('tag')}")
+
+        if approved_tags:
+            approved_columns[col_name] = approved_tags
+            summary['approved'] += len(approved_tags)
+        else:
+            summary['rejected'] += len(col_suggestions)
+
+        summary['total_suggestions'] += len(col_suggestions)
+
+    return approved_columns
+
+
+def log_approval_summary(summary: dict):
+    """Log approval counters"""
+    logger.info(f"Approval Summary:\n"
+                f"  Total suggestions: {summary['total_suggestions']}\n"
+                f"  Approved: {summary['approved']}\n"
+                f"  Rejected: {summary['rejected']}")
 
 
 def validate_approved_tags(approved: dict) -> Tuple[bool, List[str]]:
@@ -95,37 +140,244 @@ def validate_approved_tags(approved: dict) -> Tuple[bool, List[str]]:
         Tuple of (valid, errors)
     """
     errors = []
-    valid_patterns = [
-        'data_classification:',
-        'business_domain:',
-        'technical:',
-        'compliance:',
-        'governance:'
-    ]
 
     for table_name, columns in approved.get('tables', {}).items():
-        for col_name, tags in columns.items():
-            for tag in tags:
-                if not any(tag.startswith(pattern) for pattern in valid_patterns):
-                    errors.append(f"Invalid tag format in {table_name}.{col_name}: {tag}")
+        errors.extend(validate_table_tags(table_name, columns))
 
     return len(errors) == 0, errors
 
 
+def validate_table_tags(table_name: str, columns: Dict[str, List[str]]) -> List[str]:
+    """Return naming-convention errors for one table's approved tags"""
+    errors = []
+    for col_name, tags in columns.items():
+        for tag in tags:
+            if not tag or not tag.startswith(VALID_TAG_PREFIXES):
+                errors.append(f"Invalid tag format in {table_name}.{col_name}: {tag}")
+    return errors
+
+
+def _read_json_value(f: TextIO, buf: str, pos: int,
+                     decoder: json.JSONDecoder) -> Tuple[object, str, int]:
+    """
+    Decode the next JSON value at buf[pos:], reading more of f as needed
+
+    The consumed prefix of the buffer is dropped so memory stays bounded by
+    the largest single value (one table's suggestions).
+
+    Returns:
+        Tuple of (value, buffer, position after value)
+    """
+    chunk_size = STREAM_CHUNK_SIZE
+    while True:
+        buf, pos = _skip_whitespace(f, buf, pos)
+        try:
+            value, end = decoder.raw_decode(buf, pos)
+            # A number at the very end of the buffer may be truncated
+            if end < len(buf) or not isinstance(value, (int, float)):
+                return value, buf, end
+        except json.JSONDecodeError:
+            pass
+        more = f.read(chunk_size)
+        if not more:
+            value, end = decoder.raw_decode(buf, pos)
+            return value, buf, end
+        buf = buf[pos:] + more
+        pos = 0
+        # Grow reads so a huge table is not re-decoded once per 64KB
+        chunk_size *= 2
+
+
+def _skip_whitespace(f: TextIO, buf: str, pos: int) -> Tuple[str, int]:
+    """Advance past whitespace, refilling the buffer from f"""
+    while True:
+        while pos < len(buf) and buf[pos] in ' \t\r\n':
+            pos += 1
+        if pos < len(buf):
+            return buf, pos
+        more = f.read(STREAM_CHUNK_SIZE)
+        if not more:
+            return '', 0
+        buf, pos = more, 0
+
+
+def _expect(f: TextIO, buf: str, pos: int, chars: str) -> Tuple[str, str, int]:
+    """Consume one structural character out of chars"""
+    buf, pos = _skip_whitespace(f, buf, pos)
+    if pos >= len(buf) or buf[pos] not in chars:
+        found = buf[pos:pos + 20] if pos < len(buf) else 'end of file'
+        raise ValueError(f"Malformed suggestions JSON: expected one of {chars!r}, found {found!r}")
+    return buf[pos], buf, pos + 1
+
+
+def iter_table_suggestions(suggestions_file: str,
+                           header: Optional[dict] = None) -> Iterator[Tuple[str, dict]]:
+    """
+    Yield (table_name, columns) pairs without loading the whole file
+
+    Accepts either NDJSON (*.ndjson / *.jsonl, one {"table": ..., "columns": ...}
+    record per line) or the regular suggestions document written by
+    generate_suggestions.py, which is scanned incrementally.
+
+    Args:
+        suggestions_file: Path to suggestions file
+        header: Optional dict that receives top-level scalar fields
+                (database, timestamp, ...) as they are encountered
+    """
+    if header is None:
+        header = {}
+
+    with open(suggestions_file, 'r') as f:
+        if suggestions_file.endswith(('.ndjson', '.jsonl')):
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                if 'table' in record:
+                    yield record['table'], record.get('columns', {})
+                else:
+                    header.update(record)
+            return
+
+        decoder = json.JSONDecoder()
+        _, buf, pos = _expect(f, '', 0, '{')
+        buf, pos = _skip_whitespace(f, buf, pos)
+        if buf[pos:pos + 1] == '}':
+            return
+
+        while True:
+            key, buf, pos = _read_json_value(f, buf, pos, decoder)
+            _, buf, pos = _expect(f, buf, pos, ':')
+
+            if key == 'tables':
+                _, buf, pos = _expect(f, buf, pos, '{')
+                buf, pos = _skip_whitespace(f, buf, pos)
+                if buf[pos:pos + 1] == '}':
+                    pos += 1
+                else:
+                    while True:
+                        table_name, buf, pos = _read_json_value(f, buf, pos, decoder)
+                        _, buf, pos = _expect(f, buf, pos, ':')
+                        columns, buf, pos = _read_json_value(f, buf, pos, decoder)
+                        yield table_name, columns
+                        sep, buf, pos = _expect(f, buf, pos, ',}')
+                        if sep == '}':
+                            break
+            else:
+                header[key], buf, pos = _read_json_value(f, buf, pos, decoder)
+
+            sep, buf, pos = _expect(f, buf, pos, ',}')
+            if sep == '}':
+                return
+
+
+def stream_filter_by_confidence(suggestions_file: str, output_file: str,
+                                min_confidence: str = "HIGH",
+                                high_conf_threshold: float = 0.8) -> dict:
+    """
+    Filter and validate suggestions in a single pass with constant memory
+
+    Approved tables are written to output_file as soon as they are filtered.
+    The output has the same shape as filter_by_confidence() so
+    apply_approved_tags.py can read it unchanged; the header fields are
+    written after the tables because they are only known at the end.
+
+    Args:
+        suggestions_file: Suggestions file (JSON document or NDJSON)
+        output_file: Approved tags output file
+        min_confidence: Minimum confidence level (HIGH, MEDIUM, LOW)
+        high_conf_threshold: Percentage threshold for auto-approval
+
+    Returns:
+        Dict with approval summary and validation results (no tables)
+    """
+    min_level = CONFIDENCE_ORDER.get(min_confidence, 2)
+    summary = {
+        'total_suggestions': 0,
+        'approved': 0,
+        'rejected': 0
+    }
+    header = {}
+    error_count = 0
+    errors = []
+    approved_tables = 0
+
+    with open(output_file, 'w') as out:
+        out.write('{\n  "tables": {')
+
+        for table_name, columns in iter_table_suggestions(suggestions_file, header):
+            approved_columns = filter_table(table_name, columns, min_level, summary)
+            if not approved_columns:
+                continue
+
+            table_errors = validate_table_tags(table_name, approved_columns)
+            error_count += len(table_errors)
+            errors.extend(table_errors[:MAX_REPORTED_ERRORS - len(errors)])
+
+            out.write(',' if approved_tables else '')
+            out.write(f"\n    {json.dumps(table_name)}: {json.dumps(approved_columns)}")
+            approved_tables += 1
+
+        out.write('\n  },\n')
+        trailer = {
+            'database': header.get('database'),
+            'timestamp': datetime.now().isoformat(),
+            'approval_criteria': {
+                'min_confidence': min_confidence,
+                'threshold': high_conf_threshold
+            },
+            'approval_summary': summary
+        }
+        body = json.dumps(trailer, indent=2)
+        out.write(body[body.index('\n') + 1:])
+
+    log_approval_summary(summary)
+
+    return {
+        'approval_summary': summary,
+        'approved_tables': approved_tables,
+        'error_count': error_count,
+        'errors': errors
+    }
+
+
 def main():
     suggestions_file = os.environ.get('SUGGESTIONS_FILE', '/tmp/suggestions.json')
     output_file = os.environ.get('APPROVED_TAGS', '/tmp/approved_tags.json')
     min_confidence = os.environ.get('MIN_CONFIDENCE', 'HIGH')
+    streaming = os.environ.get('STREAMING', 'false').lower() in ('1', 'true', 'yes')
+    tracer = get_tracer('approve')
+
+    if streaming:
+        logger.info(f"Streaming suggestions from {suggestions_file} "
+                    f"({min_confidence} confidence or higher)")
+        with tracer.span('approve.stream', input_bytes=file_size(suggestions_file)):
+            result = stream_filter_by_confidence(suggestions_file, output_file, min_confidence)
+
+        if result['error_count']:
+            logger.warning(f"Validation errors found ({result['error_count']} total): "
+                           f"{result['errors']}")
+        else:
+            logger.info("All approved tags are valid")
+
+        logger.info(f"Approved tags saved to {output_file}")
+        logger.info(f"Ready to apply {result['approval_summary']['approved']} tags")
+        finish_approve_trace(tracer, result['approval_summary'], suggestions_file, output_file)
+        return
 
     # Load and filter
     logger.info(f"Loading suggestions from {suggestions_file}")
-    suggestions = load_suggestions(suggestions_file)
+    with tracer.span('approve.load', input_bytes=file_size(suggestions_file)):
+        suggestions = load_suggestions(suggestions_file)
 
     logger.info(f"Filtering for {min_confidence} confidence or higher")
-    approved = filter_by_confidence(suggestions, min_confidence)
+    with tracer.span('approve.filter', items=len(suggestions.get('tables', {}))):
+        approved = filter_by_confidence(suggestions, min_confidence)
 
     # Validate
-    valid, errors = validate_approved_tags(approved)
+    with tracer.span('approve.validate'):
+        valid, errors = validate_approved_tags(approved)
     if not valid:
         logger.warning(f"Validation errors found: {errors}")
     else:
@@ -137,8 +389,17 @@ def main():
 
     logger.info(f"Approved tags saved to {output_file}")
     logger.info(f"Ready to apply {approved['approval_summary']['approved']} tags")
+    finish_approve_trace(tracer, approved['approval_summary'], suggestions_file, output_file)
+
+
+def finish_approve_trace(tracer, summary: dict, suggestions_file: str, output_file: str):
+    """Record the approve stage span with counts and file sizes"""
+    tracer.finish(suggestions=summary['total_suggestions'],
+                  approved=summary['approved'],
+                  rejected=summary['rejected'],
+                  input_bytes=file_size(suggestions_file),
+                  output_bytes=file_size(output_file))
 
 
 if __name__ == '__main__':
-    from typing import Tuple
     main()
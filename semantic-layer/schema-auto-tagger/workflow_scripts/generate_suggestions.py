@@ -9,12 +9,14 @@ import sys
 import json
 import logging
 from datetime import datetime
+from typing import Optional
 
 # Add parent directory to path to import schema_auto_tagger
 scripts_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, scripts_dir)
 
 from schema_auto_tagger import SchemaTagger, ColumnMetadata
+from run_tracing import Tracer, file_size, get_tracer
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -44,7 +46,8 @@ def load_rules(rules_file: str) -> dict:
         return {}
 
 
-def generate_suggestions(database: str, schema_data: dict, rules: dict) -> dict:
+def generate_suggestions(database: str, schema_data: dict, rules: dict,
+                         tracer: Optional[Tracer] = None) -> dict:
     """
     Generate tag suggestions for all columns
 
@@ -52,10 +55,12 @@ def generate_suggestions(database: str, schema_data: dict, rules: dict) -> dict:
         database: Database name
         schema_data: Schema scan data
         rules: Tagging rules
+        tracer: Optional tracer for per-table spans
 
     Returns:
         Dict with suggestions for each table/column
     """
+    tracer = tracer or Tracer('analyze')
     tagger = SchemaTagger(database, rules)
     suggestions = {
         'database': database,
@@ -78,35 +83,10 @@ def generate_suggestions(database: str, schema_data: dict, rules: dict) -> dict:
             logger.warning(f"Table {table_name} not in schema data")
             continue
 
-        table_data = tables[table_name]
-        table_suggestions = {}
-
-        for col_data in table_data.get('columns', []):
-            column = ColumnMetadata(
-                name=col_data.get('name', ''),
-                data_type=col_data.get('type', ''),
-                description=col_data.get('description', ''),
-                existing_tags=col_data.get('policy_tags', [])
-            )
-
-            # Skip columns that already have tags
-            if column.existing_tags:
-                logger.debug(f"Skipping {table_name}.{column.name} - already tagged")
-                continue
-
-            # Generate suggestions
-            column_suggestions = tagger.analyze_column(column, table_name)
-
-            if column_suggestions:
-                table_suggestions[column.name] = [
-                    {
-                        'tag': s.tag,
-                        'category': s.category,
-                        'confidence': s.confidence,
-                        'reason': s.reason
-                    }
-                    for s in column_suggestions
-                ]
+        with tracer.span('analyze.table', table=table_name) as span:
+            table_suggestions = analyze_table(tagger, table_name, tables[table_name])
+            span.set(columns=len(tables[table_name].get('columns', [])),
+                     suggestions=sum(len(cols) for cols in table_suggestions.values()))
 
         if table_suggestions:
             suggestions['tables'][table_name] = table_suggestions
@@ -119,6 +99,50 @@ def generate_suggestions(database: str, schema_data: dict, rules: dict) -> dict:
     return suggestions
 
 
+def analyze_table(tagger: SchemaTagger, table_name: str, table_data: dict) -> dict:
+    """
+    Generate suggestions for the untagged columns of one table
+
+    Args:
+        tagger: Schema tagger
+        table_name: Table name
+        table_data: Table entry from the schema scan
+
+    Returns:
+        Dict of {column: [suggestion dicts]}
+    """
+    table_suggestions = {}
+
+    for col_data in table_data.get('columns', []):
+        column = ColumnMetadata(
+            name=col_data.get('name', ''),
+            data_type=col_data.get('type', ''),
+            description=col_data.get('description', ''),
+            existing_tags=col_data.get('policy_tags', [])
+        )
+
+        # Skip columns that already have tags
+        if column.existing_tags:
+            logger.debug(f"Skipping {table_name}.{column.name} - already tagged")
+            continue
+
+        # Generate suggestions
+        column_suggestions = tagger.analyze_column(column, table_name)
+
+        if column_suggestions:
+            table_suggestions[column.name] = [
+                {
+                    'tag': s.tag,
+                    'category': s.category,
+                    'confidence': s.confidence,
+                    'reason': s.reason
+                }
+                for s in column_suggestions
+            ]
+
+    return table_suggestions
+
+
 def main():
     input_file = os.environ.get('INPUT_SCAN', '/tmp/schema_scan.json')
     output_file = os.environ.get('OUTPUT_SUGGESTIONS', '/tmp/suggestions.json')
@@ -132,8 +156,10 @@ def main():
     logger.info(f"Loading rules from {rules_file}")
     rules = load_rules(rules_file)
 
+    tracer = get_tracer('analyze')
+
     # Generate suggestions
-    suggestions = generate_suggestions(database, schema_data, rules)
+    suggestions = generate_suggestions(database, schema_data, rules, tracer)
 
     # Save output
     with open(output_file, 'w') as f:
@@ -141,6 +167,11 @@ def main():
 
     logger.info(f"Suggestions saved to {output_file}")
 
+    tracer.finish(items=suggestions['total_tables'],
+                  suggestions=suggestions['total_suggestions'],
+                  input_bytes=file_size(input_file),
+                  output_bytes=file_size(output_file))
+
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Run Tracing for Workflow
+Lightweight spans and run metrics shared by the workflow scripts
+
+Each script opens a Tracer for its stage and wraps units of work in spans:
+
+    tracer = get_tracer('scan')
+    with tracer.span('scan.table', table=table_name) as span:
+        ...
+        span.set(columns=len(columns))
+    tracer.finish(tables=len(tables), output_bytes=file_size(output_file))
+
+Spans are appended to TRACE_FILE (NDJSON, one record per span) so all stages
+of a session share one trace. Running this script summarizes the trace into
+flat per-span rows in RUN_METRICS (NDJSON) and, when METRICS_TABLE is set and
+pytd is installed, appends them to that TD table.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Attributes summed into the run metrics rows
+METRIC_ATTRS = ('items', 'columns', 'suggestions', 'approved', 'rejected',
+                'applied', 'failed', 'skipped', 'input_bytes', 'output_bytes')
+
+
+def file_size(path: Optional[str]) -> int:
+    """Return file size in bytes, 0 if missing"""
+    try:
+        return os.path.getsize(path) if path else 0
+    except OSError:
+        return 0
+
+
+class Span:
+    """A timed unit of work with numeric/string attributes"""
+
+    __slots__ = ('name', 'attrs', 'status', 'start', 'duration_ms')
+
+    def __init__(self, name: str, attrs: dict):
+        self.name = name
+        self.attrs = attrs
+        self.status = 'ok'
+        self.start = time.time()
+        self.duration_ms = 0.0
+
+    def set(self, **attrs):
+        """Set attributes (counts, sizes, identifiers)"""
+        self.attrs.update(attrs)
+
+    def add(self, key: str, amount: int = 1):
+        """Increment a counter attribute"""
+        self.attrs[key] = self.attrs.get(key, 0) + amount
+
+
+class Tracer:
+    """
+    Records spans for one workflow stage
+
+    Spans are kept as running aggregates in memory (count, time, errors)
+    and optionally appended to a shared NDJSON trace file. Spans may be
+    recorded from several threads (e.g. parallel notification channels).
+    """
+
+    def __init__(self, stage: str, trace_file: Optional[str] = None,
+                 run_id: Optional[str] = None, database: Optional[str] = None):
+        """
+        Args:
+            stage: Stage name (scan, analyze, approve, apply, notify)
+            trace_file: NDJSON file to append span records to
+            run_id: Identifier shared by all stages of a session
+            database: Database being processed
+        """
+        self.stage = stage
+        self.run_id = run_id or datetime.now().strftime('%Y%m%d%H%M%S')
+        self.database = database
+        self.aggregates: Dict[str, dict] = {}
+        self._started = time.time()
+        self._out = open(trace_file, 'a') if trace_file else None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, **attrs) -> Iterator[Span]:
+        """Time a block of work; exceptions mark the span as failed and propagate"""
+        span = Span(name, attrs)
+        t0 = time.perf_counter()
+        try:
+            yield span
+        except BaseException:
+            span.status = 'error'
+            raise
+        finally:
+            span.duration_ms = (time.perf_counter() - t0) * 1000
+            self._record(span)
+
+    def _record(self, span: Span):
+        with self._lock:
+            self._record_locked(span)
+
+    def _record_locked(self, span: Span):
+        agg = self.aggregates.get(span.name)
+        if agg is None:
+            agg = self.aggregates[span.name] = {
+                'count': 0, 'errors': 0, 'total_ms': 0.0, 'max_ms': 0.0
+            }
+        agg['count'] += 1
+        agg['total_ms'] += span.duration_ms
+        if span.duration_ms > agg['max_ms']:
+            agg['max_ms'] = span.duration_ms
+        if span.status != 'ok':
+            agg['errors'] += 1
+
+        if self._out:
+            self._out.write(json.dumps({
+                'run_id': self.run_id,
+                'database': self.database,
+                'stage': self.stage,
+                'span': span.name,
+                'time': int(span.start),
+                'duration_ms': round(span.duration_ms, 3),
+                'status': span.status,
+                'attrs': span.attrs
+            }, default=str) + '\n')
+
+    def finish(self, status: str = 'ok', **attrs):
+        """Record the stage-level span and close the trace file"""
+        span = Span(self.stage, attrs)
+        span.start = self._started
+        span.status = status
+        span.duration_ms = (time.time() - self._started) * 1000
+        self._record(span)
+
+        logger.info(f"[trace] {self.stage} finished in {span.duration_ms / 1000:.2f}s {attrs}")
+        for name, agg in self.aggregates.items():
+            if name != self.stage:
+                logger.info(f"[trace]   {name}: {agg['count']} spans, "
+                            f"{agg['total_ms'] / 1000:.2f}s total, "
+                            f"max {agg['max_ms']:.1f}ms, {agg['errors']} errors")
+
+        with self._lock:
+            if self._out:
+                self._out.close()
+                self._out = None
+
+
+def get_tracer(stage: str) -> Tracer:
+    """Create a Tracer for a stage from TRACE_FILE, RUN_ID and DATABASE env vars"""
+    return Tracer(
+        stage,
+        trace_file=os.environ.get('TRACE_FILE') or None,
+        run_id=os.environ.get('RUN_ID') or None,
+        database=os.environ.get('DATABASE') or None
+    )
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize_trace(trace_file: str) -> List[dict]:
+    """
+    Aggregate a trace file into one flat row per (run, stage, span)
+
+    Args:
+        trace_file: NDJSON trace written by Tracer
+
+    Returns:
+        List of rows with count, errors, timing percentiles (ms) and
+        summed METRIC_ATTRS, ready to load into a TD table
+    """
+    groups: Dict[tuple, dict] = {}
+
+    with open(trace_file, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+            key = (record.get('run_id'), record.get('stage'), record.get('span'))
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = {
+                    'time': record.get('time', 0),
+                    'database': record.get('database'),
+                    'durations': [],
+                    'errors': 0,
+                    'totals': dict.fromkeys(METRIC_ATTRS, 0)
+                }
+            group['time'] = min(group['time'], record.get('time', group['time']))
+            group['durations'].append(record.get('duration_ms', 0.0))
+            if record.get('status') != 'ok':
+                group['errors'] += 1
+            attrs = record.get('attrs') or {}
+            for attr in METRIC_ATTRS:
+                value = attrs.get(attr)
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    group['totals'][attr] += value
+
+    rows = []
+    for (run_id, stage, span_name), group in sorted(groups.items(), key=lambda kv: kv[1]['time']):
+        durations = sorted(group['durations'])
+        row = {
+            'time': group['time'],
+            'run_id': run_id,
+            'database': group['database'],
+            'stage': stage,
+            'span': span_name,
+            'count': len(durations),
+            'errors': group['errors'],
+            'total_ms': round(sum(durations), 3),
+            'avg_ms': round(sum(durations) / len(durations), 3),
+            'p50_ms': round(_percentile(durations, 0.5), 3),
+            'p95_ms': round(_percentile(durations, 0.95), 3),
+            'max_ms': round(durations[-1], 3)
+        }
+        row.update(group['totals'])
+        rows.append(row)
+
+    return rows
+
+
+def load_metrics_to_td(rows: List[dict], table: str) -> bool:
+    """
+    Append metrics rows to a TD table with pytd
+
+    Args:
+        rows: Rows from summarize_trace
+        table: Target table ("database.table" or table in $DATABASE)
+
+    Returns:
+        True if loaded
+    """
+    try:
+        import pandas as pd
+        import pytd
+    except ImportError:
+        logger.warning("pytd/pandas not installed, skipping metrics upload")
+        return False
+
+    try:
+        client = pytd.Client(database=os.environ.get('DATABASE', 'analytics'))
+        client.load_table_from_dataframe(
+            pd.DataFrame(rows), table, writer='bulk_import', if_exists='append'
+        )
+        logger.info(f"Loaded {len(rows)} metrics rows into {table}")
+        return True
+    except Exception as e:
+        logger.error(f"Failed to load metrics into {table}: {e}")
+        return False
+
+
+def main():
+    trace_file = os.environ.get('TRACE_FILE', '/tmp/schema_tagger_trace.ndjson')
+    metrics_file = os.environ.get('RUN_METRICS', '/tmp/schema_tagger_run_metrics.ndjson')
+    metrics_table = os.environ.get('METRICS_TABLE')
+
+    if not os.path.exists(trace_file):
+        logger.warning(f"Trace file not found: {trace_file}")
+        sys.exit(0)
+
+    rows = summarize_trace(trace_file)
+
+    with open(metrics_file, 'w') as f:
+        for row in rows:
+            f.write(json.dumps(row) + '\n')
+
+    logger.info(f"Run metrics ({len(rows)} rows) saved to {metrics_file}")
+    for row in rows:
+        logger.info(f"  {row['stage']:>8} {row['span']:<16} count={row['count']:<6} "
+                    f"total={row['total_ms'] / 1000:.2f}s p95={row['p95_ms']:.1f}ms "
+                    f"errors={row['errors']}")
+
+    if metrics_table:
+        load_metrics_to_td(rows, metrics_table)
+
+
+if __name__ == '__main__':
+    main()
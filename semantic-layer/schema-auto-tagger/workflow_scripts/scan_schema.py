@@ -9,15 +9,18 @@ import json
 import subprocess
 import logging
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional
+
+from run_tracing import Span, Tracer, file_size, get_tracer
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-def scan_database(database: str) -> Dict:
+def scan_database(database: str, tracer: Optional[Tracer] = None) -> Dict:
     """Scan database and collect schema information"""
     logger.info(f"Scanning database: {database}")
+    tracer = tracer or Tracer('scan')
 
     result = subprocess.run(
         ['tdx', 'tables', '--database', database, '--format', 'json'],
@@ -35,22 +38,11 @@ def scan_database(database: str) -> Dict:
 
     for table_name in tables:
         try:
-            result = subprocess.run(
-                ['tdx', 'show', 'schema', database, table_name, '--format', 'json'],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-
-            table_schema = json.loads(result.stdout)
-            schema_data['tables'][table_name] = {
-                'columns': table_schema.get('columns', []),
-                'created_at': table_schema.get('created_at'),
-                'updated_at': table_schema.get('updated_at'),
-                'row_count': table_schema.get('row_count', 0)
-            }
+            with tracer.span('scan.table', table=table_name) as span:
+                table_entry = scan_table(database, table_name, span)
+                schema_data['tables'][table_name] = table_entry
 
-            logger.info(f"Scanned {table_name}: {len(table_schema.get('columns', []))} columns")
+            logger.info(f"Scanned {table_name}: {len(table_entry['columns'])} columns")
 
         except subprocess.CalledProcessError as e:
             logger.error(f"Failed to scan table {table_name}: {e}")
@@ -59,6 +51,37 @@ def scan_database(database: str) -> Dict:
     return schema_data
 
 
+def scan_table(database: str, table_name: str, span: Optional[Span] = None) -> Dict:
+    """
+    Collect schema information for one table
+
+    Args:
+        database: Database name
+        table_name: Table to describe
+        span: Optional span to record column count and response size on
+
+    Raises:
+        subprocess.CalledProcessError: If tdx fails
+    """
+    result = subprocess.run(
+        ['tdx', 'show', 'schema', database, table_name, '--format', 'json'],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+    table_schema = json.loads(result.stdout)
+    if span is not None:
+        span.set(columns=len(table_schema.get('columns', [])),
+                 input_bytes=len(result.stdout.encode()))
+    return {
+        'columns': table_schema.get('columns', []),
+        'created_at': table_schema.get('created_at'),
+        'updated_at': table_schema.get('updated_at'),
+        'row_count': table_schema.get('row_count', 0)
+    }
+
+
 def compare_with_baseline(current_schema: Dict, baseline_file: str) -> Dict:
     """
     Compare current schema with baseline to detect changes
@@ -126,11 +149,14 @@ def main():
     output_file = os.environ.get('SCAN_OUTPUT', '/tmp/schema_scan.json')
     baseline_file = os.environ.get('BASELINE_FILE', f'/tmp/baseline_{database}.json')
 
+    tracer = get_tracer('scan')
+
     # Scan database
-    schema_data = scan_database(database)
+    schema_data = scan_database(database, tracer)
 
     # Detect changes
-    changes = compare_with_baseline(schema_data, baseline_file)
+    with tracer.span('scan.compare_baseline', input_bytes=file_size(baseline_file)):
+        changes = compare_with_baseline(schema_data, baseline_file)
     schema_data['changes'] = changes
 
     # Save scan output
@@ -145,6 +171,10 @@ def main():
     logger.info(f"Summary: {len(changes['new_tables'])} new tables, "
                 f"{len(changes['new_columns'])} tables with new columns")
 
+    tracer.finish(items=len(schema_data['tables']),
+                  columns=sum(len(t['columns']) for t in schema_data['tables'].values()),
+                  output_bytes=file_size(output_file))
+
 
 if __name__ == '__main__':
     main()
@@ -2,17 +2,41 @@
 """
 Notification Script for Workflow
 Sends Slack notifications about schema tagging results
+
+All configured channels are dispatched concurrently with a shared timeout.
+Failures are summarized into the top groups by table and error class within
+a byte budget; the full log is attached to the email (or linked via LOG_URL)
+instead of being inlined, so payload size does not grow with failure count.
 """
 
 import os
+import re
 import sys
 import json
 import logging
+import threading
+import time
+from collections import Counter
 from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from run_tracing import Tracer, file_size, get_tracer
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Slack rejects section text over 3000 characters
+SLACK_FAILURE_BUDGET = 2800
+EMAIL_FAILURE_BUDGET = 8000
+DEFAULT_TOP_N = 10
+DEFAULT_TIMEOUT = 15
+# Larger logs are linked (LOG_URL) rather than attached
+MAX_ATTACHMENT_BYTES = 10 * 1024 * 1024
+
+_QUOTED_RE = re.compile(r"'[^']*'|\"[^\"]*\"")
+_NUMBER_RE = re.compile(r'\d+')
+_PREFIX_RE = re.compile(r'^Failed to (apply|create) tag:\s*')
+
 
 def load_json_file(file_path: str) -> dict:
     """Load JSON file"""
@@ -24,7 +48,102 @@ def load_json_file(file_path: str) -> dict:
         return {}
 
 
-def build_slack_message(log: dict, suggestions: dict, session_date: str) -> dict:
+def classify_error(message: str) -> str:
+    """
+    Reduce an error message to its class
+
+    Strips the apply/create prefix, quoted values and numbers so that
+    errors differing only in the tag or id group together.
+    """
+    message = _PREFIX_RE.sub('', message or 'unknown error')
+    message = _QUOTED_RE.sub("'…'", message)
+    message = _NUMBER_RE.sub('N', message)
+    return message.strip()[:80] or 'unknown error'
+
+
+def summarize_failures(log: dict, top_n: int = DEFAULT_TOP_N) -> dict:
+    """
+    Group failed tags by table and error class
+
+    Args:
+        log: Execution log
+        top_n: Maximum number of groups to keep
+
+    Returns:
+        Dict with total failure count, group count and the top_n largest
+        groups ({table, error_class, count, example}), largest first
+    """
+    counts = Counter()
+    examples = {}
+
+    for table_name, table_log in log.get('details', {}).items():
+        if not table_log.get('failed'):
+            continue
+        for col_name, col_log in table_log.get('columns', {}).items():
+            for failure in col_log.get('failed', []):
+                key = (table_name, classify_error(failure.get('error', '')))
+                counts[key] += 1
+                examples.setdefault(key, f"{col_name}: {failure.get('tag', '')}")
+
+    return {
+        'total': sum(counts.values()),
+        'group_count': len(counts),
+        'groups': [
+            {
+                'table': table_name,
+                'error_class': error_class,
+                'count': count,
+                'example': examples[(table_name, error_class)]
+            }
+            for (table_name, error_class), count in counts.most_common(top_n)
+        ]
+    }
+
+
+def format_failure_summary(failures: dict, budget: int, markdown: bool = True,
+                           log_url: Optional[str] = None) -> str:
+    """
+    Render a failure summary that fits within budget bytes (UTF-8)
+
+    Groups are added largest first until the budget is reached; the
+    remainder is reported as a single overflow line.
+    """
+    header = "*Failed Tags:*\n" if markdown else "Failed Tags:\n"
+    footer_link = ''
+    if log_url:
+        footer_link = f"<{log_url}|Full execution log>" if markdown else f"Full execution log: {log_url}"
+
+    lines = []
+    used = len(header.encode('utf-8')) + len(footer_link.encode('utf-8')) + 80
+    shown = 0
+
+    for group in failures['groups']:
+        if markdown:
+            line = (f"• `{group['table']}` ×{group['count']}: {group['error_class']}"
+                    f" (e.g. `{group['example']}`)\n")
+        else:
+            line = (f"  - {group['table']} x{group['count']}: {group['error_class']}"
+                    f" (e.g. {group['example']})\n")
+        size = len(line.encode('utf-8'))
+        if used + size > budget:
+            break
+        lines.append(line)
+        used += size
+        shown += group['count']
+
+    remaining = failures['total'] - shown
+    if remaining > 0:
+        other_groups = failures['group_count'] - len(lines)
+        lines.append(f"…and {remaining} more failures in {other_groups} groups\n")
+    if footer_link:
+        lines.append(footer_link + "\n")
+
+    return header + ''.join(lines)
+
+
+def build_slack_message(log: dict, suggestions: dict, session_date: str,
+                        log_url: Optional[str] = None,
+                        top_n: int = DEFAULT_TOP_N) -> dict:
     """
     Build Slack message payload
 
@@ -32,6 +151,8 @@ def build_slack_message(log: dict, suggestions: dict, session_date: str) -> dict
         log: Execution log
         suggestions: Suggestions data
         session_date: Session date
+        log_url: Optional link to the full execution log
+        top_n: Maximum number of failure groups to list
 
     Returns:
         Slack message payload
@@ -110,11 +231,8 @@ def build_slack_message(log: dict, suggestions: dict, session_date: str) -> dict
 
     # Add failed details if any
     if s.get('failed', 0) > 0:
-        failed_text = "*Failed Tags:*\n"
-        for table_name, table_log in log.get('details', {}).items():
-            for col_name, col_log in table_log.get('columns', {}).items():
-                for failure in col_log.get('failed', []):
-                    failed_text += f"• `{table_name}.{col_name}`: {failure['tag']}\n"
+        failures = summarize_failures(log, top_n)
+        failed_text = format_failure_summary(failures, SLACK_FAILURE_BUDGET, log_url=log_url)
 
         message['blocks'].append({
             "type": "section",
@@ -127,13 +245,15 @@ def build_slack_message(log: dict, suggestions: dict, session_date: str) -> dict
     return message
 
 
-def send_slack_notification(webhook_url: str, message: dict) -> bool:
+def send_slack_notification(webhook_url: str, message: dict,
+                            timeout: float = 10) -> bool:
     """
     Send Slack webhook notification
 
     Args:
         webhook_url: Slack webhook URL
         message: Message payload
+        timeout: Request timeout in seconds
 
     Returns:
         True if successful
@@ -145,7 +265,7 @@ def send_slack_notification(webhook_url: str, message: dict) -> bool:
         return False
 
     try:
-        response = requests.post(webhook_url, json=message, timeout=10)
+        response = requests.post(webhook_url, json=message, timeout=timeout)
         response.raise_for_status()
         logger.info("Slack notification sent successfully")
         return True
@@ -155,7 +275,9 @@ def send_slack_notification(webhook_url: str, message: dict) -> bool:
 
 
 def send_email_notification(smtp_config: dict, log: dict, suggestions: dict,
-                           session_date: str) -> bool:
+                           session_date: str, log_file: Optional[str] = None,
+                           log_url: Optional[str] = None, timeout: float = 30,
+                           top_n: int = DEFAULT_TOP_N) -> bool:
     """
     Send email notification
 
@@ -164,12 +286,17 @@ def send_email_notification(smtp_config: dict, log: dict, suggestions: dict,
         log: Execution log
         suggestions: Suggestions data
         session_date: Session date
+        log_file: Execution log to attach (skipped if over MAX_ATTACHMENT_BYTES)
+        log_url: Optional link to the full execution log
+        timeout: SMTP connection timeout in seconds
+        top_n: Maximum number of failure groups to list
 
     Returns:
         True if successful
     """
     try:
         import smtplib
+        from email.mime.application import MIMEApplication
         from email.mime.text import MIMEText
         from email.mime.multipart import MIMEMultipart
     except ImportError:
@@ -182,6 +309,22 @@ def send_email_notification(smtp_config: dict, log: dict, suggestions: dict,
         total_sugg = suggestions.get('total_suggestions', 0)
         success_rate = (s.get('applied', 0) / s.get('total_tags', 1) * 100) if s.get('total_tags', 0) > 0 else 0
 
+        attach_log = bool(
+            log_file and os.path.exists(log_file)
+            and os.path.getsize(log_file) <= MAX_ATTACHMENT_BYTES
+        )
+        if s.get('failed', 0) > 0:
+            details = format_failure_summary(
+                summarize_failures(log, top_n), EMAIL_FAILURE_BUDGET,
+                markdown=False, log_url=log_url
+            )
+        else:
+            details = "No failures.\n"
+        if attach_log:
+            details += "Full execution log attached.\n"
+        elif log_url is None:
+            details += f"Full execution log: {log_file or 'not available'}\n"
+
         body = f"""
 Schema Auto-Tagging Report
 {'=' * 60}
@@ -198,9 +341,7 @@ Summary:
 
 Status: {'SUCCESS ✓' if s.get('failed', 0) == 0 else 'PARTIAL FAILURE ⚠'}
 
-Details:
-{json.dumps(log.get('details', {}), indent=2)}
-
+{details}
 ---
 Auto-generated by Schema Auto-Tagger
         """
@@ -213,10 +354,17 @@ Auto-generated by Schema Auto-Tagger
 
         msg.attach(MIMEText(body, 'plain'))
 
+        if attach_log:
+            with open(log_file, 'rb') as f:
+                attachment = MIMEApplication(f.read(), Name=os.path.basename(log_file))
+            attachment['Content-Disposition'] = f'attachment; filename="{os.path.basename(log_file)}"'
+            msg.attach(attachment)
+
         # Send email
         server = smtplib.SMTP(
             smtp_config.get('host', 'localhost'),
-            smtp_config.get('port', 587)
+            smtp_config.get('port', 587),
+            timeout=timeout
         )
         server.starttls()
         server.login(smtp_config.get('user', ''), smtp_config.get('password', ''))
@@ -231,29 +379,94 @@ Auto-generated by Schema Auto-Tagger
         return False
 
 
+def dispatch_notifications(channels: Dict[str, Callable[[], bool]],
+                           timeout: float = DEFAULT_TIMEOUT,
+                           tracer: Optional[Tracer] = None) -> Dict[str, bool]:
+    """
+    Run notification channels concurrently
+
+    Args:
+        channels: Dict of {channel name: callable returning True on success}
+        timeout: Seconds to wait for all channels combined
+        tracer: Optional tracer for per-channel spans
+
+    Returns:
+        Dict of {channel name: success}. Channels still running at the
+        timeout are reported as failed and abandoned; they run on daemon
+        threads, so they do not delay process exit.
+    """
+    if not channels:
+        return {}
+
+    tracer = tracer or Tracer('notify')
+
+    def traced(name, send):
+        with tracer.span(f'notify.{name}') as span:
+            ok = bool(send())
+            span.set(applied=int(ok), failed=int(not ok))
+            return ok
+
+    outcomes = {}
+
+    def run(name, send):
+        try:
+            outcomes[name] = traced(name, send)
+        except Exception as e:
+            logger.error(f"{name} notification raised: {e}")
+            outcomes[name] = False
+
+    # Daemon threads rather than an executor: a hung channel must not keep
+    # the process alive past the timeout (executor workers are joined at exit)
+    threads = {name: threading.Thread(target=run, args=(name, send),
+                                      name=f'notify-{name}', daemon=True)
+               for name, send in channels.items()}
+    for thread in threads.values():
+        thread.start()
+
+    deadline = time.monotonic() + timeout
+    for thread in threads.values():
+        thread.join(max(0.0, deadline - time.monotonic()))
+
+    results = {}
+    for name, thread in threads.items():
+        if thread.is_alive():
+            logger.error(f"{name} notification timed out after {timeout}s")
+            results[name] = False
+        else:
+            results[name] = outcomes.get(name, False)
+
+    return results
+
+
 def main():
     log_file = os.environ.get('LOG_FILE', '/tmp/apply_tags_log.json')
     suggestions_file = os.environ.get('SUGGESTIONS_FILE', '/tmp/suggestions.json')
     session_date = os.environ.get('SESSION_DATE', datetime.now().strftime('%Y-%m-%d'))
     slack_webhook = os.environ.get('SLACK_WEBHOOK')
+    log_url = os.environ.get('LOG_URL') or None
+    timeout = float(os.environ.get('NOTIFY_TIMEOUT', DEFAULT_TIMEOUT))
+    top_n = int(os.environ.get('FAILURE_TOP_N', DEFAULT_TOP_N))
+
+    tracer = get_tracer('notify')
 
     # Load data
     logger.info("Loading workflow results")
-    log = load_json_file(log_file)
-    suggestions = load_json_file(suggestions_file)
+    with tracer.span('notify.load', input_bytes=file_size(log_file) + file_size(suggestions_file)):
+        log = load_json_file(log_file)
+        suggestions = load_json_file(suggestions_file)
+
+    channels = {}
 
-    # Send notifications
     if slack_webhook:
-        logger.info("Sending Slack notification")
-        message = build_slack_message(log, suggestions, session_date)
-        send_slack_notification(slack_webhook, message)
+        message = build_slack_message(log, suggestions, session_date,
+                                      log_url=log_url, top_n=top_n)
+        channels['slack'] = lambda: send_slack_notification(slack_webhook, message, timeout)
     else:
         logger.info("No Slack webhook configured, skipping Slack notification")
 
     # Email notification (if configured via environment)
     smtp_host = os.environ.get('SMTP_HOST')
     if smtp_host:
-        logger.info("Sending email notification")
         smtp_config = {
             'host': smtp_host,
             'port': int(os.environ.get('SMTP_PORT', 587)),
@@ -262,11 +475,20 @@ def main():
             'from': os.environ.get('SMTP_FROM', 'noreply@example.com'),
             'to': os.environ.get('SMTP_TO', 'admin@example.com').split(',')
         }
-        send_email_notification(smtp_config, log, suggestions, session_date)
+        channels['email'] = lambda: send_email_notification(
+            smtp_config, log, suggestions, session_date, log_file=log_file,
+            log_url=log_url, timeout=timeout, top_n=top_n
+        )
     else:
         logger.info("No email configuration found, skipping email notification")
 
-    logger.info("Notification workflow complete")
+    # Send notifications
+    logger.info(f"Sending notifications: {', '.join(channels) or 'none'}")
+    results = dispatch_notifications(channels, timeout=timeout, tracer=tracer)
+
+    logger.info(f"Notification workflow complete: {results}")
+    tracer.finish(items=len(channels), applied=sum(results.values()),
+                  failed=len(results) - sum(results.values()))
 
 
 if __name__ == '__main__':
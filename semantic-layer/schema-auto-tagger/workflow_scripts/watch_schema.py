@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+Continuous Schema Tagging Daemon
+Polls table metadata and tags new columns within minutes instead of daily
+
+Each poll is a single table-list request (name + updated_at per table).
+Tables whose updated_at changed and new tables are queued; the queue is
+flushed when it reaches BATCH_SIZE or its oldest entry is MAX_LATENCY
+seconds old, and schema scans are rate limited to MAX_SCANS_PER_HOUR. Only
+columns missing from the baseline are analyzed, approved and applied.
+
+The baseline file is shared with scan_schema.py, so the daily workflow and
+the daemon can run side by side. Columns whose tags failed to apply are
+left out of it (and their tables re-queued) so both retry them. The
+progress journal only covers the cycle in flight: it is truncated once the
+cycle's baseline is saved.
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import logging
+import subprocess
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# Add parent directory to path to import schema_auto_tagger
+scripts_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, scripts_dir)
+
+from schema_auto_tagger import SchemaTagger
+from schema_tagger_td_api import TreasureDataTagAPI
+from scan_schema import scan_table
+from generate_suggestions import analyze_table, load_rules
+from auto_approve_high_confidence import CONFIDENCE_ORDER, filter_table, validate_table_tags
+from apply_approved_tags import apply_tags, load_journal, open_journal
+from run_tracing import Tracer, get_tracer
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ChangePolicy:
+    """Latency and cost limits for the daemon"""
+    poll_interval: float = 60          # Seconds between metadata polls
+    max_latency: float = 300           # Flush queue once a change is this old
+    batch_size: int = 50               # Flush queue once this many tables are dirty
+    max_scans_per_hour: int = 600      # Budget for per-table schema scans
+    max_tags_per_cycle: int = 5000     # Remaining tags wait for the next cycle
+
+
+class ScanBudget:
+    """Token bucket limiting schema scans per hour"""
+
+    def __init__(self, per_hour: int, capacity: int):
+        self.rate = per_hour / 3600.0
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self._last = time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._last) * self.rate)
+        self._last = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class SchemaWatcher:
+    """Detects changed tables cheaply and tags only the new columns"""
+
+    def __init__(self, database: str, api_client: TreasureDataTagAPI,
+                 tagger: SchemaTagger, policy: ChangePolicy, baseline_file: str,
+                 journal_file: str, min_confidence: str = 'HIGH',
+                 dry_run: bool = False, tracer: Optional[Tracer] = None):
+        """
+        Args:
+            database: Database to watch
+            api_client: TD API client (table list, tag application)
+            tagger: Schema tagger used to analyze new columns
+            policy: Latency/cost policy
+            baseline_file: Schema baseline shared with scan_schema.py
+            journal_file: Progress journal for tag application
+            min_confidence: Minimum confidence to auto-apply
+            dry_run: Log approved tags instead of applying them; the shared
+                baseline file is not written
+            tracer: Optional tracer for poll/scan/apply spans
+        """
+        self.database = database
+        self.api = api_client
+        self.tagger = tagger
+        self.policy = policy
+        self.baseline_file = baseline_file
+        self.journal_file = journal_file
+        self.min_level = CONFIDENCE_ORDER.get(min_confidence, 3)
+        self.dry_run = dry_run
+        self.tracer = tracer or Tracer('watch')
+        self.budget = ScanBudget(policy.max_scans_per_hour, policy.batch_size)
+
+        self.baseline = self._load_baseline()
+        # table name -> monotonic time the change was first seen
+        self.dirty: Dict[str, float] = {}
+        # table name -> updated_at from the latest table list
+        self.listed_updated_at: Dict[str, str] = {}
+        self.stopped = False
+
+    def _load_baseline(self) -> dict:
+        if os.path.exists(self.baseline_file):
+            try:
+                with open(self.baseline_file, 'r') as f:
+                    return json.load(f)
+            except Exception as e:
+                logger.warning(f"Failed to load baseline: {e}")
+        return {'database': self.database, 'tables': {}}
+
+    def _save_baseline(self):
+        self.baseline['scan_time'] = datetime.now().isoformat()
+        tmp_file = f"{self.baseline_file}.tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump(self.baseline, f, indent=2)
+        os.replace(tmp_file, self.baseline_file)
+
+    def poll(self) -> int:
+        """
+        Queue tables changed since the baseline
+
+        Returns:
+            Number of newly queued tables
+        """
+        queued = 0
+        now = time.monotonic()
+        known = self.baseline.setdefault('tables', {})
+
+        with self.tracer.span('watch.poll') as span:
+            tables = self.api.list_tables(self.database)
+            span.set(items=len(tables))
+
+            if not tables:
+                return 0
+
+            current = set()
+            for table in tables:
+                name = table.get('name')
+                if not name:
+                    continue
+                current.add(name)
+                self.listed_updated_at[name] = table.get('updated_at')
+                entry = known.get(name)
+                if entry is None or entry.get('updated_at') != table.get('updated_at'):
+                    if name not in self.dirty:
+                        self.dirty[name] = now
+                        queued += 1
+
+            for name in list(known):
+                if name not in current:
+                    logger.info(f"Table dropped: {name}")
+                    del known[name]
+                    self.dirty.pop(name, None)
+                    self.listed_updated_at.pop(name, None)
+
+        if queued:
+            logger.info(f"Queued {queued} changed tables ({len(self.dirty)} pending)")
+        return queued
+
+    def due(self) -> bool:
+        """True if the queue should be flushed under the policy"""
+        if not self.dirty:
+            return False
+        if len(self.dirty) >= self.policy.batch_size:
+            return True
+        oldest = min(self.dirty.values())
+        return time.monotonic() - oldest >= self.policy.max_latency
+
+    def process(self) -> dict:
+        """
+        Scan queued tables (oldest first, within budget) and tag new columns
+
+        Returns:
+            Cycle summary counters
+        """
+        summary = {'scanned': 0, 'deferred': 0, 'new_columns': 0,
+                   'approved': 0, 'applied': 0, 'failed': 0}
+        approved_tags: Dict[str, Dict[str, List[str]]] = {}
+        approval = {'total_suggestions': 0, 'approved': 0, 'rejected': 0}
+        known = self.baseline.setdefault('tables', {})
+        # table -> new columns to leave out of the baseline and retry
+        retry_columns: Dict[str, set] = {}
+
+        for name in sorted(self.dirty, key=self.dirty.get):
+            if summary['approved'] >= self.policy.max_tags_per_cycle or not self.budget.take():
+                summary['deferred'] += 1
+                continue
+
+            try:
+                with self.tracer.span('scan.table', table=name) as span:
+                    entry = scan_table(self.database, name, span)
+            except subprocess.CalledProcessError as e:
+                logger.error(f"Failed to scan table {name}: {e}")
+                summary['deferred'] += 1
+                continue
+
+            summary['scanned'] += 1
+            del self.dirty[name]
+
+            previous = {c.get('name') for c in known.get(name, {}).get('columns', [])}
+            new_columns = [c for c in entry['columns'] if c.get('name') not in previous]
+            summary['new_columns'] += len(new_columns)
+
+            if new_columns:
+                approved_before = approval['approved']
+                with self.tracer.span('analyze.table', table=name) as span:
+                    suggestions = analyze_table(self.tagger, name, {'columns': new_columns})
+                    approved_columns = filter_table(name, suggestions, self.min_level, approval)
+                    span.set(columns=len(new_columns),
+                             approved=approval['approved'] - approved_before)
+
+                for error in validate_table_tags(name, approved_columns):
+                    logger.warning(error)
+                held = self._cap_columns(approved_columns, summary)
+                if held:
+                    # Columns over the cap wait for the next cycle
+                    summary['deferred'] += 1
+                    retry_columns[name] = held
+                if approved_columns:
+                    approved_tags[name] = approved_columns
+
+            # Compare future polls against the value the table list reports
+            entry['updated_at'] = self.listed_updated_at.get(name, entry.get('updated_at'))
+            known[name] = entry
+
+        applied = False
+        try:
+            if approved_tags:
+                counts, failed_columns = self._apply(approved_tags)
+                summary.update(counts)
+                for name, columns in failed_columns.items():
+                    retry_columns.setdefault(name, set()).update(columns)
+            applied = True
+        finally:
+            if not applied:
+                # apply raised: none of the approved columns is known to be tagged
+                for name, columns in approved_tags.items():
+                    retry_columns.setdefault(name, set()).update(columns)
+            # Failed and held-back columns stay out of the baseline, so this
+            # daemon (the table is re-queued) and the daily scan retry them
+            now = time.monotonic()
+            for name, columns in retry_columns.items():
+                entry = known[name]
+                entry['columns'] = [c for c in entry['columns'] if c.get('name') not in columns]
+                self.dirty.setdefault(name, now)
+            # The baseline is shared with the daily scan: a dry run tags nothing,
+            # so it must not mark columns as seen
+            if not self.dry_run:
+                self._save_baseline()
+                # Every journaled result is now reflected in the baseline
+                if applied and approved_tags:
+                    open(self.journal_file, 'w').close()
+
+        if summary['deferred']:
+            logger.warning(f"{summary['deferred']} tables deferred by scan/tag budget")
+        logger.info(f"Cycle summary: {summary}")
+        return summary
+
+    def _cap_columns(self, approved_columns: Dict[str, List[str]], summary: dict) -> set:
+        """
+        Keep columns while their tags fit in max_tags_per_cycle
+
+        Columns are dropped from approved_columns once the cap is reached
+        (the first column of a cycle is always kept, so an oversized column
+        cannot stall the daemon); summary['approved'] counts the kept tags.
+
+        Returns:
+            Names of the dropped columns
+        """
+        held = set()
+        for col_name in list(approved_columns):
+            tags = len(approved_columns[col_name])
+            if summary['approved'] and summary['approved'] + tags > self.policy.max_tags_per_cycle:
+                held.add(col_name)
+                del approved_columns[col_name]
+            else:
+                summary['approved'] += tags
+        return held
+
+    def _apply(self, approved_tags: Dict[str, Dict[str, List[str]]]):
+        """
+        Apply approved tags, resuming from the journal
+
+        Returns:
+            Tuple of (applied/failed counts, {table: names of columns with a failed tag})
+        """
+        if self.dry_run:
+            for table_name, columns in approved_tags.items():
+                for col_name, tags in columns.items():
+                    logger.info(f"[DRY RUN] Would apply {tags} to {table_name}.{col_name}")
+            return {}, {}
+
+        journal_state = load_journal(self.journal_file, self.database)
+        with open_journal(self.journal_file, 'resume') as journal:
+            log = apply_tags(self.api, self.database, approved_tags, journal=journal,
+                             journal_state=journal_state, mode='resume', tracer=self.tracer)
+
+        failed_columns = {
+            table_name: {col_name for col_name, col_log in table_log['columns'].items()
+                         if col_log['failed']}
+            for table_name, table_log in log['details'].items() if table_log['failed']
+        }
+        counts = {'applied': log['summary']['applied'], 'failed': log['summary']['failed']}
+        return counts, failed_columns
+
+    def run(self, max_cycles: Optional[int] = None):
+        """Poll until stopped (SIGTERM/SIGINT) or max_cycles polls"""
+        cycles = 0
+        while not self.stopped:
+            try:
+                self.poll()
+                if self.due():
+                    self.process()
+            except Exception as e:
+                logger.error(f"Watch cycle failed: {e}")
+
+            cycles += 1
+            if max_cycles is not None and cycles >= max_cycles:
+                break
+            self._sleep(self.policy.poll_interval)
+
+        # A bounded run (MAX_CYCLES) flushes whatever is still queued
+        if self.dirty and not self.stopped:
+            self.process()
+
+    def _sleep(self, seconds: float):
+        deadline = time.monotonic() + seconds
+        while not self.stopped and time.monotonic() < deadline:
+            time.sleep(min(1.0, deadline - time.monotonic()))
+
+    def stop(self, *_):
+        logger.info("Stopping schema watcher")
+        self.stopped = True
+
+
+def main():
+    database = os.environ.get('DATABASE', 'analytics')
+    baseline_file = os.environ.get('BASELINE_FILE', f'/tmp/baseline_{database}.json')
+    journal_file = os.environ.get('PROGRESS_JOURNAL', f'/tmp/watch_journal_{database}.ndjson')
+    rules_file = os.environ.get('RULES_FILE', 'rules/schema_tagger_rules.yaml')
+    min_confidence = os.environ.get('MIN_CONFIDENCE', 'HIGH')
+    dry_run = os.environ.get('DRY_RUN', 'false').lower() in ('1', 'true', 'yes')
+    max_cycles = os.environ.get('MAX_CYCLES')
+
+    policy = ChangePolicy(
+        poll_interval=float(os.environ.get('POLL_INTERVAL', 60)),
+        max_latency=float(os.environ.get('MAX_LATENCY', 300)),
+        batch_size=int(os.environ.get('BATCH_SIZE', 50)),
+        max_scans_per_hour=int(os.environ.get('MAX_SCANS_PER_HOUR', 600)),
+        max_tags_per_cycle=int(os.environ.get('MAX_TAGS_PER_CYCLE', 5000))
+    )
+
+    try:
+        api_client = TreasureDataTagAPI(api_key=os.environ.get('TD_API_KEY'))
+    except ValueError as e:
+        logger.error(f"Failed to initialize TD API: {e}")
+        sys.exit(1)
+
+    tagger = SchemaTagger(database, load_rules(rules_file))
+    watcher = SchemaWatcher(database, api_client, tagger, policy, baseline_file,
+                            journal_file, min_confidence=min_confidence,
+                            dry_run=dry_run, tracer=get_tracer('watch'))
+
+    signal.signal(signal.SIGTERM, watcher.stop)
+    signal.signal(signal.SIGINT, watcher.stop)
+
+    logger.info(f"Watching {database}: poll every {policy.poll_interval}s, "
+                f"max latency {policy.max_latency}s, "
+                f"max {policy.max_scans_per_hour} scans/hour")
+    watcher.run(max_cycles=int(max_cycles) if max_cycles else None)
+    watcher.tracer.finish()
+
+
+if __name__ == '__main__':
+    main()